@@ -0,0 +1,73 @@
+"""
+Creating and deleting posts one request at a time versus in bulk.
+
+Creates N posts through POST /api/post/ once per post, then through a single
+POST /api/post/bulk/, and does the same for deletes. Requests carry a real
+JWT so every per-item call pays authentication, like an ingestion client.
+
+Usage:
+    python -m benchmarks.bulk --items 1 100 1000 --repeat 5
+"""
+import argparse
+
+from benchmarks.harness import setup_django, test_database, measure, summarize, format_row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, nargs='+', default=[1, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    with test_database():
+        from django.contrib.auth import get_user_model
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import RefreshToken
+        from core.post.models import Post
+
+        User = get_user_model()
+        user = User.objects.create(email='bench@example.com', username='bench', password='!')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+
+        list_url = reverse('post-list')
+        bulk_url = reverse('post-bulk')
+
+        def create_each(items):
+            for item in items:
+                assert client.post(list_url, item, format='json').status_code == 201
+
+        def create_bulk(items):
+            assert client.post(bulk_url, items, format='json').status_code == 201
+
+        def delete_each():
+            for post_id in Post.objects.values_list('id', flat=True):
+                assert client.delete(reverse('post-detail', kwargs={'pk': post_id})).status_code == 204
+
+        def delete_bulk():
+            ids = list(Post.objects.values_list('id', flat=True))
+            assert client.delete(bulk_url, {'ids': ids}, format='json').status_code == 200
+
+        print(f'{args.repeat} runs per size\n')
+        for count in args.items:
+            items = [{'title': f'Post {index}', 'content': 'Benchmark content'} for index in range(count)]
+
+            results = {}
+            for label, create, delete in (('per item', create_each, delete_each), ('bulk', create_bulk, delete_bulk)):
+                create_samples, delete_samples = [], []
+                for _ in range(args.repeat):
+                    create_samples.extend(measure(lambda: create(items), 1))
+                    delete_samples.extend(measure(delete, 1))
+                results[label] = summarize(create_samples), summarize(delete_samples)
+                print(format_row(f'create {count}, {label}', results[label][0]))
+                print(format_row(f'delete {count}, {label}', results[label][1]))
+
+            speedup = results['per item'][0]['p50'] / results['bulk'][0]['p50']
+            print(f'{"create speedup at p50":<32} {speedup:>8.1f}x\n')
+
+
+if __name__ == '__main__':
+    main()
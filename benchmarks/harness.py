@@ -0,0 +1,72 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Benchmarks run from the repository root, e.g. ``python -m benchmarks.pagination``,
+against a throwaway test database created from the configured DATABASES
+settings, so they never read or write development data.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'drf_project.settings')
+    django.setup()
+
+
+@contextmanager
+def test_database(verbosity=0):
+    """
+    Create the test database for the duration of the block.
+    """
+    from django.test.utils import setup_test_environment, teardown_test_environment
+    from django.test.utils import setup_databases, teardown_databases
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=verbosity, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=verbosity)
+        teardown_test_environment()
+
+
+def measure(func, repeat):
+    """
+    Call func repeat times and return the durations in milliseconds.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def summarize(samples):
+    """
+    Return the latency percentiles of samples in milliseconds.
+    """
+    return {
+        'count': len(samples),
+        'mean': sum(samples) / len(samples),
+        'p50': percentile(samples, 0.50),
+        'p90': percentile(samples, 0.90),
+        'p99': percentile(samples, 0.99),
+        'max': max(samples),
+    }
+
+
+def format_row(label, summary):
+    return '{:<32} p50 {:>8.2f} ms   p90 {:>8.2f} ms   p99 {:>8.2f} ms'.format(
+        label, summary['p50'], summary['p90'], summary['p99'],
+    )
@@ -0,0 +1,176 @@
+"""
+Throughput and latency of the sync and async post feed under concurrent load.
+
+Starts gunicorn twice with the same number of workers, first with sync
+workers serving the WSGI application and /api/post/, then with uvicorn
+workers serving the ASGI application and /api/async/post/, and sends the
+same authenticated requests to both from a growing number of concurrent
+clients.
+
+The servers run in separate processes against the test database seeded by
+this script, so the configured database must be a server (PostgreSQL), not
+an in-memory SQLite database.
+
+Usage:
+    python -m benchmarks.load --workers 2 --concurrency 1 10 50 --requests 2000
+    python -m benchmarks.load --params "search=content&page_size=50"
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+from benchmarks.harness import setup_django, test_database, summarize, format_row
+
+# Application, worker class and feed path of each stack
+STACKS = {
+    'sync': ('drf_project.wsgi', 'sync', '/api/post/'),
+    'async': ('drf_project.asgi', 'uvicorn_worker.UvicornWorker', '/api/async/post/'),
+}
+
+
+def seed(posts, batch_size=10000):
+    from django.contrib.auth import get_user_model
+    from core.post.models import Post
+
+    User = get_user_model()
+    users = User.objects.bulk_create([
+        User(email=f'load{index}@example.com', username=f'load{index}', password='!')
+        for index in range(100)
+    ])
+    for offset in range(0, posts, batch_size):
+        Post.objects.bulk_create([
+            Post(user=users[index % len(users)], title=f'Post {index}', content='Load test content')
+            for index in range(offset, min(offset + batch_size, posts))
+        ])
+    return users[0]
+
+
+def server_environment(feed_cache):
+    """
+    Point the servers at the test database of this process.
+    """
+    from django.db import connection
+
+    env = dict(os.environ)
+    if not feed_cache:
+        # Only the sync list uses the feed cache, compare database reads
+        env['POST_FEED_CACHE_TIMEOUT'] = '0'
+    name = connection.settings_dict['NAME']
+    if env.get('DATABASE_URL'):
+        env['DATABASE_URL'] = urlunsplit(urlsplit(env['DATABASE_URL'])._replace(path='/' + name))
+    else:
+        env['DATABASE_NAME'] = name
+    return env
+
+
+def start_server(application, worker_class, workers, port, env):
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'gunicorn', application,
+            '--workers', str(workers), '--worker-class', worker_class,
+            '--bind', f'127.0.0.1:{port}', '--log-level', 'warning',
+        ],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            asyncio.run(fetch(port, '/', ''))
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f'{application} did not start on port {port}')
+
+
+async def fetch(port, path, token):
+    """
+    Send one GET request on a new connection and return the status code.
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write((
+        f'GET {path} HTTP/1.1\r\n'
+        f'Host: 127.0.0.1:{port}\r\n'
+        f'Authorization: Bearer {token}\r\n'
+        'Connection: close\r\n\r\n'
+    ).encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return int(response.split(b' ', 2)[1])
+
+
+async def run_load(port, path, token, concurrency, requests):
+    """
+    Send requests from concurrency clients, each one waiting for its previous
+    response. Return the latencies in milliseconds, the errors and the
+    elapsed seconds.
+    """
+    remaining = iter(range(requests))
+    samples, errors = [], []
+
+    async def client():
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                status = await fetch(port, path, token)
+            except OSError as exc:
+                errors.append(exc)
+                continue
+            samples.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                errors.append(status)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return samples, errors, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--params', default='page_size=20', help='Query string of the feed requests')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--feed-cache', action='store_true', help='Keep the feed cache of the sync list enabled')
+    args = parser.parse_args()
+
+    setup_django()
+
+    with test_database():
+        from django.db import connection
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            sys.exit('The servers cannot share an in-memory SQLite database, configure PostgreSQL.')
+
+        print(f'Seeding {args.posts} posts...')
+        token = str(AccessToken.for_user(seed(args.posts)))
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        env = server_environment(args.feed_cache)
+
+        print(f'\n{args.workers} workers per server, {args.requests} requests per level\n')
+        for stack, (application, worker_class, path) in STACKS.items():
+            server = start_server(application, worker_class, args.workers, args.port, env)
+            try:
+                for concurrency in args.concurrency:
+                    samples, errors, elapsed = asyncio.run(
+                        run_load(args.port, f'{path}?{args.params}', token, concurrency, args.requests)
+                    )
+                    row = format_row(f'{stack}, {concurrency} clients', summarize(samples))
+                    print(f'{row}   {len(samples) / elapsed:>8.1f} req/s   {len(errors)} errors')
+            finally:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == '__main__':
+    main()
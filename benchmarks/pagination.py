@@ -0,0 +1,93 @@
+"""
+Per-page latency of the post feed at increasing depths.
+
+Seeds a table of posts, then requests a page of the feed through the API at
+several depths with the keyset cursor, and with an OFFSET query over the
+same ordering for comparison. Keyset pages should cost the same at any depth.
+
+Usage:
+    python -m benchmarks.pagination --rows 1000000 --page-size 20
+"""
+import argparse
+from datetime import timedelta
+
+from benchmarks.harness import setup_django, test_database, measure, summarize, format_row
+from core.post.utils import auto_now_disabled
+
+
+def seed(rows, batch_size=10000):
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+    from core.post.models import Post
+
+    User = get_user_model()
+    users = User.objects.bulk_create([
+        User(email=f'bench{index}@example.com', username=f'bench{index}', password='!')
+        for index in range(100)
+    ])
+
+    # Several posts share each timestamp, as they would after a bulk import
+    start = timezone.now() - timedelta(days=365)
+    with auto_now_disabled(Post, 'created_datetime', 'updated_datetime'):
+        for offset in range(0, rows, batch_size):
+            Post.objects.bulk_create([
+                Post(
+                    user=users[index % len(users)],
+                    title=f'Post {index}',
+                    content='Benchmark content',
+                    created_datetime=start + timedelta(seconds=index // 4),
+                    updated_datetime=start + timedelta(seconds=index // 4),
+                )
+                for index in range(offset, min(offset + batch_size, rows))
+            ])
+    return users[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+
+    with test_database():
+        from base64 import b64encode
+        from urllib.parse import urlencode
+        from django.db import connection
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+        from core.post.models import Post
+        from core.post.pagination import PostCursorPagination
+
+        print(f'Seeding {args.rows} posts...')
+        user = seed(args.rows)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse('post-list')
+        ordering = PostCursorPagination.ordering
+        ordered = Post.objects.order_by(*ordering)
+
+        print(f'\nPage size {args.page_size}, {args.repeat} requests per depth\n')
+        for depth in (0, args.rows // 100, args.rows // 10, args.rows // 2, args.rows - args.page_size - 1):
+            params = {'page_size': args.page_size}
+            if depth:
+                # The cursor a client would hold after paging down to this depth
+                updated, post_id = ordered.values_list('updated_datetime', 'id')[depth - 1]
+                position = f'{updated.isoformat()}|{post_id}'
+                params['cursor'] = b64encode(urlencode({'p': position}).encode()).decode()
+
+            keyset = summarize(measure(lambda: client.get(url, params), args.repeat))
+            offset = summarize(measure(
+                lambda: list(ordered.select_related('user')[depth:depth + args.page_size]), args.repeat,
+            ))
+            print(format_row(f'keyset API, row {depth}', keyset))
+            print(format_row(f'OFFSET query, row {depth}', offset))
+
+
+if __name__ == '__main__':
+    main()
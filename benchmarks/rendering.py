@@ -0,0 +1,78 @@
+"""
+Time to render and parse feed pages with DRF's JSON renderer and parser and
+with the project ones, backed by orjson when it is installed.
+
+Seeds posts with the seed_benchmark_data command and builds list responses
+of each page size the way PostViewSet serializes them, then renders each
+page with DRF's JSONRenderer, core.renderers.JSONRenderer on the standard
+library and on orjson, and parses the result back with the matching parser.
+Pages of 1000 posts are beyond the max page size of the feed, but show how
+the costs grow.
+
+Usage:
+    python -m benchmarks.rendering --page-sizes 20 100 1000 --repeat 200
+"""
+import argparse
+import io
+
+from benchmarks.harness import setup_django, test_database, measure, summarize, format_row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--page-sizes', type=int, nargs='+', default=[20, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+
+    with test_database():
+        from django.core.management import call_command
+        from rest_framework import parsers, renderers
+        from rest_framework.test import APIRequestFactory
+        from core.parsers import JSONParser
+        from core.post.serializers import PostValuesSerializer
+        from core.post.viewsets import PostViewSet
+        from core.renderers import JSONRenderer, orjson
+        from core.user.models import User
+
+        posts = max(args.page_sizes)
+        call_command('seed_benchmark_data', users=100, posts=posts, likes=posts, comments=posts)
+
+        request = APIRequestFactory().get('/api/post/')
+        request.user = User.objects.filter(username__startswith='bench').first()
+        queryset = PostValuesSerializer.get_queryset(
+            PostViewSet(request=request, action='list', format_kwarg=None, kwargs={}).get_queryset()
+        )
+
+        backends = {
+            'drf': (renderers.JSONRenderer, parsers.JSONParser, None),
+            'core, json': (JSONRenderer, JSONParser, False),
+        }
+        if orjson is not None:
+            backends['core, orjson'] = (JSONRenderer, JSONParser, True)
+        else:
+            print('orjson is not installed')
+
+        for page_size in args.page_sizes:
+            rows = list(queryset.order_by('-updated_datetime', '-id')[:page_size])
+            page = {
+                'next': 'http://testserver/api/post/?cursor=cD0yMDI2LTAxLTAxVDAwJTNBMDAlM0EwMCUyQjAwJTNBMDA%3D',
+                'previous': None,
+                'results': PostValuesSerializer(rows).data,
+            }
+            print(f'\nPage of {page_size} posts, {len(renderers.JSONRenderer().render(page)) / 1024:.1f} KiB\n')
+
+            for name, (renderer_class, parser_class, fast) in backends.items():
+                renderer, parser = renderer_class(), parser_class()
+                if fast is not None:
+                    renderer.use_orjson = parser.use_orjson = fast
+                body = renderer.render(page)
+                render = summarize(measure(lambda: renderer.render(page), args.repeat))
+                parse = summarize(measure(lambda: parser.parse(io.BytesIO(body)), args.repeat))
+                print(format_row(f'{name} render', render))
+                print(format_row(f'{name} parse', parse))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Memory use and false positive rate of the revoked refresh token filter.
+
+Fills a BloomFilter with N random jti values, the way a worker holds them
+after syncing with the RevokedToken table, and compares its size with a
+Python set of the same ids. Then looks up N other ids, which is what every
+refresh of a token that was not revoked does: each false positive costs one
+database query.
+
+Does not touch the database.
+
+Usage:
+    python -m benchmarks.revocation --tokens 1000000 --error-rates 0.01 0.001 0.0001
+"""
+import argparse
+import sys
+import time
+from uuid import uuid4
+
+from benchmarks.harness import setup_django
+
+
+def set_size(values):
+    return sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tokens', type=int, default=1000000)
+    parser.add_argument('--error-rates', type=float, nargs='+', default=[0.01, 0.001, 0.0001])
+    args = parser.parse_args()
+
+    setup_django()
+    from core.authentication.revocation import BloomFilter
+
+    revoked = [uuid4().hex for _ in range(args.tokens)]
+    others = [uuid4().hex for _ in range(args.tokens)]
+    print(f'{args.tokens} revoked ids, set of ids: {set_size(set(revoked)) / 2 ** 20:.1f} MiB\n')
+
+    for error_rate in args.error_rates:
+        bloom = BloomFilter(args.tokens, error_rate)
+        start = time.perf_counter()
+        for jti in revoked:
+            bloom.add(jti)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        false_positives = sum(jti in bloom for jti in others)
+        lookup = (time.perf_counter() - start) / len(others) * 1e6
+
+        print(
+            f'error rate {error_rate:<8}  {bloom.nbytes / 2 ** 20:>6.2f} MiB   {bloom.hash_count:>2} hashes   '
+            f'build {build:>5.1f} s   lookup {lookup:>5.2f} us   '
+            f'false positives {false_positives / len(others):.5f} ({false_positives} queries)'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Time and memory to serialize a list of posts with PostSerializer and with
+PostValuesSerializer.
+
+Seeds N posts with the seed_benchmark_data command, then reads them with the
+annotated queryset of the post list and serializes them both ways: model
+instances through PostSerializer, and values_list() rows through
+PostValuesSerializer. Fetching and serializing are timed separately, the
+allocations are the peak memory traced by tracemalloc while fetching and
+serializing once. The rendered JSON of both is checked to be identical.
+
+Usage:
+    python -m benchmarks.serialization --posts 10000 --repeat 5
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.harness import setup_django, test_database
+
+
+def run(fetch, serialize, repeat):
+    """
+    Return the best fetch and serialize times in milliseconds, the peak
+    memory in KiB and the serialized data.
+    """
+    fetch_ms = serialize_ms = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = fetch()
+        middle = time.perf_counter()
+        data = serialize(rows)
+        end = time.perf_counter()
+        fetch_ms = min(fetch_ms, (middle - start) * 1000)
+        serialize_ms = min(serialize_ms, (end - middle) * 1000)
+
+    tracemalloc.start()
+    serialize(fetch())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return fetch_ms, serialize_ms, peak / 1024, data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    with test_database():
+        from django.core.management import call_command
+        from rest_framework.test import APIRequestFactory
+        from core.post.serializers import PostSerializer, PostValuesSerializer
+        from core.post.viewsets import PostViewSet
+        from core.renderers import JSONRenderer
+        from core.user.models import User
+
+        call_command('seed_benchmark_data', users=args.users, posts=args.posts, likes=args.posts, comments=args.posts)
+
+        request = APIRequestFactory().get('/api/post/')
+        request.user = User.objects.filter(username__startswith='bench').first()
+        queryset = PostViewSet(request=request, action='list', format_kwarg=None, kwargs={}).get_queryset()
+
+        results = {
+            'PostSerializer': run(
+                lambda: list(queryset.all()), lambda posts: PostSerializer(posts, many=True, context={}).data, args.repeat,
+            ),
+            'PostValuesSerializer': run(
+                lambda: list(PostValuesSerializer.get_queryset(queryset)),
+                lambda rows: PostValuesSerializer(rows).data, args.repeat,
+            ),
+        }
+
+        print(f'\n{args.posts} posts, best of {args.repeat}\n')
+        for name, (fetch_ms, serialize_ms, peak, _) in results.items():
+            print(
+                f'{name:<24} fetch {fetch_ms:>8.1f} ms   serialize {serialize_ms:>8.1f} ms   '
+                f'total {fetch_ms + serialize_ms:>8.1f} ms   peak {peak:>8.0f} KiB'
+            )
+
+        renderer = JSONRenderer()
+        identical = len({renderer.render(data) for *_, data in results.values()}) == 1
+        print(f'\nRendered output identical: {identical}')
+
+
+if __name__ == '__main__':
+    main()
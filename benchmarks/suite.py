@@ -0,0 +1,187 @@
+"""
+Latency, query count and peak memory of the main API endpoints.
+
+Seeds a test database with the seed_benchmark_data command, then drives the
+post list, retrieve and like endpoints, and login, register and refresh,
+through the Django test client. Each scenario records its latency
+percentiles, the queries of one request and the peak memory allocated by
+Python while serving a few requests, and the results are written to a JSON
+file together with the commit and the dataset size. Pass the file of an
+earlier run to --compare to print the change of each scenario.
+
+The feed cache is disabled unless --feed-cache is given, so the list
+scenarios measure the database path.
+
+Usage:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --posts 100000 --likes 500000 --compare results.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import tracemalloc
+from datetime import datetime, timezone
+from itertools import count
+
+from benchmarks.harness import setup_django, test_database, measure, summarize, format_row
+
+DATASET = ('users', 'posts', 'likes', 'comments')
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_scenarios(password):
+    """
+    Return the scenarios by name, each a function sending one request.
+    """
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from core.post.models import Post
+
+    User = get_user_model()
+    # The most active user and the most liked post of the dataset
+    viewer = User.objects.filter(username__startswith='bench').order_by('-post__id').first()
+    viral = Post.objects.order_by('-likes_count', 'pk').first()
+    refresh = str(RefreshToken.for_user(viewer))
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(viewer).access_token}')
+    anonymous = APIClient()
+    list_url = reverse('post-list')
+    like_url = reverse('post-like', args=[viral.pk])
+    liked = [False]
+    registered = count()
+
+    def post_like():
+        method = client.delete if liked[0] else client.put
+        liked[0] = not liked[0]
+        return method(like_url)
+
+    def register():
+        index = next(registered)
+        return anonymous.post(reverse('auth-register-list'), {
+            'email': f'suite{index}@example.com', 'username': f'suite{index}', 'password': 'suite-password-1',
+        })
+
+    return {
+        'post_list': lambda: client.get(list_url, {'page_size': 20}),
+        'post_list_by_author': lambda: client.get(list_url, {'page_size': 20, 'user__username': viewer.username}),
+        'post_list_comments_preview': lambda: client.get(list_url, {'page_size': 20, 'comments_preview': 3}),
+        'post_retrieve': lambda: client.get(reverse('post-detail', args=[viral.pk])),
+        'post_like': post_like,
+        'login': lambda: anonymous.post(reverse('auth-login-list'), {'email': viewer.email, 'password': password}),
+        'register': register,
+        'refresh': lambda: anonymous.post(reverse('auth-refresh-list'), {'refresh': refresh}),
+    }
+
+
+def run_scenario(send, repeat, memory_repeat):
+    from django.db import connection, reset_queries
+    from django.test.utils import CaptureQueriesContext
+
+    response = send()
+    if response.status_code >= 400:
+        raise RuntimeError(f'{response.status_code} {response.content[:200]!r}')
+
+    # Requests clear the query log when they start
+    reset_queries()
+    with CaptureQueriesContext(connection) as context:
+        send()
+    # Read before the next requests clear the log
+    queries = len(context.captured_queries)
+    samples = measure(send, repeat)
+
+    tracemalloc.start()
+    for _ in range(memory_repeat):
+        send()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {**summarize(samples), 'queries': queries, 'peak_memory_kib': peak / 1024}
+
+
+def compare(results, previous):
+    print(f'\nCompared with {previous.get("commit") or "previous run"}:')
+    for name, current in results['scenarios'].items():
+        before = previous.get('scenarios', {}).get(name)
+        if before is None:
+            continue
+        change = (current['p50'] - before['p50']) / before['p50'] * 100
+        print(
+            f'{name:<32} p50 {before["p50"]:>8.2f} -> {current["p50"]:>8.2f} ms ({change:+.1f}%)   '
+            f'queries {before["queries"]} -> {current["queries"]}'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--likes', type=int, default=50000)
+    parser.add_argument('--comments', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--memory-repeat', type=int, default=5, help='Requests traced for the peak memory')
+    parser.add_argument('--scenarios', nargs='+', help='Only run these scenarios')
+    parser.add_argument('--feed-cache', action='store_true', help='Keep the feed cache enabled')
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--compare', help='Results file of an earlier run')
+    args = parser.parse_args()
+
+    setup_django()
+
+    with test_database():
+        import django
+        from django.core.management import call_command
+        from django.db import connection
+        from core.post.cache import feed_cache
+
+        if not args.feed_cache:
+            feed_cache.timeout = 0
+
+        password = 'benchmark'
+        dataset = {name: getattr(args, name) for name in DATASET}
+        call_command('seed_benchmark_data', password=password, **dataset)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        results = {
+            'commit': git_commit(),
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'dataset': dataset,
+            'repeat': args.repeat,
+            'scenarios': {},
+        }
+
+        print(f'\n{args.repeat} requests per scenario\n')
+        for name, send in build_scenarios(password).items():
+            if args.scenarios and name not in args.scenarios:
+                continue
+            result = run_scenario(send, args.repeat, args.memory_repeat)
+            results['scenarios'][name] = result
+            print(f'{format_row(name, result)}   {result["queries"]:>3} queries   {result["peak_memory_kib"]:>8.1f} KiB')
+
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f'\nResults written to {args.output}')
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,12 @@
+import pytest
+from django.core.cache import caches
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Cached pages must not leak between tests, as each test rolls back its data.
+    """
+    for cache in caches.all():
+        cache.clear()
+    yield
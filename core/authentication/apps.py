@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class AuthenticationConfig(AppConfig):
     name = 'core.authentication'
+
+    def ready(self):
+        from core.authentication import schema, signals  # noqa: F401
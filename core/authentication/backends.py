@@ -0,0 +1,165 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from core.metrics import cache_counters
+from core.timing import timed
+from .cache import token_cache, get_user_cache_key
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication with an awaitable variant for async views.
+
+    Reading and verifying the token does not do any I/O, only the user
+    lookup goes through the async ORM.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found') from e
+
+        self.check_user(user, validated_token)
+        return user
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+    def check_user(self, user, validated_token):
+        """
+        Apply the checks JWTAuthentication.get_user() runs on a found user.
+        """
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+
+class CachedJWTAuthentication(AsyncJWTAuthentication):
+    """
+    JWT authentication that remembers verified tokens until they expire, see
+    TokenCache, and keeps a record of their user in the cache for
+    JWT_USER_CACHE_TIMEOUT seconds.
+
+    The record only holds the fields of user_fields read on the request
+    path: by the permissions, the views setting the author of a post, and
+    ProfilingMiddleware. The user built from it has the other fields
+    deferred, read from the database on access. The password hash is only
+    added when CHECK_REVOKE_TOKEN needs it, so it stays out of the shared
+    cache otherwise. Saving or deleting the user drops its record, changes
+    made with QuerySet.update() show up once the record expires.
+    """
+
+    user_fields = ('id', 'username', 'is_active', 'is_staff')
+    hit_counter, miss_counter = cache_counters('jwt_user')
+
+    def authenticate(self, request):
+        with timed('auth'):
+            return super().authenticate(request)
+
+    async def aauthenticate(self, request):
+        with timed('auth'):
+            return await super().aauthenticate(request)
+
+    def get_validated_token(self, raw_token):
+        digest = hashlib.sha256(raw_token).digest()
+        validated_token = token_cache.get(digest)
+        if validated_token is None:
+            validated_token = super().get_validated_token(raw_token)
+            token_cache.set(digest, validated_token, validated_token['exp'])
+        return validated_token
+
+    def get_user_cache_timeout(self):
+        return getattr(settings, 'JWT_USER_CACHE_TIMEOUT', 30)
+
+    def use_user_cache(self):
+        return bool(self.get_user_cache_timeout())
+
+    def get_user(self, validated_token):
+        if not self.use_user_cache():
+            return super().get_user(validated_token)
+
+        user_id = self.get_user_id(validated_token)
+        key = get_user_cache_key(user_id)
+        user = self.get_user_from_record(cache.get(key))
+        if user is not None:
+            self.hit_counter.inc()
+        else:
+            self.miss_counter.inc()
+            try:
+                user = self.user_model.objects.only(*self.get_user_fields()).get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found') from e
+            cache.set(key, self.get_user_record(user), self.get_user_cache_timeout())
+
+        self.check_user(user, validated_token)
+        return user
+
+    async def aget_user(self, validated_token):
+        if not self.use_user_cache():
+            return await super().aget_user(validated_token)
+
+        user_id = self.get_user_id(validated_token)
+        key = get_user_cache_key(user_id)
+        user = self.get_user_from_record(await cache.aget(key))
+        if user is not None:
+            self.hit_counter.inc()
+        else:
+            self.miss_counter.inc()
+            try:
+                user = await self.user_model.objects.only(*self.get_user_fields()).aget(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found') from e
+            await cache.aset(key, self.get_user_record(user), self.get_user_cache_timeout())
+
+        self.check_user(user, validated_token)
+        return user
+
+    def get_user_fields(self):
+        names = set(self.user_fields)
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # check_user() compares the token claim with the password hash
+            names.add('password')
+        # In model order, from_db() maps partial values onto the fields in that order
+        return [field.attname for field in self.user_model._meta.concrete_fields if field.attname in names]
+
+    def get_user_record(self, user):
+        return {field: getattr(user, field) for field in self.get_user_fields()}
+
+    def get_user_from_record(self, record):
+        """
+        Return the user of a record, or None when there is no record or it
+        was cached with other fields, e.g. before CHECK_REVOKE_TOKEN changed.
+        """
+        fields = self.get_user_fields()
+        if not isinstance(record, dict) or list(record) != fields:
+            return None
+        return self.user_model.from_db(router.db_for_read(self.user_model), fields, list(record.values()))
@@ -0,0 +1,61 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from core.metrics import cache_counters
+
+
+class TokenCache:
+    """
+    Per process LRU of verified access tokens, keyed by the digest of the
+    raw token. Each token is kept until it expires, so requests repeating
+    a token skip its signature check.
+    """
+
+    hit_counter, miss_counter = cache_counters('jwt_token')
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, digest):
+        with self._lock:
+            entry = self._tokens.get(digest)
+            if entry is None:
+                self.miss_counter.inc()
+                return None
+
+            token, expires_at = entry
+            if expires_at <= time.time():
+                del self._tokens[digest]
+                self.miss_counter.inc()
+                return None
+
+            self._tokens.move_to_end(digest)
+            self.hit_counter.inc()
+            return token
+
+    def set(self, digest, token, expires_at):
+        if not self.max_size:
+            return
+
+        with self._lock:
+            self._tokens[digest] = (token, expires_at)
+            self._tokens.move_to_end(digest)
+            while len(self._tokens) > self.max_size:
+                self._tokens.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+
+    def __len__(self):
+        return len(self._tokens)
+
+
+def get_user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+token_cache = TokenCache(max_size=getattr(settings, 'JWT_TOKEN_CACHE_SIZE', 10000))
@@ -0,0 +1,100 @@
+import threading
+import time
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from core.metrics import PASSWORD_HASH_REJECTED, PASSWORD_HASH_SECONDS, PASSWORD_HASH_WAIT_SECONDS
+
+
+class PasswordHashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many password checks in progress, try again shortly.'
+    default_code = 'password_hashing_unavailable'
+    # Seconds sent in the Retry-After header
+    wait = 1
+
+
+class HashingGate:
+    """
+    Bound the number of passwords hashed at the same time by a worker.
+
+    Password hashing is CPU bound, a burst of sign-ins would otherwise keep
+    every thread busy hashing and stall the other requests. Callers wait up
+    to queue_timeout seconds for a free slot, then get a 503 instead of
+    piling up.
+
+    Hash time and queue wait are recorded in-process, see stats(), and in
+    the Prometheus metrics.
+    """
+
+    def __init__(self, concurrency=2, queue_timeout=2.0):
+        self.concurrency = concurrency
+        self.queue_timeout = queue_timeout
+        self._semaphore = threading.BoundedSemaphore(concurrency)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.clear_stats()
+
+    def run(self, func, *args, **kwargs):
+        """
+        Call func once a slot is free, or raise PasswordHashingUnavailable.
+        """
+        # A check may rehash the password with the current hasher, which
+        # runs in the slot already held by the thread
+        if getattr(self._local, 'active', False):
+            return func(*args, **kwargs)
+
+        queued = time.perf_counter()
+        if not self._semaphore.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self._rejected += 1
+            PASSWORD_HASH_REJECTED.inc()
+            raise PasswordHashingUnavailable()
+
+        started = time.perf_counter()
+        self._local.active = True
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._local.active = False
+            self._semaphore.release()
+            self._record(started - queued, time.perf_counter() - started)
+
+    def _record(self, wait, duration):
+        PASSWORD_HASH_WAIT_SECONDS.observe(wait)
+        PASSWORD_HASH_SECONDS.observe(duration)
+        with self._lock:
+            self._count += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self._hash_total += duration
+            self._hash_max = max(self._hash_max, duration)
+
+    def clear_stats(self):
+        with self._lock:
+            self._count = 0
+            self._rejected = 0
+            self._wait_total = self._wait_max = 0.0
+            self._hash_total = self._hash_max = 0.0
+
+    def stats(self):
+        """
+        Return the hash and queue wait times of this worker, in seconds.
+        """
+        with self._lock:
+            return {
+                'count': self._count,
+                'rejected': self._rejected,
+                'hash_seconds_total': self._hash_total,
+                'hash_seconds_max': self._hash_max,
+                'hash_seconds_mean': self._hash_total / self._count if self._count else 0.0,
+                'wait_seconds_total': self._wait_total,
+                'wait_seconds_max': self._wait_max,
+                'wait_seconds_mean': self._wait_total / self._count if self._count else 0.0,
+            }
+
+
+password_hashing = HashingGate(
+    concurrency=getattr(settings, 'PASSWORD_HASHING_CONCURRENCY', 2),
+    queue_timeout=getattr(settings, 'PASSWORD_HASHING_QUEUE_TIMEOUT', 2.0),
+)
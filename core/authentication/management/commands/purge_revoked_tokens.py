@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.authentication.models import RevokedToken
+
+
+class Command(BaseCommand):
+    """
+    Delete the revoked refresh tokens that have expired since, they would
+    be rejected by their exp claim anyway.
+
+    Usage:
+    - python manage.py purge_revoked_tokens
+    """
+
+    help = 'Delete expired RevokedToken rows.'
+
+
+    def handle(self, *args, **options):
+        deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired revoked tokens.'))
@@ -0,0 +1,18 @@
+from django.db import models
+
+
+class RevokedToken(models.Model):
+    """
+    A refresh token revoked before its expiry, by its jti claim.
+
+    Rows are only needed until the token expires, the purge_revoked_tokens
+    management command deletes the expired ones.
+    """
+
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    # Workers sync their revocation filter from the latest rows
+    revoked_datetime = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.jti
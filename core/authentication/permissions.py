@@ -50,8 +50,8 @@ class UserPermission(BasePermission):
             if request.method in ['GET', 'HEAD', 'OPTIONS']:
                 return True
 
-            # Allow like action for all authenticated users
-            if view.basename == 'post' and view.action == 'like':
+            # Allow like and comment actions for all authenticated users
+            if view.basename == 'post' and view.action in ('like', 'comments'):
                 return True
 
             # For write operations (POST, PUT, PATCH, DELETE), check ownership
@@ -0,0 +1,181 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from core.authentication.models import RevokedToken
+from core.metrics import REVOCATION_CHECKS
+
+
+class BloomFilter:
+    """
+    Set membership in a fixed bit array, with false positives but no false
+    negatives. Sized for capacity keys at the given false positive rate,
+    adding more keys raises the rate.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing, the k positions come from two 64 bit hashes
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + index * second) % self.size for index in range(self.hash_count)]
+
+    def add(self, key):
+        """
+        Add key and return whether it was not already reported present.
+        """
+        added = False
+        for position in self._positions(key):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        return len(self.bits)
+
+
+class RevocationFilter:
+    """
+    Per process Bloom filter of the revoked refresh token ids, so checking a
+    token that was not revoked does not query the database. Only ids the
+    filter reports are looked up in the RevokedToken table.
+
+    The filter is synced with the rows revoked since the previous sync at
+    most every sync_interval seconds, so a token revoked by another worker
+    may still be refreshed by this one during that time. It is rebuilt from
+    the unexpired rows every rebuild_interval seconds, which drops expired
+    ids, and when it grows past its capacity.
+    """
+
+    # Rows are synced by revoked_datetime, which is set before the insert
+    # commits and by the clock of the revoking server
+    sync_overlap = timedelta(seconds=10)
+    rebuild_interval = 3600
+    # Checks answered by the filter, by the database, and database checks
+    # of ids that were not revoked
+    filtered_counter = REVOCATION_CHECKS.labels('filter')
+    database_counter = REVOCATION_CHECKS.labels('database')
+    false_positive_counter = REVOCATION_CHECKS.labels('false_positive')
+
+    def __init__(self, capacity=100000, error_rate=0.001, sync_interval=1.0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._filter = None
+            self._synced_at = None
+            self._checked_at = self._built_at = 0.0
+            self._checks = self._database_checks = self._false_positives = 0
+
+    def is_revoked(self, jti):
+        self.sync()
+        with self._lock:
+            self._checks += 1
+            if jti not in self._filter:
+                self.filtered_counter.inc()
+                return False
+            self._database_checks += 1
+        self.database_counter.inc()
+
+        revoked = RevokedToken.objects.filter(jti=jti).exists()
+        if not revoked:
+            with self._lock:
+                self._false_positives += 1
+            self.false_positive_counter.inc()
+        return revoked
+
+    def revoke(self, jti, expires_at):
+        RevokedToken.objects.bulk_create([RevokedToken(jti=jti, expires_at=expires_at)], ignore_conflicts=True)
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    def sync(self):
+        if self._filter is not None and time.monotonic() - self._checked_at < self.sync_interval:
+            return
+
+        # One thread syncs, the others keep checking against the current
+        # filter, a rebuild takes seconds for a million ids
+        if not self._sync_lock.acquire(blocking=self._filter is None):
+            return
+        try:
+            now = time.monotonic()
+            if self._filter is not None and now - self._checked_at < self.sync_interval:
+                return
+
+            synced_at = timezone.now()
+            if (
+                self._filter is None
+                or len(self._filter) > self._filter.capacity
+                or now - self._built_at > self.rebuild_interval
+            ):
+                jtis = list(RevokedToken.objects.filter(expires_at__gt=synced_at).values_list('jti', flat=True))
+                # Leaves room to grow until the next rebuild
+                bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+                for jti in jtis:
+                    bloom.add(jti)
+                # Ids revoked here during the build are read again by the
+                # next sync
+                with self._lock:
+                    self._filter = bloom
+                self._built_at = now
+            else:
+                jtis = list(RevokedToken.objects.filter(
+                    revoked_datetime__gte=self._synced_at - self.sync_overlap,
+                ).values_list('jti', flat=True))
+                with self._lock:
+                    for jti in jtis:
+                        self._filter.add(jti)
+            self._synced_at = synced_at
+            self._checked_at = now
+        finally:
+            self._sync_lock.release()
+
+    def stats(self):
+        """
+        Return the size of the filter and how often it sent checks to the
+        database in this worker.
+        """
+        with self._lock:
+            return {
+                'revoked': len(self._filter) if self._filter is not None else 0,
+                'filter_bytes': self._filter.nbytes if self._filter is not None else 0,
+                'checks': self._checks,
+                'database_checks': self._database_checks,
+                'false_positives': self._false_positives,
+            }
+
+
+revoked_tokens = RevocationFilter(
+    capacity=getattr(settings, 'REVOKED_TOKEN_FILTER_CAPACITY', 100000),
+    error_rate=getattr(settings, 'REVOKED_TOKEN_FILTER_ERROR_RATE', 0.001),
+    sync_interval=getattr(settings, 'REVOKED_TOKEN_SYNC_INTERVAL', 1.0),
+)
@@ -0,0 +1,10 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """
+    Document CachedJWTAuthentication as the jwtAuth bearer scheme of
+    simplejwt, which drf-spectacular only matches on JWTAuthentication itself.
+    """
+
+    target_class = 'core.authentication.backends.CachedJWTAuthentication'
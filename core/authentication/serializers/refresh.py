@@ -0,0 +1,17 @@
+from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from core.authentication.tokens import RevocableRefreshToken
+
+class RefreshSerializer(TokenRefreshSerializer):
+    token_class = RevocableRefreshToken
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+
+    def validate(self, attrs):
+        attrs['refresh'] = RevocableRefreshToken(attrs['refresh'])
+        return attrs
+
+    def save(self):
+        self.validated_data['refresh'].revoke()
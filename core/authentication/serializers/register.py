@@ -1,26 +1,44 @@
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
 class RegisterSerializer(serializers.ModelSerializer):
+    # Uniqueness is enforced by the database constraints, see create()
+    unique_error_messages = {
+        'email': 'A user with this email already exists.',
+        'username': 'A user with this username already exists.',
+    }
+
     class Meta:
         model = User
         fields = ('id', 'email', 'username', 'first_name', 'last_name', 'password')
         extra_kwargs = {
             'password': {'write_only': True},
-            'email': {
-                'error_messages': {
-                    'unique': 'A user with this email already exists.'
-                }
-            },
-            'username': {
-                'error_messages': {
-                    'unique': 'A user with this username already exists.'
-                }
-            }
+            'email': {'validators': []},
+            'username': {'validators': []},
         }
 
     def create(self, validated_data):
-        return User.objects.create_user(**validated_data)
+        """
+        Insert the user without checking uniqueness first, and report a
+        violated unique constraint like the unique validators would.
+        """
+        validated_data['email'] = User.objects.normalize_email(validated_data['email'])
+        try:
+            with transaction.atomic():
+                return User.objects.create_user(**validated_data)
+        except IntegrityError:
+            errors = self.get_unique_errors(validated_data)
+            if not errors:
+                raise
+            raise serializers.ValidationError(errors)
 
+    def get_unique_errors(self, validated_data):
+        # Only runs after a failed insert
+        return {
+            field: [message]
+            for field, message in self.unique_error_messages.items()
+            if User.objects.filter(**{field: validated_data[field]}).exists()
+        }
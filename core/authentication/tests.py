@@ -1,7 +1,28 @@
+import json
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APITestCase, APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from django.contrib.auth import get_user_model
+from core.authentication.backends import CachedJWTAuthentication
+from core.authentication.cache import TokenCache, get_user_cache_key, token_cache
+from core.authentication.hashing import HashingGate, PasswordHashingUnavailable, password_hashing
+from core.authentication.models import RevokedToken
+from core.authentication.revocation import BloomFilter, revoked_tokens
 
 User = get_user_model()
 
@@ -71,3 +92,396 @@ class AuthenticationTests(APITestCase):
         response = self.client.post(self.refresh_url, data)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('access', response.data)
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user(email='cached@example.com', username='cacheduser', password='password123')
+        self.token = str(AccessToken.for_user(self.user))
+        self.authentication = CachedJWTAuthentication()
+
+    def authenticate(self, token=None):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token or self.token}')
+        return self.authentication.authenticate(request)
+
+    def test_repeated_token_skips_verification_and_query(self):
+        with self.assertNumQueries(1):
+            user, _ = self.authenticate()
+        self.assertEqual(user, self.user)
+
+        with mock.patch.object(JWTAuthentication, 'get_validated_token') as verify:
+            with self.assertNumQueries(0):
+                user, validated_token = self.authenticate()
+        verify.assert_not_called()
+        self.assertEqual(str(validated_token['user_id']), str(self.user.id))
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.username, 'cacheduser')
+        self.assertTrue(user.is_active)
+
+    def test_cached_record_is_slim(self):
+        self.authenticate()
+        record = cache.get(get_user_cache_key(self.user.pk))
+        self.assertEqual(list(record), ['id', 'username', 'is_active', 'is_staff'])
+        self.assertNotIn('password', record)
+
+    def test_cached_user_loads_other_fields_on_access(self):
+        self.authenticate()
+        user, _ = self.authenticate()
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'cached@example.com')
+
+    def test_request_path_reads_only_cached_fields(self):
+        self.client.get(reverse('post-list'), HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        with mock.patch.object(User, 'refresh_from_db', autospec=True, side_effect=User.refresh_from_db) as load:
+            self.client.get(reverse('post-list'), HTTP_AUTHORIZATION=f'Bearer {self.token}')
+            response = self.client.post(
+                reverse('post-list'), {'title': 'Title', 'content': 'Content'}, HTTP_AUTHORIZATION=f'Bearer {self.token}',
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        load.assert_not_called()
+
+    def test_record_of_other_fields_is_a_miss(self):
+        cache.set(get_user_cache_key(self.user.pk), {'id': self.user.pk, 'username': 'stale'})
+        with self.assertNumQueries(1):
+            user, _ = self.authenticate()
+        self.assertEqual(user.username, 'cacheduser')
+
+    def test_password_is_cached_for_the_revoke_check(self):
+        # The SIMPLE_JWT setting is read once, override_settings() would not reach it
+        with mock.patch.object(api_settings, 'CHECK_REVOKE_TOKEN', True):
+            token = str(AccessToken.for_user(self.user))
+            self.authenticate(token)
+            self.assertIn('password', cache.get(get_user_cache_key(self.user.pk)))
+            with self.assertNumQueries(0):
+                user, _ = self.authenticate(token)
+            self.assertEqual(user.pk, self.user.pk)
+
+            self.user.set_password('changed123')
+            self.user.save()
+            with self.assertRaises(AuthenticationFailed):
+                self.authenticate(token)
+
+    def test_saving_cached_user_keeps_other_fields(self):
+        self.authenticate()
+        user, _ = self.authenticate()
+        user.username = 'renamed'
+        user.save()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.username, 'renamed')
+        self.assertEqual(self.user.email, 'cached@example.com')
+        self.assertTrue(self.user.check_password('password123'))
+
+    def test_saved_user_is_reloaded(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(reverse('post-list'), HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        self.authenticate()
+        self.user.delete()
+
+        response = self.client.get(reverse('post-list'), HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_invalid_token_is_not_cached(self):
+        response = self.client.get(reverse('post-list'), HTTP_AUTHORIZATION='Bearer invalid')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(len(token_cache), 0)
+
+    @override_settings(JWT_USER_CACHE_TIMEOUT=0)
+    def test_user_cache_can_be_disabled(self):
+        self.authenticate()
+        with self.assertNumQueries(1):
+            self.authenticate()
+
+
+class TokenCacheTests(APITestCase):
+    def test_least_recently_used_token_is_evicted(self):
+        cache = TokenCache(max_size=2)
+        expires_at = time.time() + 60
+        cache.set(b'a', 'token a', expires_at)
+        cache.set(b'b', 'token b', expires_at)
+        cache.get(b'a')
+        cache.set(b'c', 'token c', expires_at)
+
+        self.assertEqual(cache.get(b'a'), 'token a')
+        self.assertIsNone(cache.get(b'b'))
+        self.assertEqual(cache.get(b'c'), 'token c')
+
+    def test_expired_token_is_dropped(self):
+        cache = TokenCache()
+        cache.set(b'a', 'token a', time.time() - 1)
+        self.assertIsNone(cache.get(b'a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_disabled_cache_keeps_nothing(self):
+        cache = TokenCache(max_size=0)
+        cache.set(b'a', 'token a', time.time() + 60)
+        self.assertIsNone(cache.get(b'a'))
+
+
+class HashingGateTests(APITestCase):
+    def test_waiting_caller_is_rejected_after_queue_timeout(self):
+        gate = HashingGate(concurrency=1, queue_timeout=0.05)
+        started, release = threading.Event(), threading.Event()
+
+        def hold():
+            started.set()
+            release.wait(5)
+
+        thread = threading.Thread(target=gate.run, args=(hold,))
+        thread.start()
+        started.wait(5)
+        try:
+            with self.assertRaises(PasswordHashingUnavailable):
+                gate.run(lambda: None)
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual(gate.run(lambda: 'hashed'), 'hashed')
+        stats = gate.stats()
+        self.assertEqual(stats['count'], 2)
+        self.assertEqual(stats['rejected'], 1)
+        self.assertGreater(stats['hash_seconds_max'], 0)
+
+    def test_nested_run_uses_the_held_slot(self):
+        gate = HashingGate(concurrency=1, queue_timeout=0.05)
+        self.assertEqual(gate.run(lambda: gate.run(lambda: 'rehashed')), 'rehashed')
+        self.assertEqual(gate.stats()['count'], 1)
+
+    def test_user_hashing_goes_through_the_gate(self):
+        password_hashing.clear_stats()
+        user = User.objects.create_user(email='gate@example.com', username='gateuser', password='password123')
+        self.assertTrue(user.check_password('password123'))
+        self.assertEqual(password_hashing.stats()['count'], 2)
+
+
+class LoginThrottleTests(APITestCase):
+    def setUp(self):
+        self.login_url = reverse('auth-login-list')
+        self.user = User.objects.create_user(email='throttle@example.com', username='throttleuser', password='password123')
+
+    def login(self, password, email='throttle@example.com', address='10.0.0.1'):
+        return self.client.post(self.login_url, {'email': email, 'password': password}, REMOTE_ADDR=address)
+
+    @override_settings(LOGIN_FAILURE_LIMIT=3)
+    def test_repeated_failures_are_rejected_before_hashing(self):
+        for _ in range(3):
+            self.assertEqual(self.login('wrong').status_code, status.HTTP_401_UNAUTHORIZED)
+
+        password_hashing.clear_stats()
+        response = self.login('password123')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(password_hashing.stats()['count'], 0)
+
+    @override_settings(LOGIN_FAILURE_LIMIT=3)
+    def test_failures_are_counted_per_email_across_addresses(self):
+        for index in range(3):
+            self.login('wrong', address=f'10.0.1.{index}')
+
+        self.assertEqual(self.login('password123', address='10.0.2.1').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        response = self.login('password123', email='other@example.com', address='10.0.2.1')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(LOGIN_FAILURE_LIMIT=3)
+    def test_success_clears_email_failures(self):
+        self.login('wrong', address='10.0.0.1')
+        self.login('wrong', address='10.0.0.2')
+        self.assertEqual(self.login('password123', address='10.0.0.3').status_code, status.HTTP_200_OK)
+
+        self.login('wrong', address='10.0.0.4')
+        self.assertEqual(self.login('password123', address='10.0.0.5').status_code, status.HTTP_200_OK)
+
+    @override_settings(LOGIN_FAILURE_LIMIT=3)
+    def test_forwarded_for_is_ignored_without_trusted_proxies(self):
+        for index in range(3):
+            self.client.post(
+                self.login_url, {'email': f'user{index}@example.com', 'password': 'wrong'},
+                REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'192.0.2.{index}',
+            )
+
+        response = self.client.post(
+            self.login_url, {'email': 'other@example.com', 'password': 'wrong'},
+            REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='192.0.2.99',
+        )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(LOGIN_FAILURE_LIMIT=3, LOGIN_TRUSTED_PROXIES=1)
+    def test_client_address_appended_by_trusted_proxy(self):
+        # The client sends a different first address each time, the proxy appends the real one
+        for index in range(3):
+            self.client.post(
+                self.login_url, {'email': f'user{index}@example.com', 'password': 'wrong'},
+                REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'192.0.2.{index}, 198.51.100.7',
+            )
+
+        response = self.client.post(
+            self.login_url, {'email': 'other@example.com', 'password': 'wrong'},
+            REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='198.51.100.8',
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post(
+            self.login_url, {'email': 'other@example.com', 'password': 'wrong'},
+            REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='192.0.2.99, 198.51.100.7',
+        )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_busy_hashing_returns_503(self):
+        for _ in range(password_hashing.concurrency):
+            password_hashing._semaphore.acquire()
+        try:
+            with mock.patch.object(password_hashing, 'queue_timeout', 0.01):
+                response = self.login('password123')
+        finally:
+            for _ in range(password_hashing.concurrency):
+                password_hashing._semaphore.release()
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+
+
+class RegistrationQueryTests(APITestCase):
+    def setUp(self):
+        self.register_url = reverse('auth-register-list')
+        self.user = User.objects.create_user(email='taken@example.com', username='taken', password='password123')
+
+    def register(self, email, username):
+        data = {'email': email, 'username': username, 'password': 'newpassword123'}
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.register_url, data)
+        statements = [
+            query['sql'] for query in context.captured_queries
+            if not query['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT'))
+        ]
+        return response, statements
+
+    def test_registration_is_a_single_insert(self):
+        response, statements = self.register('new@example.com', 'newuser')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(statements), 1)
+        self.assertTrue(statements[0].startswith('INSERT'))
+
+    def test_duplicate_email(self):
+        response, _ = self.register('taken@example.com', 'newuser')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'email': ['A user with this email already exists.']})
+
+    def test_duplicate_email_with_other_domain_case(self):
+        response, _ = self.register('taken@EXAMPLE.com', 'newuser')
+        self.assertEqual(response.data, {'email': ['A user with this email already exists.']})
+
+    def test_duplicate_username(self):
+        response, _ = self.register('new@example.com', 'taken')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'username': ['A user with this username already exists.']})
+
+    def test_duplicate_email_and_username(self):
+        response, _ = self.register('taken@example.com', 'taken')
+        self.assertEqual(set(response.data), {'email', 'username'})
+        self.assertEqual(User.objects.count(), 1)
+
+
+class RevocationTests(APITestCase):
+    def setUp(self):
+        revoked_tokens.clear()
+        self.login_url = reverse('auth-login-list')
+        self.refresh_url = reverse('auth-refresh-list')
+        self.logout_url = reverse('auth-logout-list')
+        self.user = User.objects.create_user(email='revoke@example.com', username='revokeuser', password='password123')
+        response = self.client.post(self.login_url, {'email': 'revoke@example.com', 'password': 'password123'})
+        self.refresh = response.data['refresh']
+
+    def refresh_queries(self, refresh):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.refresh_url, {'refresh': refresh})
+        return response, [query['sql'] for query in context.captured_queries if 'revokedtoken' in query['sql']]
+
+    def test_logout_revokes_refresh_token(self):
+        response = self.client.post(self.logout_url, {'refresh': self.refresh})
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertTrue(RevokedToken.objects.exists())
+
+        response = self.client.post(self.refresh_url, {'refresh': self.refresh})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post(self.logout_url, {'refresh': self.refresh})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_invalid_token(self):
+        response = self.client.post(self.logout_url, {'refresh': 'invalid'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(RevokedToken.objects.exists())
+
+    def test_unrevoked_token_skips_database_between_syncs(self):
+        response, queries = self.refresh_queries(self.refresh)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Building the filter
+        self.assertEqual(len(queries), 1)
+
+        response, queries = self.refresh_queries(self.refresh)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, [])
+        self.assertEqual(revoked_tokens.stats()['database_checks'], 0)
+
+    def test_token_revoked_by_another_worker_after_sync(self):
+        self.client.post(self.refresh_url, {'refresh': self.refresh})
+        token = RefreshToken(self.refresh)
+        RevokedToken.objects.create(jti=token['jti'], expires_at=timezone.now() + timedelta(days=1))
+
+        with mock.patch.object(revoked_tokens, 'sync_interval', 0):
+            response = self.client.post(self.refresh_url, {'refresh': self.refresh})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotation_revokes_previous_token(self):
+        # api_settings is rebound, not reloaded, on setting changes
+        with mock.patch.object(api_settings, 'ROTATE_REFRESH_TOKENS', True):
+            response = self.client.post(self.refresh_url, {'refresh': self.refresh})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response.data['refresh'], self.refresh)
+
+            response = self.client.post(self.refresh_url, {'refresh': self.refresh})
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_purge_expired_revoked_tokens(self):
+        RevokedToken.objects.create(jti='expired', expires_at=timezone.now() - timedelta(minutes=1))
+        RevokedToken.objects.create(jti='active', expires_at=timezone.now() + timedelta(days=1))
+        call_command('purge_revoked_tokens', stdout=StringIO())
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['active'])
+
+
+class BloomFilterTests(APITestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.01)
+        keys = [f'key{index}' for index in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        # Keys colliding with earlier ones are not counted
+        self.assertGreater(len(bloom), 980)
+        self.assertFalse(bloom.add('key0'))
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter(10000, 0.01)
+        for index in range(10000):
+            bloom.add(f'revoked{index}')
+        false_positives = sum(f'other{index}' in bloom for index in range(10000))
+        self.assertLess(false_positives / 10000, 0.02)
+        self.assertEqual(bloom.hash_count, 7)
+
+
+
+class SchemaTests(APITestCase):
+    def test_jwt_security_scheme(self):
+        response = self.client.get(reverse('schema'), {'format': 'json'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        schema = json.loads(response.content)
+
+        self.assertEqual(schema['components']['securitySchemes']['jwtAuth']['scheme'], 'bearer')
+        security = schema['paths']['/api/post/']['get']['security']
+        self.assertIn({'jwtAuth': []}, security)
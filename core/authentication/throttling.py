@@ -0,0 +1,74 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+class LoginFailureThrottle(BaseThrottle):
+    """
+    Reject sign-ins from a client address, or for an email, with too many
+    recent failures. Throttles run before the view, so rejected attempts
+    never reach password hashing.
+
+    Failures are counted in the cache for LOGIN_FAILURE_WINDOW seconds from
+    the first one, and a successful sign-in clears the count of its email.
+
+    The client address is REMOTE_ADDR, unless LOGIN_TRUSTED_PROXIES is set
+    to the number of proxies in front of the application, each appending
+    the address it received the request from to X-Forwarded-For. Addresses
+    left of those are sent by the client and ignored, so rotating the
+    header does not get around the limit.
+    """
+
+    cache_prefix = 'auth:failures'
+
+    def get_limit(self):
+        return getattr(settings, 'LOGIN_FAILURE_LIMIT', 5)
+
+    def get_window(self):
+        return getattr(settings, 'LOGIN_FAILURE_WINDOW', 900)
+
+    def get_trusted_proxies(self):
+        return getattr(settings, 'LOGIN_TRUSTED_PROXIES', 0)
+
+    def get_ident(self, request):
+        remote_addr = request.META.get('REMOTE_ADDR', '')
+        proxies = self.get_trusted_proxies()
+        if not proxies:
+            return remote_addr
+        addresses = [address.strip() for address in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')]
+        # The closest proxy appended the address of the client, or of the next proxy
+        if len(addresses) < proxies or not addresses[-proxies]:
+            return remote_addr
+        return addresses[-proxies]
+
+    def get_cache_keys(self, request):
+        keys = [f'{self.cache_prefix}:ip:{self.get_ident(request)}']
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if isinstance(email, str) and email.strip():
+            digest = hashlib.sha256(email.strip().lower().encode()).hexdigest()
+            keys.append(f'{self.cache_prefix}:email:{digest}')
+        return keys
+
+    def allow_request(self, request, view):
+        limit = self.get_limit()
+        if not limit:
+            return True
+        counts = cache.get_many(self.get_cache_keys(request))
+        return all(count < limit for count in counts.values())
+
+    def wait(self):
+        return self.get_window()
+
+    def record_failure(self, request):
+        for key in self.get_cache_keys(request):
+            # Starts the window on the first failure only
+            cache.add(key, 0, self.get_window())
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Expired in between
+                cache.set(key, 1, self.get_window())
+
+    def reset(self, request):
+        cache.delete_many(self.get_cache_keys(request)[1:])
@@ -0,0 +1,23 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from core.authentication.revocation import revoked_tokens
+
+
+class RevocableRefreshToken(RefreshToken):
+    """
+    Refresh token rejected once revoked, see RevocationFilter.
+    """
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        if revoked_tokens.is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is revoked'))
+
+    def revoke(self):
+        revoked_tokens.revoke(self.payload[api_settings.JTI_CLAIM], datetime_from_epoch(self.payload['exp']))
+
+    # Called by TokenRefreshSerializer when BLACKLIST_AFTER_ROTATION is set
+    blacklist = revoke
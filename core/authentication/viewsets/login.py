@@ -1,11 +1,14 @@
 from rest_framework import viewsets, permissions, status
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
 from core.authentication.serializers.login import LoginSerializer
+from core.authentication.throttling import LoginFailureThrottle
 
 class LoginViewSet(viewsets.ViewSet):
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (LoginFailureThrottle,)
     http_method_names = ['post']
     serializer_class = LoginSerializer
 
@@ -16,4 +19,9 @@ class LoginViewSet(viewsets.ViewSet):
             serializer.is_valid(raise_exception=True)
         except TokenError as e:
             raise InvalidToken(e.args[0])
+        except AuthenticationFailed:
+            LoginFailureThrottle().record_failure(request)
+            raise
+
+        LoginFailureThrottle().reset(request)
         return Response(serializer.validated_data, status=status.HTTP_200_OK)
@@ -0,0 +1,21 @@
+from rest_framework import viewsets, permissions, status
+from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
+from core.authentication.serializers.refresh import LogoutSerializer
+
+class LogoutViewSet(viewsets.ViewSet):
+    """
+    Revoke a refresh token. Its access tokens stay valid until they expire.
+    """
+    permission_classes = (permissions.AllowAny,)
+    http_method_names = ['post']
+    serializer_class = LogoutSerializer
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.serializer_class(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        serializer.save()
+        return Response(status=status.HTTP_204_NO_CONTENT)
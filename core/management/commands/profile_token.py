@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.profiling import create_profile_token
+
+
+class Command(BaseCommand):
+    """
+    Print a signed value for the X-Profile header, which has any request
+    carrying it profiled by ProfilingMiddleware, without staff credentials.
+
+    Usage:
+    - python manage.py profile_token
+    - curl -H "X-Profile: $(python manage.py profile_token --memory)" ...
+    """
+
+    help = 'Print a signed X-Profile header value.'
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--memory', action='store_true', help='Also trace allocations with tracemalloc.')
+
+
+    def handle(self, *args, **options):
+        self.stdout.write(create_profile_token(memory=options['memory']))
+        if options['verbosity'] > 1:
+            self.stderr.write(f'Valid for {getattr(settings, "PROFILING_TOKEN_MAX_AGE", 3600)} seconds.')
@@ -0,0 +1,234 @@
+import json
+import logging
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from core.authentication.backends import CachedJWTAuthentication
+from core.metrics import observe_request
+from core.profiling import RequestProfile, read_profile_token
+from core.timing import RequestTiming
+
+logger = logging.getLogger('core.timing')
+
+
+class ServerTimingMiddleware:
+    """
+    Report where the time of each request went: SQL, authentication,
+    serialization and rendering, in a Server-Timing header and in one
+    structured log line keyed by the DRF basename and action of the view.
+
+    Requests running more than REQUEST_TIMING_SLOW_QUERIES queries or
+    taking more than REQUEST_TIMING_SLOW_MS milliseconds are logged as a
+    warning with their SQL, without the query parameters.
+
+    The duration, status and queries of each request are also recorded in
+    the Prometheus metrics of core.metrics, by route, unless METRICS_ENABLED
+    is off.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    # Reported with timed() by the authentication, serializers and renderer
+    sections = ('auth', 'serialize', 'render')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.header = getattr(settings, 'REQUEST_TIMING_HEADER', True)
+        self.slow_queries = getattr(settings, 'REQUEST_TIMING_SLOW_QUERIES', 50)
+        self.slow_ms = getattr(settings, 'REQUEST_TIMING_SLOW_MS', 1000)
+        self.metrics = getattr(settings, 'METRICS_ENABLED', True)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        timing = RequestTiming()
+        token = timing.activate()
+        try:
+            response = self.get_response(request)
+        finally:
+            timing.deactivate(token)
+        self.report(request, response, timing)
+        return response
+
+    async def __acall__(self, request):
+        timing = RequestTiming()
+        token = timing.activate()
+        try:
+            response = await self.get_response(request)
+        finally:
+            timing.deactivate(token)
+        self.report(request, response, timing)
+        return response
+
+    def get_view_key(self, request):
+        """
+        Return the basename and action of a viewset, or the URL name and
+        None for other views.
+        """
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return None, None
+
+        basename = getattr(match.func, 'initkwargs', {}).get('basename')
+        actions = getattr(match.func, 'actions', None)
+        if basename is None:
+            return match.view_name, None
+        return basename, actions.get(request.method.lower()) if actions else None
+
+    def get_route(self, view, action):
+        if view is None:
+            return 'unmatched'
+        return f'{view}.{action}' if action else view
+
+    def report(self, request, response, timing):
+        elapsed = timing.elapsed
+        total_ms = elapsed * 1000
+        db_ms = timing.sql_seconds * 1000
+        view, action = self.get_view_key(request)
+        if self.metrics:
+            observe_request(
+                self.get_route(view, action), request.method, response.status_code,
+                elapsed, timing.queries, timing.sql_seconds,
+            )
+
+        section_ms = {name: timing.sections.get(name, 0.0) * 1000 for name in self.sections}
+
+        if self.header:
+            entries = [f'db;dur={db_ms:.2f};desc="{timing.queries} queries"']
+            entries += [f'{name};dur={section_ms[name]:.2f}' for name in self.sections if name in timing.sections]
+            entries.append(f'total;dur={total_ms:.2f}')
+            response['Server-Timing'] = ', '.join(entries)
+
+        slow = (
+            (self.slow_queries and timing.queries > self.slow_queries)
+            or (self.slow_ms and total_ms > self.slow_ms)
+        )
+        if not slow and not logger.isEnabledFor(logging.INFO):
+            return
+
+        fields = {
+            'view': view,
+            'action': action,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'db_ms': round(db_ms, 2),
+            'queries': timing.queries,
+            **{f'{name}_ms': round(value, 2) for name, value in section_ms.items()},
+        }
+        logger.info(json.dumps(fields), extra={'request_timing': fields})
+
+        if slow:
+            statements = '\n'.join(
+                f'{seconds * 1000:.2f} ms: {sql}' for sql, seconds in timing.statements
+            )
+            logger.warning(
+                'Slow request %s %s (%s %s): %d queries in %.2f ms, %.2f ms total\n%s',
+                request.method, request.path, view, action, timing.queries, db_ms, total_ms, statements,
+                extra={'request_timing': fields},
+            )
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request with cProfile when it carries an X-Profile header,
+    either a token from the profile_token command, or 1 (or memory, to also
+    trace allocations with tracemalloc) sent by a staff user.
+
+    The report is stored in the cache for PROFILING_RESULT_TIMEOUT seconds
+    and served at /api/profile/<id>/, the id is sent in the X-Profile-Id
+    header and the slowest functions in X-Profile-Top. Fetching it takes a
+    token too. One request is profiled at a time, the others get an
+    X-Profile-Skipped: busy header instead. Requests without the header only
+    pay for its lookup.
+    """
+
+    sync_capable = True
+    async_capable = True
+    meta_key = 'HTTP_X_PROFILE'
+    staff_values = {'1': False, 'memory': True}
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.report_functions = getattr(settings, 'PROFILING_REPORT_FUNCTIONS', 40)
+        self.header_functions = getattr(settings, 'PROFILING_HEADER_FUNCTIONS', 5)
+        self.timeout = getattr(settings, 'PROFILING_RESULT_TIMEOUT', 600)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if self.meta_key not in request.META:
+            return self.get_response(request)
+
+        memory = self.get_memory_option(request)
+        if memory is None:
+            memory = self.staff_values.get(request.META[self.meta_key])
+            if memory is None or not self.is_staff(request):
+                return self.get_response(request)
+
+        with RequestProfile(memory) as profile:
+            response = self.get_response(request)
+        self.attach(response, profile)
+        return response
+
+    async def __acall__(self, request):
+        if self.meta_key not in request.META:
+            return await self.get_response(request)
+
+        memory = self.get_memory_option(request)
+        if memory is None:
+            memory = self.staff_values.get(request.META[self.meta_key])
+            if memory is None or not await self.ais_staff(request):
+                return await self.get_response(request)
+
+        # Only the event loop thread is profiled, not the ORM threads
+        profile = RequestProfile(memory)
+        response = await profile.run(self.get_response(request))
+        self.attach(response, profile)
+        return response
+
+    def get_memory_option(self, request):
+        """
+        Return whether a signed token asks for allocation tracking, or None
+        when the header is not a valid token.
+        """
+        options = read_profile_token(request.META[self.meta_key])
+        return None if options is None else bool(options.get('memory'))
+
+    def is_staff(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff:
+            return True
+        try:
+            result = CachedJWTAuthentication().authenticate(Request(request))
+        except APIException:
+            return False
+        return result is not None and result[0].is_staff
+
+    async def ais_staff(self, request):
+        if hasattr(request, 'auser') and (await request.auser()).is_staff:
+            return True
+        try:
+            result = await CachedJWTAuthentication().aauthenticate(Request(request))
+        except APIException:
+            return False
+        return result is not None and result[0].is_staff
+
+    def attach(self, response, profile):
+        if not profile.active:
+            response['X-Profile-Skipped'] = 'busy'
+            return
+        response['X-Profile-Id'] = profile.save(self.report_functions, self.timeout)
+        response['X-Profile-Top'] = ', '.join(
+            f'{label};dur={seconds * 1000:.2f}' for label, seconds in profile.top_functions(self.header_functions)
+        )
@@ -0,0 +1,26 @@
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+from core.renderers import JSONRenderer, orjson, use_orjson
+
+
+class JSONParser(parsers.JSONParser):
+    """
+    JSONParser decoding UTF-8 bodies with orjson when it is installed,
+    straight from the bytes without decoding them to a str first. orjson
+    rejects NaN and Infinity like DRF's strict parser, other encodings and
+    non strict parsing go through the standard library.
+    """
+
+    renderer_class = JSONRenderer
+    use_orjson = use_orjson()
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if not self.use_orjson or not self.strict or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
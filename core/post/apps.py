@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class PostConfig(AppConfig):
     name = 'core.post'
+
+    def ready(self):
+        from core.post import signals  # noqa: F401
@@ -0,0 +1,10 @@
+from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
+from .async_views import AsyncPostListView, AsyncPostDetailView, AsyncPostLikeView
+
+# Token authenticated like the DRF views, which are exempt from CSRF as well
+urlpatterns = [
+    path('post/', csrf_exempt(AsyncPostListView.as_view()), name='async-post-list'),
+    path('post/<int:pk>/', csrf_exempt(AsyncPostDetailView.as_view()), name='async-post-detail'),
+    path('post/<int:pk>/like/', csrf_exempt(AsyncPostLikeView.as_view()), name='async-post-like'),
+]
@@ -0,0 +1,209 @@
+"""
+Async variants of the post list, retrieve and like endpoints, served under
+/api/async/ next to the PostViewSet routes.
+
+The views reuse PostViewSet for everything that does not touch the
+database: queryset construction, filters, cursor pagination, permissions
+and serialization. Only the queries are run differently, with the async
+ORM. Under an ASGI server each request runs its queries in its own thread,
+so a slow query no longer holds a whole worker. Under WSGI these views
+still work, but without that benefit.
+
+The async list does not use the feed cache, each page is read from the
+database.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.shortcuts import aget_object_or_404
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from core.authentication.backends import CachedJWTAuthentication
+from core.renderers import JSONRenderer
+from .conditional import get_validators
+from .models import Like
+from .serializers import PostValuesSerializer
+from .viewsets import PostViewSet
+
+
+class AsyncPostView(View):
+    """
+    Authenticate the request, check the PostViewSet permissions and call the
+    async handler of the HTTP method with a PostViewSet set up for action.
+    """
+
+    # PostViewSet action served by the view
+    action = None
+    detail = False
+    authentication_class = CachedJWTAuthentication
+    renderer_class = JSONRenderer
+
+    async def dispatch(self, request, *args, **kwargs):
+        viewset = self.get_viewset(request, args, kwargs)
+        try:
+            await self.initial(viewset)
+            method = request.method.lower()
+            handler = getattr(self, method, None) if method in self.http_method_names else None
+            if handler is None:
+                raise MethodNotAllowed(request.method)
+            response = await handler(viewset, *args, **kwargs)
+        except Exception as exc:
+            response = viewset.handle_exception(exc)
+
+        if isinstance(response, Response):
+            response = self.finalize_response(response)
+        return response
+
+    def get_viewset(self, request, args, kwargs):
+        """
+        Wrap the request the way APIView.initialize_request() does and set up
+        a PostViewSet for it.
+        """
+        drf_request = Request(
+            request,
+            parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES],
+            authenticators=[self.authentication_class()],
+        )
+        drf_request.accepted_renderer = self.renderer_class()
+        drf_request.accepted_media_type = self.renderer_class.media_type
+        return PostViewSet(
+            request=drf_request, args=args, kwargs=kwargs, format_kwarg=None,
+            action=self.action, basename='post', detail=self.detail, headers={},
+        )
+
+    async def initial(self, viewset):
+        """
+        Authenticate the request with the async ORM and check permissions.
+        """
+        request = viewset.request
+        authenticator = request.authenticators[0]
+        try:
+            user_auth_tuple = await authenticator.aauthenticate(request)
+        except Exception:
+            # Errors are rendered with the WWW-Authenticate header, like on
+            # the sync stack, from an unauthenticated request
+            request._not_authenticated()
+            raise
+
+        # Set what Request._authenticate() would, without calling the sync
+        # authenticate() again
+        if user_auth_tuple is None:
+            request._not_authenticated()
+        else:
+            request._authenticator = authenticator
+            request.user, request.auth = user_auth_tuple
+
+        viewset.check_permissions(request)
+
+    def finalize_response(self, response):
+        """
+        Render a DRF response to a plain HttpResponse, which the ASGI handler
+        returns as is instead of rendering it in a worker thread.
+        """
+        rendered = HttpResponse(
+            self.renderer_class().render(response.data),
+            status=response.status_code,
+            content_type=self.renderer_class.media_type,
+        )
+        for header, value in response.items():
+            if header.lower() != 'content-type':
+                rendered[header] = value
+        return rendered
+
+    async def get_object(self, viewset, pk):
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        post = await aget_object_or_404(queryset, pk=pk)
+        viewset.check_object_permissions(viewset.request, post)
+        return post
+
+    async def attach_comment_previews(self, viewset, posts):
+        count = viewset.get_comments_preview()
+        if count:
+            queryset = viewset.get_comment_previews_queryset(posts, count)
+            comments = [comment async for comment in queryset] if queryset is not None else []
+            viewset.set_comment_previews(posts, comments)
+
+    def get_not_modified_response(self, viewset, validators):
+        """
+        Return a 304 for a matching conditional request, or None. Called
+        before comment previews are fetched and anything is serialized.
+        """
+        request = viewset.request
+        if viewset.is_conditional_request(request):
+            return viewset.get_not_modified_response(request, *validators)
+        return None
+
+    def get_validated_response(self, viewset, data, validators):
+        response = data if isinstance(data, Response) else Response(data)
+        viewset.set_validators(response, *validators)
+        return response
+
+
+class AsyncPostListView(AsyncPostView):
+    action = 'list'
+    http_method_names = ['get', 'head']
+
+    async def get(self, viewset):
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        if viewset.use_values_serializer():
+            queryset = PostValuesSerializer.get_queryset(queryset)
+        paginator = viewset.paginator
+        page_queryset = paginator.get_page_queryset(queryset, viewset.request, viewset)
+        page = paginator.paginate_results([post async for post in page_queryset])
+
+        rows = [viewset.get_validator_row(post) for post in page]
+        validators = get_validators(rows, paginator.has_next, paginator.has_previous)
+        not_modified = self.get_not_modified_response(viewset, validators)
+        if not_modified is not None:
+            return not_modified
+
+        await self.attach_comment_previews(viewset, page)
+        serializer = viewset.get_serializer(page, many=True)
+        return self.get_validated_response(viewset, paginator.get_paginated_response(serializer.data), validators)
+
+
+class AsyncPostDetailView(AsyncPostView):
+    action = 'retrieve'
+    detail = True
+    http_method_names = ['get', 'head']
+
+    async def get(self, viewset, pk):
+        post = await self.get_object(viewset, pk)
+        validators = get_validators([viewset.get_validator_row(post)])
+        not_modified = self.get_not_modified_response(viewset, validators)
+        if not_modified is not None:
+            return not_modified
+
+        await self.attach_comment_previews(viewset, [post])
+        return self.get_validated_response(viewset, viewset.get_serializer(post).data, validators)
+
+
+class AsyncPostLikeView(AsyncPostView):
+    action = 'like'
+    detail = True
+    http_method_names = ['post', 'put', 'delete']
+
+    async def post(self, viewset, pk):
+        """
+        Toggle the like of the requesting user and return the post.
+        """
+        post = await self.get_object(viewset, pk)
+        # The like writes run in a transaction, which needs a sync thread
+        liked, likes_count = await sync_to_async(Like.objects.toggle)(viewset.request.user, post)
+
+        post.likes_count = likes_count
+        post.is_liked = liked
+        return Response(viewset.get_serializer(post).data)
+
+    async def put(self, viewset, pk):
+        post = await self.get_object(viewset, pk)
+        liked, likes_count = await sync_to_async(Like.objects.like)(viewset.request.user, post)
+        return Response({'liked': liked, 'likes_count': likes_count}, status=status.HTTP_200_OK)
+
+    async def delete(self, viewset, pk):
+        post = await self.get_object(viewset, pk)
+        liked, likes_count = await sync_to_async(Like.objects.unlike)(viewset.request.user, post)
+        return Response({'liked': liked, 'likes_count': likes_count}, status=status.HTTP_200_OK)
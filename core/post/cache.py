@@ -0,0 +1,95 @@
+import hashlib
+import threading
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from core.metrics import cache_counters
+
+
+class FeedCache:
+    """
+    Cache of the first page of the post feed for each filter combination.
+
+    Entries hold the part of the page shared by every user; the like state of
+    the requesting user is overlaid afterwards. Every entry key embeds a
+    generation number stored in the cache itself, so invalidate() drops all
+    pages at once, from any worker sharing the cache backend.
+    """
+
+    # Requests with any other query parameter, such as a cursor, are not cached
+    cached_params = frozenset({'user__username', 'user__username__icontains', 'page_size', 'comments_preview'})
+    generation_key = 'post-feed:generation'
+    hit_counter, miss_counter = cache_counters('post_feed')
+
+    def __init__(self, alias='default', timeout=60):
+        self.alias = alias
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_key(self, request):
+        """
+        Return the cache key of the request, or None when it is not cacheable.
+        """
+        params = request.query_params
+        if not self.timeout or not set(params).issubset(self.cached_params):
+            return None
+
+        # Links in the page are absolute, so the host is part of the key
+        query = urlencode(sorted((name, value) for name in params for value in params.getlist(name)))
+        digest = hashlib.md5(f'{request.get_host()}?{query}'.encode(), usedforsecurity=False).hexdigest()
+        return f'post-feed:{self.get_generation()}:{digest}'
+
+    def get(self, key):
+        entry = self.cache.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        (self.miss_counter if entry is None else self.hit_counter).inc()
+        return entry
+
+    def set(self, key, entry):
+        self.cache.set(key, entry, self.timeout)
+
+    def get_generation(self):
+        generation = self.cache.get(self.generation_key)
+        if generation is None:
+            # Start from the clock, so a lost generation never revives old entries
+            self.cache.add(self.generation_key, time.time_ns(), None)
+            generation = self.cache.get(self.generation_key)
+        return generation
+
+    def invalidate(self):
+        try:
+            self.cache.incr(self.generation_key)
+        except ValueError:
+            # No generation yet, so there is nothing to invalidate
+            pass
+
+    def clear_stats(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0,
+            }
+
+
+feed_cache = FeedCache(
+    alias=getattr(settings, 'POST_FEED_CACHE_ALIAS', 'default'),
+    timeout=getattr(settings, 'POST_FEED_CACHE_TIMEOUT', 60),
+)
@@ -0,0 +1,92 @@
+import hashlib
+from django.http import HttpResponseNotModified
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+def get_validators(rows, *flags):
+    """
+    Return the weak ETag and the Last-Modified timestamp of a list of
+    validator rows, as built by ConditionalGetMixin.get_validator_row().
+    """
+    digest = hashlib.md5(repr((sorted(rows), flags)).encode(), usedforsecurity=False).hexdigest()
+    etag = 'W/' + quote_etag(digest)
+    last_modified = max((row[1] for row in rows), default=None)
+    # HTTP dates have a one second resolution
+    return etag, last_modified and int(last_modified.timestamp())
+
+
+class ConditionalGetMixin:
+    """
+    Weak ETag and Last-Modified headers for list pages and retrieve.
+
+    Conditional requests (If-None-Match / If-Modified-Since) first run a cheap
+    validator query fetching only validator_fields, and get a 304 without
+    anything being serialized when the content did not change. Other requests
+    compute the validators from the objects they already loaded.
+
+    The first two validator fields must be the primary key and the last
+    modification time. Changes that do not update that time, such as new
+    likes, only change the ETag, so clients should prefer If-None-Match.
+    """
+
+    validator_fields = ('pk', 'updated_datetime')
+
+    def get_validator_row(self, instance):
+        """
+        Return the validator_fields values of a loaded object.
+        """
+        return (instance.pk, instance.updated_datetime)
+
+    def list(self, request, *args, **kwargs):
+        if self.is_conditional_request(request) and self.paginator is not None:
+            queryset = self.filter_queryset(self.get_queryset())
+            page_queryset = self.paginator.get_page_queryset(queryset, request, self)
+            if page_queryset is not None:
+                rows = self.paginator.paginate_results(list(page_queryset.values_list(*self.validator_fields)))
+                validators = get_validators(rows, self.paginator.has_next, self.paginator.has_previous)
+                not_modified = self.get_not_modified_response(request, *validators)
+                if not_modified is not None:
+                    return not_modified
+
+        response = super().list(request, *args, **kwargs)
+        page = getattr(self.paginator, 'page', None)
+        if page is not None:
+            rows = [self.get_validator_row(instance) for instance in page]
+            self.set_validators(response, *get_validators(rows, self.paginator.has_next, self.paginator.has_previous))
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.is_conditional_request(request):
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = self.filter_queryset(self.get_queryset()).filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+            rows = list(queryset.values_list(*self.validator_fields))
+            # Missing objects go through the regular 404 below
+            if rows:
+                not_modified = self.get_not_modified_response(request, *get_validators(rows))
+                if not_modified is not None:
+                    return not_modified
+
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        response = Response(serializer.data)
+        self.set_validators(response, *get_validators([self.get_validator_row(instance)]))
+        return response
+
+    def is_conditional_request(self, request):
+        return 'HTTP_IF_NONE_MATCH' in request.META or 'HTTP_IF_MODIFIED_SINCE' in request.META
+
+    def get_not_modified_response(self, request, etag, last_modified):
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if isinstance(response, HttpResponseNotModified):
+            self.set_validators(response, etag, last_modified)
+        return response
+
+    def set_validators(self, response, etag, last_modified):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # The like state depends on the user, shared caches must revalidate per token
+        patch_vary_headers(response, ['Authorization'])
+        patch_cache_control(response, private=True, no_cache=True)
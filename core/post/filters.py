@@ -1,5 +1,7 @@
 import django_filters
+from rest_framework.filters import BaseFilterBackend
 from .models import Post
+from .search import get_search_backend
 
 
 class PostFilter(django_filters.FilterSet):
@@ -16,3 +18,63 @@ class PostFilter(django_filters.FilterSet):
         fields = {
             'user__username': ['exact', 'icontains'],
         }
+
+
+class PostExportFilter(PostFilter):
+    """
+    PostFilter with a range of last update times, for the export.
+
+    Usage:
+    - Posts updated since a date: ?since=2026-01-01
+    - Posts updated in a range: ?since=2026-01-01T00:00:00Z&until=2026-02-01T00:00:00Z
+    """
+
+    since = django_filters.IsoDateTimeFilter(field_name='updated_datetime', lookup_expr='gte')
+    until = django_filters.IsoDateTimeFilter(field_name='updated_datetime', lookup_expr='lt')
+
+    class Meta(PostFilter.Meta):
+        pass
+
+
+class PostSearchFilter(BaseFilterBackend):
+    """
+    Full-text search over post title and content.
+
+    Usage:
+    - ?search=django rest
+
+    Results are ordered by relevance when the search backend ranks them,
+    and keep working with cursor pagination.
+    """
+
+    search_param = 'search'
+    # Ties in relevance are broken by the unique id for the keyset cursor
+    ranked_ordering = ('-search_rank', '-id')
+
+    def get_search_terms(self, request):
+        return request.query_params.get(self.search_param, '').strip()
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return get_search_backend().search(queryset, terms)
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Picked up by the cursor pagination in place of its default ordering.
+        """
+        if self.get_search_terms(request) and get_search_backend().ranked:
+            return self.ranked_ordering
+        return None
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.search_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Full-text search over post title and content.',
+                'schema': {'type': 'string'},
+            },
+        ]
@@ -0,0 +1,375 @@
+import csv
+import io
+import json
+import os
+import time
+from collections import Counter
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from core.post.models import Post, Like, Comment
+from core.post.utils import auto_now_disabled
+from core.user.models import User
+
+
+class Command(BaseCommand):
+    """
+    Load posts, likes and comments from a JSON Lines file.
+
+    Each line is an object with a type of post, like or comment, lines
+    without one are posts, so the output of GET /api/post/export/ can be
+    loaded as is:
+    - post: username, title, content, and optionally id, created_datetime and updated_datetime
+    - like: username, post id, and optionally created_datetime
+    - comment: username, post id, comment, and optionally created_datetime
+
+    Usernames are resolved to user ids once per batch and remembered for
+    the rest of the file. Lines of unknown users or posts, and incomplete
+    lines, are skipped. Posts with an id already taken and likes already
+    stored are skipped too, and reported apart from the rows inserted. Each
+    batch is inserted in one transaction with bulk_create(), or with COPY on
+    PostgreSQL, and Post.likes_count is recomputed for the posts that got
+    likes.
+
+    After each batch the byte offset of the next line is written to the
+    --checkpoint file, a crashed ingest resumes from there when run again
+    with the same file, or from any line start with --offset.
+
+    Usage:
+    - python manage.py ingest_jsonl data.jsonl
+    - python manage.py ingest_jsonl data.jsonl --batch-size 10000 --checkpoint data.offset
+    - python manage.py ingest_jsonl data.jsonl --offset 1048576
+    """
+
+    help = 'Load posts, likes and comments from a JSON Lines file in batches.'
+
+    types = ('post', 'like', 'comment')
+    models = {'post': Post, 'like': Like, 'comment': Comment}
+    # Columns inserted for each type, the ones of posts with an id add it
+    fields = {
+        'post': ('user', 'title', 'content', 'created_datetime', 'updated_datetime'),
+        'like': ('user', 'post', 'created_datetime', 'like'),
+        'comment': ('user', 'post', 'comment', 'created_datetime'),
+    }
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='JSON Lines file.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Number of lines inserted per transaction.')
+        parser.add_argument('--offset', type=int, help='Byte offset of the line to start from.')
+        parser.add_argument('--checkpoint', help='File keeping the offset of the next line, read when --offset is not given.')
+        parser.add_argument('--no-copy', action='store_true', help='Insert with bulk_create() on PostgreSQL too.')
+
+
+    def handle(self, *args, **options):
+        path = options['path']
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive.')
+        self.checkpoint = options['checkpoint']
+        self.verbosity = options['verbosity']
+        # copy_expert() is specific to psycopg2
+        self.use_copy = not options['no_copy'] and connection.vendor == 'postgresql' and connection.Database.__name__ == 'psycopg2'
+
+        offset = options['offset']
+        if offset is None:
+            offset = self.read_checkpoint()
+
+        self.user_ids = {}
+        self.counts = Counter()
+        self.invalid = 0
+        self.existing = 0
+        self.explicit_ids = False
+        started = time.perf_counter()
+
+        with open(path, 'rb') as file:
+            self.seek(file, offset)
+            self.offset = offset
+            try:
+                batch = []
+                for line in file:
+                    batch.append(line)
+                    if len(batch) >= batch_size:
+                        self.ingest_batch(batch, started)
+                        batch = []
+                if batch:
+                    self.ingest_batch(batch, started)
+            except BaseException:
+                self.stderr.write(f'Stopped, resume with --offset {self.offset}.')
+                raise
+
+        if self.explicit_ids:
+            # Later posts must not be given the ids of the ingested ones
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), [Post]):
+                    cursor.execute(sql)
+
+        elapsed = time.perf_counter() - started
+        total = sum(self.counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Ingested {self.counts["post"]} posts, {self.counts["like"]} likes and {self.counts["comment"]} comments, '
+            f'skipped {self.invalid} invalid lines and {self.existing} existing rows, '
+            f'in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} rows/s).'
+        ))
+
+
+    def read_checkpoint(self):
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return 0
+        with open(self.checkpoint) as file:
+            try:
+                return int(file.read().strip() or 0)
+            except ValueError:
+                raise CommandError(f'{self.checkpoint} does not hold a byte offset.')
+
+
+    def write_checkpoint(self):
+        if not self.checkpoint:
+            return
+        # Replaced in one step, so a crash never leaves a partial offset
+        temporary = f'{self.checkpoint}.tmp'
+        with open(temporary, 'w') as file:
+            file.write(str(self.offset))
+        os.replace(temporary, self.checkpoint)
+
+
+    def seek(self, file, offset):
+        if offset < 0:
+            raise CommandError('--offset must not be negative.')
+        if offset:
+            file.seek(offset - 1)
+            if file.read(1) != b'\n':
+                raise CommandError(f'Offset {offset} is not at the start of a line.')
+
+
+    def ingest_batch(self, lines, started):
+        rows = {name: [] for name in self.types}
+        for line in lines:
+            row = self.parse_line(line)
+            if row is None:
+                if line.strip():
+                    self.invalid += 1
+            else:
+                rows[row.pop('type')].append(row)
+
+        with transaction.atomic():
+            self.resolve_users(rows)
+            self.insert_posts(rows['post'])
+            self.insert_replies(rows['like'], rows['comment'])
+
+        self.offset += sum(len(line) for line in lines)
+        self.write_checkpoint()
+        if self.verbosity > 1:
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'Offset {self.offset}: {sum(self.counts.values()) / elapsed:.0f} rows/s')
+
+
+    def parse_line(self, line):
+        """
+        Return the cleaned fields of a line, or None if it is invalid.
+        """
+        try:
+            row = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(row, dict):
+            return None
+
+        row_type = row.get('type', 'post')
+        username = row.get('username')
+        if row_type not in self.types or not isinstance(username, str) or not username:
+            return None
+
+        created = self.parse_datetime(row.get('created_datetime'))
+        if created is None:
+            return None
+        values = {'type': row_type, 'username': username, 'created_datetime': created}
+
+        if row_type == 'post':
+            updated = self.parse_datetime(row['updated_datetime']) if 'updated_datetime' in row else created
+            title = self.clean_text(row.get('title'), Post, 'title')
+            content = self.clean_text(row.get('content'), Post, 'content')
+            post_id = row.get('id')
+            if updated is None or title is None or content is None or not self.is_id(post_id, optional=True):
+                return None
+            values.update(title=title, content=content, updated_datetime=updated)
+            if post_id is not None:
+                values['id'] = post_id
+            return values
+
+        if not self.is_id(row.get('post')):
+            return None
+        values['post'] = row['post']
+        if row_type == 'comment':
+            values['comment'] = self.clean_text(row.get('comment'), Comment, 'comment')
+            if values['comment'] is None:
+                return None
+        else:
+            values['like'] = True
+        return values
+
+
+    def parse_datetime(self, value):
+        """
+        Return an aware datetime, now when value is missing, or None when it
+        is invalid.
+        """
+        if value is None:
+            return timezone.now()
+        if not isinstance(value, str):
+            return None
+        try:
+            parsed = parse_datetime(value)
+        except ValueError:
+            return None
+        if parsed is None:
+            return None
+        return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+    def clean_text(self, value, model, field):
+        if not isinstance(value, str) or not value or len(value) > model._meta.get_field(field).max_length:
+            return None
+        return value
+
+
+    def is_id(self, value, optional=False):
+        if value is None:
+            return optional
+        return type(value) is int and value > 0
+
+
+    def resolve_users(self, rows):
+        """
+        Replace the usernames of rows with user ids, dropping the rows of
+        unknown users. Usernames not seen before are fetched in one query.
+        """
+        unknown = {row['username'] for name in self.types for row in rows[name]} - self.user_ids.keys()
+        if unknown:
+            found = dict(User.objects.filter(username__in=unknown).values_list('username', 'pk'))
+            for username in unknown:
+                self.user_ids[username] = found.get(username)
+
+        for name in self.types:
+            valid = []
+            for row in rows[name]:
+                row['user'] = self.user_ids[row.pop('username')]
+                if row['user'] is None:
+                    self.invalid += 1
+                else:
+                    valid.append(row)
+            rows[name] = valid
+
+
+    def insert_posts(self, rows):
+        with_id = [row for row in rows if 'id' in row]
+        without_id = [row for row in rows if 'id' not in row]
+        if with_id:
+            self.explicit_ids = True
+            self.insert('post', with_id, ('id', *self.fields['post']))
+        if without_id:
+            self.insert('post', without_id, self.fields['post'])
+
+
+    def insert_replies(self, likes, comments):
+        """
+        Insert the likes and comments of posts that exist, and update the
+        likes count of the posts that got likes.
+        """
+        post_ids = {row['post'] for row in likes} | {row['post'] for row in comments}
+        existing = set(Post.objects.filter(pk__in=post_ids).values_list('pk', flat=True)) if post_ids else set()
+
+        for name, rows in (('like', likes), ('comment', comments)):
+            valid = [row for row in rows if row['post'] in existing]
+            self.invalid += len(rows) - len(valid)
+            if valid:
+                self.insert(name, valid, self.fields[name])
+
+        liked_ids = {row['post'] for row in likes if row['post'] in existing}
+        if liked_ids:
+            likes_count = Coalesce(Subquery(
+                Like.objects.filter(post=OuterRef('pk')).order_by()
+                .values('post').annotate(count=Count('pk')).values('count')
+            ), 0)
+            Post.objects.filter(pk__in=liked_ids).update(likes_count=likes_count)
+
+
+    def insert(self, name, rows, fields):
+        """
+        Insert rows skipping the ones conflicting with stored rows, and count
+        the rows actually inserted.
+        """
+        model = self.models[name]
+        if self.use_copy:
+            inserted = self.copy(model, fields, rows)
+        else:
+            # bulk_create(ignore_conflicts=True) does not tell which rows it
+            # skipped, count the stored rows they could conflict with instead
+            stored = self.get_conflicting_rows(name, rows, fields)
+            before = stored.count() if stored is not None else 0
+            objects = [model(**{self.get_attname(model, field): row[field] for field in fields}) for row in rows]
+            # Keep the timestamps of the file rather than the auto_now ones
+            with auto_now_disabled(model, *(field for field in fields if field.endswith('_datetime'))):
+                model.objects.bulk_create(objects, ignore_conflicts=True)
+            inserted = stored.count() - before if stored is not None else len(rows)
+        self.counts[name] += inserted
+        self.existing += len(rows) - inserted
+
+
+    def get_conflicting_rows(self, name, rows, fields):
+        """
+        Return a queryset of every stored row that rows could conflict with,
+        or None when they cannot conflict: comments and posts without an id
+        only have the generated primary key as unique column.
+        """
+        if name == 'post' and 'id' in fields:
+            return Post.objects.filter(pk__in={row['id'] for row in rows})
+        if name == 'like':
+            # Unique on (post, user), counted on the post index
+            return Like.objects.filter(post__in={row['post'] for row in rows})
+        return None
+
+
+    def get_attname(self, model, field):
+        return model._meta.get_field(field).attname
+
+
+    def copy(self, model, fields, rows):
+        """
+        COPY rows into a temporary table, then move them to the table of
+        model skipping conflicts, which COPY alone cannot. Return the number
+        of rows inserted.
+
+        Only used on PostgreSQL with psycopg2, its tests are skipped on
+        other databases.
+        """
+        opts = model._meta
+        quote = connection.ops.quote_name
+        table = quote(opts.db_table)
+        staging = quote(f'ingest_{opts.db_table}')
+        columns = ', '.join(quote(opts.get_field(field).column) for field in fields)
+
+        buffer = io.StringIO()
+        # Empty strings are quoted, COPY would read them as NULL otherwise
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        for row in rows:
+            writer.writerow([
+                value.isoformat() if isinstance(value, datetime) else value
+                for value in (row[field] for field in fields)
+            ])
+        buffer.seek(0)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE TEMPORARY TABLE {staging} AS SELECT {columns} FROM {table} WITH NO DATA')
+            cursor.cursor.copy_expert(f'COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+            cursor.execute(f'INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} ON CONFLICT DO NOTHING')
+            inserted = cursor.rowcount
+            cursor.execute(f'DROP TABLE {staging}')
+        return inserted
+
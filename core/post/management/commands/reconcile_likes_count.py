@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from core.post.models import Post, Like
+
+
+class Command(BaseCommand):
+    """
+    Recompute the denormalized Post.likes_count from the Like rows.
+
+    Counters can drift after bulk imports, manual SQL or cascading deletes
+    of users, which remove Like rows without going through PostViewSet.like.
+
+    Usage:
+    - Report and repair: python manage.py reconcile_likes_count
+    - Only report drift: python manage.py reconcile_likes_count --dry-run
+    """
+
+    help = 'Recompute Post.likes_count in batches and report drifted counters.'
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of posts checked per query.')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without updating any post.')
+
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        checked = drifted = total_drift = 0
+        last_id = 0
+
+        # Walk the table by primary key so each batch is an index range scan
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .annotate(actual=Count('like'))
+                .values_list('pk', 'likes_count', 'actual')[:batch_size]
+            )
+            if not batch:
+                break
+
+            last_id = batch[-1][0]
+            checked += len(batch)
+
+            stale_ids = []
+            for post_id, stored, actual in batch:
+                if stored != actual:
+                    stale_ids.append(post_id)
+                    total_drift += abs(stored - actual)
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'Post {post_id}: stored {stored}, actual {actual}')
+
+            drifted += len(stale_ids)
+            if stale_ids and not dry_run:
+                self.repair(stale_ids)
+
+        action = 'Found' if dry_run else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} posts. {action} {drifted} drifted counters (total drift {total_drift}).'
+        ))
+
+
+    def repair(self, post_ids):
+        """
+        Recount in the UPDATE itself, so likes toggled since the batch was
+        read are not overwritten with a stale value.
+        """
+        counts = Like.objects.filter(post=OuterRef('pk')).values('post').annotate(total=Count('pk')).values('total')
+        with transaction.atomic():
+            Post.objects.filter(pk__in=post_ids).update(likes_count=Coalesce(Subquery(counts), 0))
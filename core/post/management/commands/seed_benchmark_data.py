@@ -0,0 +1,168 @@
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from core.post.models import Post, Like, Comment
+from core.post.utils import auto_now_disabled
+from core.user.models import User
+
+
+class Command(BaseCommand):
+    """
+    Generate a synthetic dataset of users, posts, likes and comments for
+    benchmarks.
+
+    Activity follows Zipf-like distributions: a few users write most posts
+    and a few viral posts get most likes and comments, the long tail gets
+    little. Rows are inserted with bulk_create() and Post.likes_count is
+    set from the generated likes. The same --seed gives the same dataset.
+
+    Generated users are named <prefix><n> with emails <prefix><n>@example.com
+    and all share the password given by --password.
+
+    Usage:
+    - python manage.py seed_benchmark_data
+    - python manage.py seed_benchmark_data --users 10000 --posts 1000000 --likes 5000000 --clear
+    """
+
+    help = 'Generate users, posts, likes and comments with skewed distributions.'
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--likes', type=int, default=50000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument('--skew', type=float, default=1.1, help='Zipf exponent, 0 spreads activity uniformly.')
+        parser.add_argument('--days', type=int, default=365, help='Posts are spread over this many past days.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000, help='Number of rows inserted per query.')
+        parser.add_argument('--prefix', default='bench', help='Username prefix of the generated users.')
+        parser.add_argument('--password', default='benchmark')
+        parser.add_argument('--clear', action='store_true', help='Delete previously generated users and their data first.')
+
+
+    def handle(self, *args, **options):
+        users, posts = options['users'], options['posts']
+        if options['likes'] > users * posts:
+            raise CommandError('Cannot generate more likes than users times posts.')
+        if (options['likes'] or options['comments'] or posts) and not users:
+            raise CommandError('Generating posts, likes or comments needs at least one user.')
+
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        prefix = options['prefix']
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            if options['clear']:
+                deleted, _ = User.objects.filter(username__startswith=prefix, email__endswith='@example.com').delete()
+                self.stdout.write(f'Deleted {deleted} rows of a previous dataset.')
+
+            user_ids = self.create_users(users, prefix, options['password'])
+
+            authors = self.sample(user_ids, posts, options['skew'])
+            # Popularity ranks are shuffled, so viral posts are spread in
+            # time, the same posts get most likes and comments
+            post_weights = self.weights(posts, options['skew'])
+            likes = self.generate_likes(post_weights, user_ids, options['likes'], options['skew'])
+            likes_count = Counter(post_index for post_index, _ in likes)
+            post_ids = self.create_posts(authors, likes_count, options['days'])
+
+            self.insert(Like, (
+                Like(post_id=post_ids[post_index], user_id=user_id, like=True) for post_index, user_id in likes
+            ))
+            commenters = self.sample(user_ids, options['comments'], options['skew'])
+            commented = self.random.choices(post_ids, cum_weights=post_weights, k=options['comments'])
+            self.insert(Comment, (
+                Comment(post_id=post_id, user_id=user_id, comment=f'Benchmark comment {index}')
+                for index, (post_id, user_id) in enumerate(zip(commented, commenters))
+            ))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {users} users, {posts} posts, {len(likes)} likes and {options["comments"]} comments '
+            f'in {time.perf_counter() - started:.1f}s.'
+        ))
+
+
+    def weights(self, count, skew):
+        """
+        Cumulative Zipf weights of count items, by rank in a shuffled order.
+        """
+        ranks = list(range(1, count + 1))
+        self.random.shuffle(ranks)
+        return list(accumulate(1 / rank ** skew for rank in ranks))
+
+
+    def sample(self, population, count, skew):
+        if not count:
+            return []
+        return self.random.choices(population, cum_weights=self.weights(len(population), skew), k=count)
+
+
+    def generate_likes(self, post_weights, user_ids, count, skew):
+        """
+        Return count distinct (post index, user id) pairs.
+        """
+        if not count:
+            return []
+        user_weights = self.weights(len(user_ids), skew)
+        post_indexes = range(len(post_weights))
+        likes = set()
+        while len(likes) < count:
+            # Viral posts run out of likers, draw again until enough are distinct
+            missing = count - len(likes)
+            likes.update(zip(
+                self.random.choices(post_indexes, cum_weights=post_weights, k=missing),
+                self.random.choices(user_ids, cum_weights=user_weights, k=missing),
+            ))
+        return sorted(likes)
+
+
+    def create_users(self, count, prefix, password):
+        # Hashed once, hashing each user would dominate the run
+        password = make_password(password)
+        users = self.insert(User, (
+            User(email=f'{prefix}{index}@example.com', username=f'{prefix}{index}', password=password)
+            for index in range(count)
+        ))
+        return [user.pk for user in users]
+
+
+    def create_posts(self, authors, likes_count, days):
+        now = timezone.now()
+        span = days * 86400
+        # Created in chronological order, like a real table
+        offsets = sorted((self.random.uniform(0, span) for _ in authors), reverse=True)
+        with auto_now_disabled(Post, 'created_datetime', 'updated_datetime'):
+            posts = self.insert(Post, (
+                Post(
+                    user_id=user_id,
+                    title=f'Benchmark post {index}',
+                    content=f'Benchmark content of post {index}',
+                    created_datetime=now - timedelta(seconds=offset),
+                    updated_datetime=now - timedelta(seconds=offset),
+                    likes_count=likes_count[index],
+                )
+                for index, (user_id, offset) in enumerate(zip(authors, offsets))
+            ))
+        return [post.pk for post in posts]
+
+
+    def insert(self, model, objects):
+        created = []
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) == self.batch_size:
+                created += model.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            created += model.objects.bulk_create(batch)
+        return created
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-18 09:12
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_likes_count(apps, schema_editor):
+    Post = apps.get_model('post', 'Post')
+    Like = apps.get_model('post', 'Like')
+    counts = Like.objects.filter(post=OuterRef('pk')).values('post').annotate(total=Count('pk')).values('total')
+    Post.objects.update(likes_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0003_post_updated_datetime'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_likes_count, migrations.RunPython.noop),
+    ]
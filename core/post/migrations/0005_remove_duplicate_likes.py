@@ -0,0 +1,36 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:04
+
+from django.db import migrations
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicate_likes(apps, schema_editor):
+    Post = apps.get_model('post', 'Post')
+    Like = apps.get_model('post', 'Like')
+
+    duplicates = (
+        Like.objects.values('post', 'user')
+        .annotate(first_id=Min('pk'), total=Count('pk'))
+        .filter(total__gt=1)
+    )
+
+    post_ids = set()
+    for row in duplicates:
+        Like.objects.filter(post=row['post'], user=row['user']).exclude(pk=row['first_id']).delete()
+        post_ids.add(row['post'])
+
+    if post_ids:
+        counts = Like.objects.filter(post=OuterRef('pk')).values('post').annotate(total=Count('pk')).values('total')
+        Post.objects.filter(pk__in=post_ids).update(likes_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0004_post_likes_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_likes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:40
+
+from django.db import migrations
+
+
+# A generated column is recomputed by PostgreSQL whenever title or content
+# change, including bulk_create() and update(), so the vector is never built
+# at query time. Other databases use the simple search backend instead.
+ADD_SEARCH_VECTOR = """
+ALTER TABLE post_post ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(content, '')), 'B')
+) STORED
+"""
+
+CREATE_SEARCH_INDEX = 'CREATE INDEX post_search_vector_idx ON post_post USING GIN (search_vector)'
+
+
+def add_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(ADD_SEARCH_VECTOR)
+    schema_editor.execute(CREATE_SEARCH_INDEX)
+
+
+def remove_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS post_search_vector_idx')
+    schema_editor.execute('ALTER TABLE post_post DROP COLUMN IF EXISTS search_vector')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0007_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vector, remove_search_vector),
+    ]
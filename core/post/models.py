@@ -1,5 +1,7 @@
-from django.db import models
+from django.db import models, connections, transaction
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from .signals import like_changed
 
 User = get_user_model()
 
@@ -12,17 +14,117 @@ class Post(models.Model):
     content = models.TextField(max_length=500)
     likes = models.ManyToManyField(User, related_name='likes', blank=True, through='Like')
     comments = models.ManyToManyField(User, related_name='comments', blank=True, through='Comment')
+    # Denormalized number of Like rows, kept in sync by LikeManager
+    # and repaired by the reconcile_likes_count management command
+    likes_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Feed ordering and cursor pagination
+            models.Index(fields=['updated_datetime', 'id'], name='post_updated_id_idx'),
+            # Feed filtered by author
+            models.Index(fields=['user', 'updated_datetime'], name='post_user_updated_idx'),
+        ]
 
     def __str__(self):
         return self.user.email + " - " + self.title
 
 
+class LikeManager(models.Manager):
+    """
+    Race-free like writes backed by the unique (post, user) constraint.
+
+    Each method runs a single conditional INSERT or DELETE followed by an
+    UPDATE of Post.likes_count in one transaction, and returns whether the
+    post is liked afterwards together with the new likes count.
+    """
+
+    def like(self, user, post):
+        with transaction.atomic(using=self.db):
+            inserted = self._insert(user, post)
+            return True, self._add_to_likes_count(user, post, 1 if inserted else 0)
+
+    def unlike(self, user, post):
+        with transaction.atomic(using=self.db):
+            deleted = self._delete(user, post)
+            return False, self._add_to_likes_count(user, post, -1 if deleted else 0)
+
+    def toggle(self, user, post):
+        with transaction.atomic(using=self.db):
+            if self._delete(user, post):
+                return False, self._add_to_likes_count(user, post, -1)
+            # A concurrent request may have liked the post in the meantime
+            inserted = self._insert(user, post)
+            return True, self._add_to_likes_count(user, post, 1 if inserted else 0)
+
+    def _insert(self, user, post):
+        """
+        Insert the like unless it already exists, and return whether a row
+        was inserted. ON CONFLICT DO NOTHING is supported by PostgreSQL and
+        SQLite, and unlike bulk_create(ignore_conflicts=True) the row count
+        tells us whether the counter has to change.
+        """
+        opts = self.model._meta
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        columns = [opts.get_field(name).column for name in ('user', 'post', 'created_datetime', 'like')]
+        sql = 'INSERT INTO {} ({}) VALUES (%s, %s, %s, %s) ON CONFLICT ({}, {}) DO NOTHING'.format(
+            quote(opts.db_table),
+            ', '.join(quote(column) for column in columns),
+            quote(columns[1]),
+            quote(columns[0]),
+        )
+        created_datetime = connection.ops.adapt_datetimefield_value(timezone.now())
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user.pk, post.pk, created_datetime, True])
+            return cursor.rowcount == 1
+
+    def _delete(self, user, post):
+        # Like has no dependent rows nor delete signals, so this is a single DELETE
+        deleted, _ = self.filter(user=user, post=post).delete()
+        return deleted > 0
+
+    def _add_to_likes_count(self, user, post, delta):
+        """
+        Update the stored counter and read it back in the same statement,
+        then notify like_changed receivers if the like state changed.
+        A counter that drifted below the real count is clamped at zero.
+        """
+        opts = Post._meta
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        column = quote(opts.get_field('likes_count').column)
+        sql = (
+            'UPDATE {table} SET {column} = CASE WHEN {column} + %s < 0 THEN 0 ELSE {column} + %s END '
+            'WHERE {pk} = %s RETURNING {column}'
+        ).format(
+            table=quote(opts.db_table),
+            column=column,
+            pk=quote(opts.pk.column),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [delta, delta, post.pk])
+            likes_count = cursor.fetchone()[0]
+
+        if delta:
+            like_changed.send(sender=self.model, user=user, post=post, liked=delta > 0, using=self.db)
+        return likes_count
+
+
 class Like(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
     created_datetime = models.DateTimeField(auto_now_add=True)
     like = models.BooleanField(default=False)
 
+    objects = LikeManager()
+
+    class Meta:
+        constraints = [
+            # Its index also serves the (post, user) like state lookups
+            models.UniqueConstraint(fields=['post', 'user'], name='unique_post_like'),
+        ]
+
     def __str__(self):
         return self.user.email + " - " + self.post.title
 
@@ -33,5 +135,12 @@ class Comment(models.Model):
     created_datetime = models.DateTimeField(auto_now_add=True)
     comment = models.CharField(max_length=500)
 
+    class Meta:
+        indexes = [
+            # The id breaks ties between comments created at the same time, so
+            # keyset pages of a post's comments are read in index order
+            models.Index(fields=['post', 'created_datetime', 'id'], name='comment_post_created_id_idx'),
+        ]
+
     def __str__(self):
         return self.user.email + " - " + self.post.title
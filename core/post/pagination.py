@@ -0,0 +1,160 @@
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, Cursor, _reverse_ordering
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination over a composite ordering that ends with a unique field.
+
+    DRF's CursorPagination only filters on the first ordering field and skips
+    rows sharing that value with an offset. Here the cursor position stores
+    the value of every ordering field, so each page is a single keyset range
+    without any offset, and rows with the same timestamp are never skipped
+    or repeated between pages.
+    """
+
+    position_separator = '|'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        return self.paginate_results(list(page_queryset))
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Return the lazy queryset of the requested page, including one extra
+        row used to detect whether a following page exists.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+
+        # Cursor pagination always enforces an ordering
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self.cursor and self.cursor.position is not None:
+            values = self.decode_position(self.cursor.position, queryset)
+            queryset = queryset.filter(self.get_keyset_filter(values, reverse))
+
+        return queryset[:self.page_size + 1]
+
+    def paginate_results(self, results):
+        """
+        Build the page from the rows fetched with get_page_queryset().
+        """
+        reverse = bool(self.cursor and self.cursor.reverse)
+        self.current_position = self.cursor.position if self.cursor else None
+        self.page = list(results[:self.page_size])
+        has_following = len(results) > len(self.page)
+
+        if reverse:
+            # A reverse page was fetched in reverse order
+            self.page.reverse()
+            self.has_next = self.current_position is not None
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = self.current_position is not None
+
+        # Display page controls in the browsable API if there is more than one page
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_keyset_filter(self, values, reverse):
+        """
+        Return the condition selecting rows strictly after the position, i.e.
+        (a < x) OR (a = x AND b < y) for a descending (a, b) ordering.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+
+        # Redundant bound on the leading field, so the database can start an
+        # index range scan at the position instead of filtering row by row
+        first = self.ordering[0]
+        lookup = 'lte' if first.startswith('-') != reverse else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{lookup}': values[0]}) & condition
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        if self.page:
+            position = self._get_position_from_instance(self.page[-1], self.ordering)
+        else:
+            position = self.current_position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+
+        if self.page:
+            position = self._get_position_from_instance(self.page[0], self.ordering)
+        else:
+            position = self.current_position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip('-')
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else str(value))
+        return self.position_separator.join(values)
+
+    def decode_position(self, position, queryset):
+        """
+        Split a cursor position and convert each value with the field it
+        orders by, so a tampered cursor is a 404 rather than a database error.
+        """
+        values = position.split(self.position_separator)
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        decoded = []
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            try:
+                try:
+                    model_field = queryset.model._meta.get_field(name)
+                except FieldDoesNotExist:
+                    model_field = queryset.query.annotations[name].output_field
+                decoded.append(model_field.to_python(value))
+            except (KeyError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        return decoded
+
+
+class PostCursorPagination(KeysetCursorPagination):
+    page_size = 3
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    # The id breaks ties between posts updated at the same time
+    ordering = ('-updated_datetime', '-id')
+
+
+class CommentCursorPagination(KeysetCursorPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    # Comments read oldest first, like a conversation
+    ordering = ('created_datetime', 'id')
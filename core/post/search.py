@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connection
+from django.db.models import DecimalField, Expression, Q
+from django.db.models.functions import Cast
+from django.utils.module_loading import import_string
+
+# Maintained by PostgreSQL as a generated column, see migration 0008
+SEARCH_VECTOR_COLUMN = 'search_vector'
+SEARCH_CONFIG = 'english'
+# ts_rank() returns a float4, whose decimal text in a cursor does not compare
+# equal to it again, so ranks are rounded to a fixed-point number both when
+# ordering and when filtering from a cursor
+SEARCH_RANK_FIELD = DecimalField(max_digits=12, decimal_places=6)
+
+
+class SearchDocument(Expression):
+    """
+    The search_vector column of the post table. The column only exists on
+    PostgreSQL and is not a model field, so regular post queries never
+    fetch it.
+    """
+
+    output_field = SearchVectorField()
+
+    def as_sql(self, compiler, connection):
+        alias = compiler.query.get_initial_alias()
+        column = connection.ops.quote_name(SEARCH_VECTOR_COLUMN)
+        return f'{compiler.quote_name_unless_alias(alias)}.{column}', []
+
+
+class PostgresSearchBackend:
+    """
+    Match posts against the GIN-indexed search vector over title (weight A)
+    and content (weight B), and rank them by relevance.
+    """
+
+    ranked = True
+
+    def search(self, queryset, terms):
+        query = SearchQuery(terms, config=SEARCH_CONFIG, search_type='websearch')
+        return queryset.alias(search_document=SearchDocument()).filter(
+            search_document=query,
+        ).annotate(
+            search_rank=Cast(SearchRank(SearchDocument(), query), SEARCH_RANK_FIELD),
+        )
+
+
+class SimpleSearchBackend:
+    """
+    Fallback for databases without full-text search, such as SQLite in local
+    development. Every word must appear in the title or the content.
+    """
+
+    ranked = False
+
+    def search(self, queryset, terms):
+        condition = Q()
+        for word in terms.split():
+            condition &= Q(title__icontains=word) | Q(content__icontains=word)
+        return queryset.filter(condition)
+
+
+def get_search_backend():
+    """
+    Return the backend set in POST_SEARCH_BACKEND, or the one matching the
+    database in use.
+    """
+    backend = getattr(settings, 'POST_SEARCH_BACKEND', None)
+    if backend:
+        return import_string(backend)()
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return SimpleSearchBackend()
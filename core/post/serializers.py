@@ -1,21 +1,158 @@
-from rest_framework import serializers
-from .models import Post
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from core.timing import TimedRepresentationMixin, timed
+from .models import Post, Comment
 
-class PostSerializer(serializers.ModelSerializer):
+
+class CommentSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    username = serializers.CharField(source='user.username', read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = ('id', 'post', 'user', 'username', 'comment', 'created_datetime')
+        read_only_fields = ('id', 'post', 'user', 'username', 'created_datetime')
+
+
+class PostListSerializer(TimedRepresentationMixin, serializers.ListSerializer):
+    def create(self, validated_data):
+        """
+        Insert all posts with a single bulk INSERT.
+        """
+        posts = Post.objects.bulk_create([Post(**attrs) for attrs in validated_data])
+        for post in posts:
+            # New posts have no likes or comments, skip querying them
+            post.is_liked = False
+            post.comments_count = 0
+        return posts
+
+
+class PostSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
-    likes_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
+    comments_count = serializers.SerializerMethodField()
+    latest_comments = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
-        fields = ('id', 'user', 'username', 'created_datetime', 'title', 'content', 'updated_datetime', 'likes_count', 'is_liked')
-        read_only_fields = ('id', 'created_datetime', 'user', 'username', 'updated_datetime', 'likes_count', 'is_liked')
+        fields = ('id', 'user', 'username', 'created_datetime', 'title', 'content', 'updated_datetime', 'likes_count', 'is_liked', 'comments_count', 'latest_comments')
+        read_only_fields = ('id', 'created_datetime', 'user', 'username', 'updated_datetime', 'likes_count', 'is_liked', 'comments_count', 'latest_comments')
+        list_serializer_class = PostListSerializer
 
-    def get_likes_count(self, obj):
-        return obj.likes.count()
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The preview is only part of the response when the client asks for it
+        if not self.context.get('comments_preview'):
+            self.fields.pop('latest_comments')
 
     def get_is_liked(self, obj):
+        # Precomputed by PostViewSet.get_queryset()
+        is_liked = getattr(obj, 'is_liked', None)
+        if is_liked is not None:
+            return is_liked
+
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.likes.filter(id=request.user.id).exists()
         return False
+
+    def get_comments_count(self, obj):
+        # Precomputed by PostViewSet.get_queryset()
+        comments_count = getattr(obj, 'comments_count', None)
+        if comments_count is not None:
+            return comments_count
+        return obj.comment_set.count()
+
+    def get_latest_comments(self, obj):
+        # Fetched for a whole page by PostViewSet.attach_comment_previews()
+        comments = getattr(obj, 'latest_comments', None)
+        if comments is None:
+            comments = obj.comment_set.select_related('user').order_by('-created_datetime', '-id')[:self.context['comments_preview']]
+        return CommentSerializer(comments, many=True).data
+
+
+class PostValuesSerializer:
+    """
+    Read-only PostSerializer for list pages fetched as values_list() rows.
+
+    Rows are turned into dicts by zipping them with the field names, so no
+    model instance is built and no DRF field is called per value. The output
+    is identical to PostSerializer, whose fields return the stored values
+    as they are, except for the datetimes. Comment previews are not
+    supported, and writes and the OpenAPI schema still use PostSerializer.
+    """
+
+    # Field name and the column it is read from, in PostSerializer order
+    columns = (
+        ('id', 'id'),
+        ('user', 'user'),
+        ('username', 'user__username'),
+        ('created_datetime', 'created_datetime'),
+        ('title', 'title'),
+        ('content', 'content'),
+        ('updated_datetime', 'updated_datetime'),
+        ('likes_count', 'likes_count'),
+        ('is_liked', 'is_liked'),
+        ('comments_count', 'comments_count'),
+    )
+    names = tuple(name for name, _ in columns)
+    converted = ('created_datetime', 'updated_datetime')
+
+    def __init__(self, rows, many=True, **kwargs):
+        self.rows = rows
+
+    @classmethod
+    def get_queryset(cls, queryset):
+        """
+        Return queryset, annotated by PostViewSet.get_queryset(), as named rows.
+        Other annotations, such as the search rank the page may be ordered
+        by, are fetched after the columns and left out of the output.
+        """
+        columns = [column for _, column in cls.columns]
+        columns += [name for name in queryset.query.annotation_select if name not in columns]
+        return queryset.values_list(*columns, named=True)
+
+    def get_datetime_converter(self):
+        """
+        Return the function formatting datetimes like DateTimeField, which
+        looks up the current timezone for every value where this looks it
+        up once per page.
+        """
+        if api_settings.DATETIME_FORMAT is None or api_settings.DATETIME_FORMAT.lower() != ISO_8601:
+            return serializers.DateTimeField().to_representation
+
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+
+        def convert(value):
+            if tz is not None:
+                value = value.astimezone(tz) if value.tzinfo is not None else timezone.make_aware(value, tz)
+            value = value.isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return convert
+
+    @property
+    def data(self):
+        with timed('serialize'):
+            names = self.names
+            convert = self.get_datetime_converter()
+            results = []
+            for row in self.rows:
+                post = dict(zip(names, row))
+                for name in self.converted:
+                    post[name] = convert(post[name])
+                results.append(post)
+            return results
+
+
+class PostBulkDeleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def __init__(self, *args, max_items=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_items = max_items
+
+    def validate_ids(self, ids):
+        if self.max_items is not None and len(ids) > self.max_items:
+            raise serializers.ValidationError(f'Ensure this field has no more than {self.max_items} elements.')
+        return ids
@@ -0,0 +1,23 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal, receiver
+from core.post.cache import feed_cache
+
+# Sent by LikeManager when a like is added or removed, since its single
+# statement writes do not go through Model.save() and Model.delete()
+like_changed = Signal()
+
+# Likes get no post_delete receiver, which keeps their deletes single fast
+# DELETEs. Cached pages hold Post.likes_count, which LikeManager changes with
+# like_changed, and the like state of the user is looked up on every hit, so
+# no cached value is derived from the Like rows themselves
+
+@receiver(post_save, sender='post.Post')
+@receiver(post_delete, sender='post.Post')
+@receiver(post_save, sender='post.Like')
+@receiver(post_save, sender='post.Comment')
+@receiver(post_delete, sender='post.Comment')
+@receiver(like_changed)
+def invalidate_feed_cache(sender, using=None, **kwargs):
+    # After the commit, or a concurrent reader could cache the old page again
+    transaction.on_commit(feed_cache.invalidate, using=using)
@@ -0,0 +1,160 @@
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth import get_user_model
+from core.post.models import Post, Like, Comment
+from core.post.viewsets import PostViewSet
+
+User = get_user_model()
+
+
+class AsyncPostViewsTest(APITestCase):
+    """
+    Tests for the async post views, which must answer like the PostViewSet
+    routes they mirror.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='async@example.com', username='asyncuser', password='password123')
+        self.other_user = User.objects.create_user(email='other@example.com', username='otheruser', password='password123')
+        self.posts = [
+            Post.objects.create(user=self.other_user, title=f'Post {index}', content='Content')
+            for index in range(5)
+        ]
+        self.post = self.posts[0]
+        self.token = f'Bearer {AccessToken.for_user(self.user)}'
+        self.list_url = reverse('async-post-list')
+        self.like_url = reverse('async-post-like', kwargs={'pk': self.post.id})
+
+
+    async def sync_get(self, url, data=None):
+        """
+        Request the PostViewSet route with the same token.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=self.token)
+        return await sync_to_async(self.client.get)(url, data)
+
+
+    async def test_list_matches_sync_list(self):
+        """
+        Test that the async list returns the same page as the sync list.
+        """
+        response = await self.async_client.get(self.list_url, {'comments_preview': 2}, headers={'Authorization': self.token})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('ETag', response)
+
+        sync_response = await self.sync_get(reverse('post-list'), {'comments_preview': 2})
+        data = response.json()
+        self.assertEqual(data['results'], sync_response.json()['results'])
+        self.assertIn('/api/async/post/?', data['next'])
+
+        response = await self.async_client.get(data['next'], headers={'Authorization': self.token})
+        self.assertEqual([post['id'] for post in response.json()['results']], [self.posts[1].id, self.posts[0].id])
+
+
+    async def test_list_filters_by_username(self):
+        response = await self.async_client.get(self.list_url, {'user__username': 'asyncuser'}, headers={'Authorization': self.token})
+        self.assertEqual(response.json()['results'], [])
+
+
+    async def test_list_not_modified(self):
+        """
+        Test that an unchanged page answers If-None-Match with a 304.
+        """
+        response = await self.async_client.get(self.list_url, headers={'Authorization': self.token})
+        response = await self.async_client.get(self.list_url, headers={'Authorization': self.token, 'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+    def test_not_modified_skips_previews_and_serialization(self):
+        """
+        Test that a 304 runs only the page or post query, without fetching
+        comment previews or serializing.
+        """
+        Comment.objects.create(user=self.user, post=self.post, comment='Comment')
+        detail_url = reverse('async-post-detail', kwargs={'pk': self.post.id})
+        params = {'comments_preview': 2}
+
+        # The sync test client runs the async views too, on this thread's connection
+        for url in (self.list_url, detail_url):
+            etag = self.client.get(url, params, HTTP_AUTHORIZATION=self.token)['ETag']
+            with mock.patch.object(PostViewSet, 'get_serializer') as get_serializer:
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url, params, HTTP_AUTHORIZATION=self.token, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            get_serializer.assert_not_called()
+            # The page or post query, no comment previews
+            self.assertEqual(len(context.captured_queries), 1)
+
+
+    async def test_retrieve(self):
+        await Comment.objects.acreate(user=self.user, post=self.post, comment='Comment')
+        url = reverse('async-post-detail', kwargs={'pk': self.post.id})
+        response = await self.async_client.get(url, {'comments_preview': 1}, headers={'Authorization': self.token})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['id'], self.post.id)
+        self.assertEqual(data['username'], 'otheruser')
+        self.assertEqual(data['comments_count'], 1)
+        self.assertEqual(data['latest_comments'][0]['comment'], 'Comment')
+
+
+    async def test_retrieve_missing_post(self):
+        url = reverse('async-post-detail', kwargs={'pk': self.posts[-1].id + 100})
+        response = await self.async_client.get(url, headers={'Authorization': self.token})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIn('detail', response.json())
+
+
+    async def test_authentication_is_required(self):
+        """
+        Test that missing and invalid tokens are rejected like on the sync stack.
+        """
+        response = await self.async_client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer realm="api"')
+
+        response = await self.async_client.get(self.list_url, headers={'Authorization': 'Bearer invalid'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.json()['code'], 'token_not_valid')
+
+
+    async def test_inactive_user_is_rejected(self):
+        self.user.is_active = False
+        await self.user.asave(update_fields=['is_active'])
+        response = await self.async_client.get(self.list_url, headers={'Authorization': self.token})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+    async def test_like_toggle(self):
+        """
+        Test that any authenticated user can like a post of another user.
+        """
+        response = await self.async_client.post(self.like_url, headers={'Authorization': self.token})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['likes_count'], 1)
+        self.assertTrue(response.json()['is_liked'])
+        self.assertTrue(await Like.objects.filter(user=self.user, post=self.post).aexists())
+
+        response = await self.async_client.post(self.like_url, headers={'Authorization': self.token})
+        self.assertEqual(response.json()['likes_count'], 0)
+        self.assertFalse(response.json()['is_liked'])
+
+
+    async def test_like_put_and_delete(self):
+        response = await self.async_client.put(self.like_url, headers={'Authorization': self.token})
+        self.assertEqual(response.json(), {'liked': True, 'likes_count': 1})
+
+        response = await self.async_client.delete(self.like_url, headers={'Authorization': self.token})
+        self.assertEqual(response.json(), {'liked': False, 'likes_count': 0})
+
+
+    async def test_method_not_allowed(self):
+        response = await self.async_client.post(self.list_url, headers={'Authorization': self.token})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
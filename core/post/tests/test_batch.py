@@ -0,0 +1,84 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from core.post.models import Post, Like
+
+User = get_user_model()
+
+
+class PostBatchTest(APITestCase):
+    """
+    Tests for fetching several posts, or their like state, by id.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='batch@example.com', username='batchuser', password='password123')
+        self.other_user = User.objects.create_user(email='other@example.com', username='otheruser', password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.posts = [
+            Post.objects.create(user=self.other_user, title=f'Post {index}', content='Content', likes_count=index)
+            for index in range(5)
+        ]
+        Like.objects.create(user=self.user, post=self.posts[1], like=True)
+        self.batch_url = reverse('post-batch')
+        self.state_url = reverse('post-likes-state')
+
+
+    def ids(self, *posts):
+        return ','.join(str(post.id) for post in posts)
+
+
+    def test_batch_returns_posts_in_requested_order(self):
+        """
+        Test that the posts are returned in one query, in the requested order.
+        """
+        missing = self.posts[-1].id + 100
+        with self.assertNumQueries(1):
+            response = self.client.get(self.batch_url, {'ids': f'{self.posts[3].id},{missing},{self.posts[1].id},{self.posts[3].id}'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        results = response.data['results']
+        self.assertEqual([post['id'] for post in results], [self.posts[3].id, self.posts[1].id])
+        self.assertEqual(results[1]['username'], 'otheruser')
+        self.assertTrue(results[1]['is_liked'])
+        self.assertFalse(results[0]['is_liked'])
+
+
+    def test_batch_rejects_invalid_ids(self):
+        """
+        Test that missing, malformed and too many ids are rejected.
+        """
+        for params in ({}, {'ids': ''}, {'ids': '1,abc'}, {'ids': ','.join(str(index) for index in range(1, 302))}):
+            response = self.client.get(self.batch_url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+            self.assertIn('ids', response.data)
+
+
+    def test_likes_state(self):
+        """
+        Test that the like state of several posts is returned from one query.
+        """
+        with self.assertNumQueries(1):
+            response = self.client.get(self.state_url, {'ids': self.ids(*self.posts[:3])})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {
+            str(self.posts[0].id): {'liked': False, 'likes_count': 0},
+            str(self.posts[1].id): {'liked': True, 'likes_count': 1},
+            str(self.posts[2].id): {'liked': False, 'likes_count': 2},
+        })
+
+
+    def test_likes_state_follows_likes(self):
+        """
+        Test that liking a post is reflected in its state.
+        """
+        self.client.put(reverse('post-like', kwargs={'pk': self.posts[0].id}))
+        response = self.client.get(self.state_url, {'ids': self.ids(self.posts[0])})
+        self.assertEqual(response.json(), {str(self.posts[0].id): {'liked': True, 'likes_count': 1}})
+
+
+    def test_unauthenticated_user_cannot_batch(self):
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(self.batch_url, {'ids': '1'}).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.client.get(self.state_url, {'ids': '1'}).status_code, status.HTTP_401_UNAUTHORIZED)
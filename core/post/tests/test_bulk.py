@@ -0,0 +1,146 @@
+from django.test import override_settings
+from django.db.models.signals import post_delete
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from core.post.models import Post, Like, Comment
+
+User = get_user_model()
+
+
+class PostBulkTest(APITestCase):
+    """
+    Tests for creating and deleting posts in bulk.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='bulk@example.com', username='bulkuser', password='password123')
+        self.other_user = User.objects.create_user(email='other@example.com', username='otheruser', password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.bulk_url = reverse('post-bulk')
+
+
+    def test_bulk_create(self):
+        """
+        Test that all posts are created for the requesting user in one INSERT.
+        """
+        items = [{'title': f'Post {index}', 'content': 'Content'} for index in range(50)]
+        # Transaction savepoint, insert and feed cache has no query
+        with self.assertNumQueries(3):
+            response = self.client.post(self.bulk_url, items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 50)
+
+        self.assertEqual(Post.objects.filter(user=self.user).count(), 50)
+        first = response.data[0]
+        self.assertEqual(first['title'], 'Post 0')
+        self.assertEqual(first['username'], 'bulkuser')
+        self.assertEqual(first['likes_count'], 0)
+        self.assertFalse(first['is_liked'])
+        self.assertEqual(first['comments_count'], 0)
+        self.assertTrue(Post.objects.filter(pk=first['id']).exists())
+
+
+    def test_bulk_create_reports_item_errors(self):
+        """
+        Test that an invalid item rejects the whole request with per-item errors.
+        """
+        items = [
+            {'title': 'Valid', 'content': 'Content'},
+            {'content': 'Missing title'},
+            {'title': 'x' * 300, 'content': 'Content'},
+        ]
+        response = self.client.post(self.bulk_url, items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # Errors are listed in the order of the items
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('title', response.data[1])
+        self.assertIn('title', response.data[2])
+        self.assertFalse(Post.objects.exists())
+
+
+    def test_bulk_create_rejects_invalid_payloads(self):
+        """
+        Test that the payload must be a non empty list.
+        """
+        response = self.client.post(self.bulk_url, {'title': 'Post', 'content': 'Content'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(self.bulk_url, [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    @override_settings(POST_BULK_MAX_ITEMS=2)
+    def test_bulk_limit(self):
+        """
+        Test that requests over the configured number of items are rejected.
+        """
+        items = [{'title': f'Post {index}', 'content': 'Content'} for index in range(3)]
+        response = self.client.post(self.bulk_url, items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Post.objects.exists())
+
+        response = self.client.delete(self.bulk_url, {'ids': [1, 2, 3]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_bulk_delete_only_own_posts(self):
+        """
+        Test that bulk delete removes the user's posts and their likes and
+        comments, and ignores the posts of other users.
+        """
+        own = [Post.objects.create(user=self.user, title=f'Own {index}', content='Content') for index in range(3)]
+        other = Post.objects.create(user=self.other_user, title='Other', content='Content')
+        Like.objects.create(user=self.other_user, post=own[0], like=True)
+        Comment.objects.create(user=self.other_user, post=own[0], comment='Comment')
+        Comment.objects.create(user=self.user, post=other, comment='Comment')
+
+        ids = [own[0].id, own[1].id, other.id, other.id + 100]
+        response = self.client.delete(self.bulk_url, {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'deleted': 2})
+
+        self.assertEqual(list(Post.objects.order_by('id')), [own[2], other])
+        self.assertFalse(Like.objects.exists())
+        self.assertEqual(Comment.objects.get().post, other)
+
+
+    def test_bulk_delete_invalidates_feed(self):
+        """
+        Test that deleted posts send post_delete and leave the cached feed
+        once the deletion commits.
+        """
+        post = Post.objects.create(user=self.user, title='Cached', content='Content')
+        self.assertEqual(len(self.client.get(reverse('post-list')).data['results']), 1)
+
+        deleted = []
+
+        def receiver(sender, instance, **kwargs):
+            deleted.append(instance.pk)
+
+        post_delete.connect(receiver, sender=Post)
+        self.addCleanup(post_delete.disconnect, receiver, sender=Post)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(self.bulk_url, {'ids': [post.id]}, format='json')
+        self.assertEqual(deleted, [post.id])
+        self.assertEqual(self.client.get(reverse('post-list')).data['results'], [])
+
+
+    def test_bulk_create_invalidates_feed(self):
+        """
+        Test that created posts show in the cached feed once they commit.
+        """
+        self.assertEqual(self.client.get(reverse('post-list')).data['results'], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.bulk_url, [{'title': 'Post', 'content': 'Content'}], format='json')
+        self.assertEqual(len(self.client.get(reverse('post-list')).data['results']), 1)
+
+
+    def test_unauthenticated_user_cannot_bulk(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.bulk_url, [{'title': 'Post', 'content': 'Content'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.delete(self.bulk_url, {'ids': [1]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,130 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from core.post.cache import feed_cache
+from core.post.models import Post, Like
+
+User = get_user_model()
+
+
+class FeedCacheTest(APITestCase):
+    """
+    Test suite for the cached first page of the post feed.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='cache@example.com', username='cacheuser', password='password123')
+        self.other_user = User.objects.create_user(email='other@example.com', username='otheruser', password='password123')
+        self.client.force_authenticate(user=self.user)
+
+        self.posts = [Post.objects.create(user=self.user, title=f'Post {index}', content='Content') for index in range(5)]
+        self.post = self.posts[-1]
+        self.list_url = reverse('post-list')
+        feed_cache.clear_stats()
+
+
+    def test_first_page_is_cached(self):
+        """
+        Test that a hit only runs the like state query.
+        """
+        miss = self.client.get(self.list_url)
+        self.assertEqual(miss['X-Feed-Cache'], 'miss')
+
+        with self.assertNumQueries(1):
+            hit = self.client.get(self.list_url)
+        self.assertEqual(hit['X-Feed-Cache'], 'hit')
+        self.assertEqual(hit.data, miss.data)
+        self.assertEqual(hit['ETag'], miss['ETag'])
+        self.assertEqual(feed_cache.stats(), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+
+    def test_like_state_is_overlaid_per_user(self):
+        """
+        Test that users sharing a cached page see their own like state.
+        """
+        Like.objects.like(self.user, self.post)
+        self.client.get(self.list_url)
+
+        self.client.force_authenticate(user=self.other_user)
+        response = self.client.get(self.list_url)
+        self.assertEqual(response['X-Feed-Cache'], 'hit')
+        self.assertFalse(response.data['results'][0]['is_liked'])
+        self.assertEqual(response.data['results'][0]['likes_count'], 1)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.list_url)
+        self.assertTrue(response.data['results'][0]['is_liked'])
+
+
+    def test_filters_are_cached_separately(self):
+        Post.objects.create(user=self.other_user, title='Other', content='Content')
+        self.client.get(self.list_url)
+
+        response = self.client.get(self.list_url, {'user__username': 'otheruser'})
+        self.assertEqual(response['X-Feed-Cache'], 'miss')
+        self.assertEqual([post['title'] for post in response.data['results']], ['Other'])
+
+        response = self.client.get(self.list_url, {'user__username': 'otheruser'})
+        self.assertEqual(response['X-Feed-Cache'], 'hit')
+
+
+    def test_other_pages_are_not_cached(self):
+        response = self.client.get(self.list_url)
+        response = self.client.get(response.data['next'])
+        self.assertNotIn('X-Feed-Cache', response)
+
+        response = self.client.get(self.list_url, {'search': 'Post'})
+        self.assertNotIn('X-Feed-Cache', response)
+
+
+    def test_conditional_request_from_cache(self):
+        etag = self.client.get(self.list_url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+    def test_writes_invalidate_the_cache(self):
+        """
+        Test that creating, updating, deleting and liking posts drop the page.
+        """
+        detail_url = reverse('post-detail', kwargs={'pk': self.post.id})
+        like_url = reverse('post-like', kwargs={'pk': self.post.id})
+
+        writes = [
+            lambda: self.client.post(self.list_url, {'title': 'New', 'content': 'Content'}, format='json'),
+            lambda: self.client.patch(detail_url, {'title': 'Edited'}, format='json'),
+            lambda: self.client.put(like_url),
+            lambda: self.client.post(like_url),
+            lambda: self.client.delete(detail_url),
+        ]
+        for write in writes:
+            self.client.get(self.list_url)
+            self.assertEqual(self.client.get(self.list_url)['X-Feed-Cache'], 'hit')
+            with self.captureOnCommitCallbacks(execute=True):
+                write()
+            self.assertEqual(self.client.get(self.list_url)['X-Feed-Cache'], 'miss')
+
+
+    def test_invalidated_after_commit(self):
+        """
+        Test that a write drops the page only once its transaction commits,
+        so a reader cannot cache the old page again in between.
+        """
+        self.client.get(self.list_url)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Like.objects.like(self.other_user, self.post)
+            self.assertEqual(self.client.get(self.list_url)['X-Feed-Cache'], 'hit')
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get(self.list_url)['X-Feed-Cache'], 'miss')
+
+
+    def test_idempotent_like_keeps_the_cache(self):
+        like_url = reverse('post-like', kwargs={'pk': self.post.id})
+        self.client.put(like_url)
+        self.client.get(self.list_url)
+        self.client.put(like_url)
+        self.assertEqual(self.client.get(self.list_url)['X-Feed-Cache'], 'hit')
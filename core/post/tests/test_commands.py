@@ -0,0 +1,200 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import skipUnless
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from core.post.models import Post, Like, Comment
+
+User = get_user_model()
+
+
+class ReconcileLikesCountTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='test@example.com', username='testuser', password='password123')
+        self.other_user = User.objects.create_user(email='other@example.com', username='otheruser', password='password123')
+
+        # Likes inserted directly, as a bulk import would, leave the counters at zero
+        self.posts = [Post.objects.create(user=self.user, title=f'Post {index}', content='Content') for index in range(5)]
+        for post in self.posts[:3]:
+            Like.objects.create(user=self.user, post=post, like=True)
+            Like.objects.create(user=self.other_user, post=post, like=True)
+
+        # A counter that is too high
+        Post.objects.filter(pk=self.posts[4].pk).update(likes_count=7)
+
+    def test_reconcile_repairs_drift(self):
+        out = StringIO()
+        call_command('reconcile_likes_count', batch_size=2, stdout=out)
+        self.assertIn('Checked 5 posts. Repaired 4 drifted counters (total drift 13).', out.getvalue())
+
+        counts = dict(Post.objects.values_list('pk', 'likes_count'))
+        self.assertEqual([counts[post.pk] for post in self.posts], [2, 2, 2, 0, 0])
+
+    def test_dry_run_does_not_update(self):
+        out = StringIO()
+        call_command('reconcile_likes_count', dry_run=True, stdout=out)
+        self.assertIn('Found 4 drifted counters', out.getvalue())
+        self.assertEqual(Post.objects.filter(likes_count=0).count(), 4)
+
+    def test_consistent_counters_are_reported_clean(self):
+        call_command('reconcile_likes_count', stdout=StringIO())
+        out = StringIO()
+        call_command('reconcile_likes_count', stdout=out)
+        self.assertIn('Repaired 0 drifted counters', out.getvalue())
+
+
+class SeedBenchmarkDataTest(TestCase):
+    def seed(self, **options):
+        call_command('seed_benchmark_data', users=20, posts=100, likes=300, comments=50, batch_size=40, stdout=StringIO(), **options)
+
+    def test_seed_creates_requested_rows(self):
+        self.seed()
+        self.assertEqual(User.objects.filter(username__startswith='bench').count(), 20)
+        self.assertEqual(Post.objects.count(), 100)
+        self.assertEqual(Like.objects.count(), 300)
+        self.assertEqual(Comment.objects.count(), 50)
+        self.assertTrue(User.objects.get(username='bench0').check_password('benchmark'))
+
+    def test_likes_count_matches_likes(self):
+        self.seed()
+        out = StringIO()
+        call_command('reconcile_likes_count', dry_run=True, stdout=out)
+        self.assertIn('Found 0 drifted counters', out.getvalue())
+
+    def test_activity_is_skewed(self):
+        self.seed()
+        counts = sorted(Post.objects.values_list('likes_count', flat=True), reverse=True)
+        # The top tenth of the posts gets far more than a tenth of the likes
+        self.assertGreater(sum(counts[:10]), 300 * 0.3)
+
+    def test_same_seed_gives_same_dataset(self):
+        self.seed()
+        first = list(Like.objects.order_by('post__title', 'user__username').values_list('post__title', 'user__username'))
+        self.seed(clear=True)
+        second = list(Like.objects.order_by('post__title', 'user__username').values_list('post__title', 'user__username'))
+        self.assertEqual(first, second)
+        self.assertEqual(Post.objects.count(), 100)
+
+    def test_too_many_likes(self):
+        with self.assertRaises(CommandError):
+            call_command('seed_benchmark_data', users=2, posts=2, likes=5, stdout=StringIO())
+
+
+class IngestJsonlTest(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(email='alice@example.com', username='alice', password='password123')
+        self.bob = User.objects.create_user(email='bob@example.com', username='bob', password='password123')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'data.jsonl')
+        self.checkpoint = os.path.join(directory.name, 'data.offset')
+
+    def write(self, rows):
+        with open(self.path, 'w', encoding='utf-8') as file:
+            for row in rows:
+                file.write((row if isinstance(row, str) else json.dumps(row)) + '\n')
+
+    def ingest(self, **options):
+        out = StringIO()
+        call_command('ingest_jsonl', self.path, stdout=out, stderr=StringIO(), **options)
+        return out.getvalue()
+
+    def test_ingest(self):
+        self.write([
+            {'id': 500, 'username': 'alice', 'title': 'First', 'content': 'Content', 'created_datetime': '2025-01-01T10:00:00Z'},
+            {'type': 'post', 'username': 'bob', 'title': 'Second', 'content': 'Content é'},
+            {'type': 'like', 'username': 'bob', 'post': 500},
+            {'type': 'like', 'username': 'alice', 'post': 500, 'created_datetime': '2025-01-02T10:00:00Z'},
+            {'type': 'comment', 'username': 'bob', 'post': 500, 'comment': 'Nice'},
+            {'type': 'like', 'username': 'carol', 'post': 500},
+            {'type': 'comment', 'username': 'bob', 'post': 999, 'comment': 'Missing post'},
+            {'type': 'post', 'username': 'bob', 'title': ''},
+            'not json',
+            '',
+        ])
+        out = self.ingest(batch_size=3)
+
+        self.assertIn('Ingested 2 posts, 2 likes and 1 comments, skipped 4 invalid lines and 0 existing rows', out)
+        self.assertIn('rows/s', out)
+        post = Post.objects.get(pk=500)
+        self.assertEqual(post.user, self.alice)
+        self.assertEqual(post.likes_count, 2)
+        self.assertEqual(post.created_datetime.isoformat(), '2025-01-01T10:00:00+00:00')
+        self.assertEqual(post.updated_datetime, post.created_datetime)
+        self.assertEqual(Comment.objects.get().comment, 'Nice')
+        # Posts created afterwards do not collide with the ingested ids
+        self.assertGreater(Post.objects.create(user=self.bob, title='New', content='Content').pk, 500)
+
+    def test_ingest_again_skips_existing_rows(self):
+        self.write([
+            {'id': 500, 'username': 'alice', 'title': 'First', 'content': 'Content'},
+            {'type': 'like', 'username': 'bob', 'post': 500},
+        ])
+        self.assertIn('Ingested 1 posts, 1 likes and 0 comments, skipped 0 invalid lines and 0 existing rows', self.ingest())
+        self.assertIn('Ingested 0 posts, 0 likes and 0 comments, skipped 0 invalid lines and 2 existing rows', self.ingest())
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertEqual(Post.objects.get().likes_count, 1)
+
+    def test_duplicates_in_one_batch_are_counted_once(self):
+        self.write([
+            {'id': 500, 'username': 'alice', 'title': 'First', 'content': 'Content'},
+            {'id': 500, 'username': 'bob', 'title': 'Again', 'content': 'Content'},
+            {'type': 'like', 'username': 'bob', 'post': 500},
+            {'type': 'like', 'username': 'bob', 'post': 500},
+        ])
+        self.assertIn('Ingested 1 posts, 1 likes and 0 comments, skipped 0 invalid lines and 2 existing rows', self.ingest())
+
+    @skipUnless(connection.vendor == 'postgresql', 'COPY is only used on PostgreSQL')
+    def test_copy_counts_inserted_rows(self):
+        self.write([
+            {'id': 500, 'username': 'alice', 'title': 'First', 'content': 'Content, "quoted"'},
+            {'type': 'like', 'username': 'bob', 'post': 500},
+            {'type': 'comment', 'username': 'bob', 'post': 500, 'comment': ''},
+            {'type': 'comment', 'username': 'bob', 'post': 500, 'comment': 'Nice'},
+        ])
+        self.assertIn('Ingested 1 posts, 1 likes and 1 comments, skipped 1 invalid lines and 0 existing rows', self.ingest())
+        self.assertIn('Ingested 0 posts, 0 likes and 1 comments, skipped 1 invalid lines and 2 existing rows', self.ingest())
+        post = Post.objects.get()
+        self.assertEqual(post.content, 'Content, "quoted"')
+        self.assertEqual(post.likes_count, 1)
+        self.assertEqual(Comment.objects.count(), 2)
+
+    def test_resume_from_checkpoint(self):
+        rows = [{'username': 'alice', 'title': f'Post {index}', 'content': 'Content'} for index in range(5)]
+        self.write(rows)
+        with open(self.checkpoint, 'w') as file:
+            file.write(str(sum(len(json.dumps(row)) + 1 for row in rows[:3])))
+
+        self.ingest(checkpoint=self.checkpoint, batch_size=1)
+        self.assertEqual(sorted(Post.objects.values_list('title', flat=True)), ['Post 3', 'Post 4'])
+        with open(self.checkpoint) as file:
+            self.assertEqual(int(file.read()), os.path.getsize(self.path))
+
+        # The whole file was ingested, running again does nothing
+        self.assertIn('Ingested 0 posts', self.ingest(checkpoint=self.checkpoint))
+
+    def test_offset_must_start_a_line(self):
+        self.write([{'username': 'alice', 'title': 'Post', 'content': 'Content'}])
+        with self.assertRaises(CommandError):
+            self.ingest(offset=3)
+
+    def test_export_round_trip(self):
+        post = Post.objects.create(user=self.alice, title='Exported', content='Content')
+        Like.objects.like(self.bob, post)
+        client = APIClient()
+        client.force_authenticate(user=self.alice)
+        response = client.get('/api/post/export/')
+        with open(self.path, 'wb') as file:
+            file.writelines(response.streaming_content)
+        exported = Post.objects.values().get()
+        Post.objects.all().delete()
+
+        self.ingest()
+        self.assertEqual(Post.objects.values().get(), {**exported, 'likes_count': 0})
+
@@ -0,0 +1,142 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from core.post.models import Post, Comment
+
+User = get_user_model()
+
+
+class PostCommentsTest(APITestCase):
+    """
+    Tests for the nested comments endpoints and the comment fields of posts.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='author@example.com', username='author', password='password123')
+        self.other_user = User.objects.create_user(email='reader@example.com', username='reader', password='password123')
+        self.client.force_authenticate(user=self.other_user)
+        self.post = Post.objects.create(user=self.user, title='Post', content='Content')
+        self.comments_url = reverse('post-comments', kwargs={'pk': self.post.id})
+
+
+    def test_add_comment_to_another_user_post(self):
+        """
+        Test that any authenticated user can comment a post.
+        """
+        response = self.client.post(self.comments_url, {'comment': 'Nice post'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['comment'], 'Nice post')
+        self.assertEqual(response.data['username'], 'reader')
+        self.assertEqual(response.data['post'], self.post.id)
+        self.assertTrue(Comment.objects.filter(post=self.post, user=self.other_user).exists())
+
+
+    def test_add_invalid_comment(self):
+        """
+        Test that empty and oversized comments are rejected.
+        """
+        response = self.client.post(self.comments_url, {'comment': ''})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(self.comments_url, {'comment': 'x' * 501})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Comment.objects.exists())
+
+
+    def test_comments_of_missing_post(self):
+        """
+        Test that the comments of an unknown post are not found.
+        """
+        url = reverse('post-comments', kwargs={'pk': self.post.id + 100})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.post(url, {'comment': 'Lost'}).status_code, status.HTTP_404_NOT_FOUND)
+
+
+    def test_unauthenticated_user_cannot_comment(self):
+        """
+        Test that comments require authentication.
+        """
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(self.comments_url).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.client.post(self.comments_url, {'comment': 'Hi'}).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+    def test_comments_are_paginated_oldest_first(self):
+        """
+        Test that following the cursors walks every comment once, in order.
+        """
+        comments = Comment.objects.bulk_create([
+            Comment(user=self.user, post=self.post, comment=f'Comment {index}') for index in range(25)
+        ])
+        # Comments of another post are not listed
+        other_post = Post.objects.create(user=self.user, title='Other', content='Content')
+        Comment.objects.create(user=self.user, post=other_post, comment='Elsewhere')
+
+        seen = []
+        url = self.comments_url
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(comment['id'] for comment in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(seen, [comment.id for comment in comments])
+
+
+    def test_comments_count_and_preview(self):
+        """
+        Test that posts carry their comments count, and their latest comments
+        only when requested.
+        """
+        Comment.objects.bulk_create([
+            Comment(user=self.other_user, post=self.post, comment=f'Comment {index}') for index in range(8)
+        ])
+
+        response = self.client.get(reverse('post-list'))
+        post = response.data['results'][0]
+        self.assertEqual(post['comments_count'], 8)
+        self.assertNotIn('latest_comments', post)
+
+        response = self.client.get(reverse('post-list'), {'comments_preview': 100})
+        latest = response.data['results'][0]['latest_comments']
+        self.assertEqual([comment['comment'] for comment in latest], [f'Comment {index}' for index in range(7, 2, -1)])
+        self.assertEqual(latest[0]['username'], 'reader')
+
+        response = self.client.get(reverse('post-detail', kwargs={'pk': self.post.id}), {'comments_preview': 2})
+        self.assertEqual(response.data['comments_count'], 8)
+        self.assertEqual(len(response.data['latest_comments']), 2)
+
+
+    def test_new_comment_changes_feed(self):
+        """
+        Test that a new comment is visible in the cached feed and its ETag.
+        """
+        response = self.client.get(reverse('post-list'))
+        etag = response['ETag']
+        self.assertEqual(response.data['results'][0]['comments_count'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.comments_url, {'comment': 'First'})
+
+        response = self.client.get(reverse('post-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['comments_count'], 1)
+
+
+    def test_deleted_comment_leaves_cached_feed(self):
+        """
+        Test that deleting a comment drops the cached feed page and its
+        comments count.
+        """
+        comment = Comment.objects.create(user=self.user, post=self.post, comment='Gone')
+        response = self.client.get(reverse('post-list'))
+        self.assertEqual(response.data['results'][0]['comments_count'], 1)
+        self.assertEqual(self.client.get(reverse('post-list'))['X-Feed-Cache'], 'hit')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            comment.delete()
+
+        response = self.client.get(reverse('post-list'))
+        self.assertEqual(response['X-Feed-Cache'], 'miss')
+        self.assertEqual(response.data['results'][0]['comments_count'], 0)
@@ -0,0 +1,119 @@
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from core.post.models import Post, Like
+
+User = get_user_model()
+
+
+class PostConditionalGetTest(APITestCase):
+    """
+    Test suite for ETag / Last-Modified validation of the post endpoints.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='etag@example.com', username='etaguser', password='password123')
+        self.other_user = User.objects.create_user(email='other@example.com', username='otheruser', password='password123')
+        self.client.force_authenticate(user=self.user)
+
+        self.posts = [Post.objects.create(user=self.user, title=f'Post {index}', content='Content') for index in range(5)]
+        self.post = self.posts[-1]
+        self.list_url = reverse('post-list')
+        self.detail_url = reverse('post-detail', kwargs={'pk': self.post.id})
+
+
+    def test_list_and_retrieve_send_validators(self):
+        """
+        Test that list pages and posts carry a weak ETag and Last-Modified.
+        """
+        for url in (self.list_url, self.detail_url):
+            response = self.client.get(url)
+            self.assertTrue(response['ETag'].startswith('W/"'))
+            self.assertEqual(response['Last-Modified'], http_date(self.post.updated_datetime.timestamp()))
+            self.assertIn('Authorization', response['Vary'])
+
+
+    def test_list_if_none_match(self):
+        """
+        Test that an unchanged page is a 304 after a single validator query.
+        """
+        etag = self.client.get(self.list_url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(response.content)
+
+
+    def test_retrieve_if_none_match(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.detail_url)['Last-Modified']
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+    def test_cursor_pages_have_their_own_etag(self):
+        first = self.client.get(self.list_url)
+        second = self.client.get(first.data['next'])
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+        response = self.client.get(first.data['next'], HTTP_IF_NONE_MATCH=second['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+    def test_changes_invalidate_the_etag(self):
+        """
+        Test that edits, likes and deletions all change the page ETag.
+        """
+        etag = self.client.get(self.list_url)['ETag']
+
+        def assert_changed():
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return response['ETag']
+
+        # Another user likes a post: likes_count changes
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.like(self.other_user, self.post)
+        etag = assert_changed()
+
+        # The requesting user likes a post: is_liked changes
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.like(self.user, self.post)
+        etag = assert_changed()
+
+        # The post is edited
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(self.detail_url, {'title': 'Edited'}, format='json')
+        etag = assert_changed()
+
+        # A post of the page is deleted
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.delete()
+        assert_changed()
+
+
+    def test_like_state_is_part_of_the_etag(self):
+        """
+        Test that two users do not share a validator for the same page.
+        """
+        Like.objects.like(self.user, self.post)
+        etag = self.client.get(self.detail_url)['ETag']
+
+        self.client.force_authenticate(user=self.other_user)
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+    def test_missing_post_is_not_found(self):
+        url = reverse('post-detail', kwargs={'pk': self.post.id + 100})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='W/"abc"')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
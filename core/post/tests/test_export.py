@@ -0,0 +1,140 @@
+import json
+import tracemalloc
+from datetime import timedelta
+from unittest import mock
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth import get_user_model
+from core.post.models import Post, Like, Comment
+from core.post.serializers import PostSerializer
+from core.post.viewsets import PostViewSet
+
+User = get_user_model()
+
+
+class PostExportTest(APITestCase):
+    """
+    Tests for the NDJSON export of posts.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='export@example.com', username='exportuser', password='password123')
+        self.other_user = User.objects.create_user(email='other@example.com', username='otheruser', password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('post-export')
+
+
+    def create_posts(self, count, user, start):
+        """
+        Insert count posts of user updated one minute apart from start, with
+        a single executemany() rather than bulk_create(), which is slower at
+        building 100k instances than the export is at reading them.
+        """
+        opts = Post._meta
+        quote = connection.ops.quote_name
+        names = ('user', 'title', 'content', 'created_datetime', 'updated_datetime', 'likes_count')
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(opts.db_table),
+            ', '.join(quote(opts.get_field(name).column) for name in names),
+            ', '.join(['%s'] * len(names)),
+        )
+        rows = []
+        for index in range(count):
+            updated = connection.ops.adapt_datetimefield_value(start + timedelta(minutes=index))
+            rows.append((user.pk, f'Post {index}', 'Content', updated, updated, 0))
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+
+
+    def export(self, data=None):
+        response = self.client.get(self.url, data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+
+    def test_rows_match_post_serializer(self):
+        """
+        Test that each line is a post in the PostSerializer format, oldest
+        first, with the like state and comments count of every chunk.
+        """
+        self.create_posts(5, self.other_user, timezone.now() - timedelta(days=1))
+        posts = list(Post.objects.order_by('updated_datetime', 'id'))
+        Like.objects.like(self.user, posts[1])
+        Comment.objects.create(user=self.user, post=posts[2], comment='Comment')
+
+        # Chunks smaller than the export, so the counts span several chunks
+        with mock.patch.object(PostViewSet, 'export_chunk_size', 2):
+            rows = self.export()
+
+        for post in posts:
+            post.refresh_from_db()
+            post.is_liked = post.pk == posts[1].pk
+            post.comments_count = 1 if post.pk == posts[2].pk else 0
+        self.assertEqual(rows, json.loads(json.dumps(PostSerializer(posts, many=True).data)))
+
+
+    def test_filters(self):
+        """
+        Test the since, until and username filters.
+        """
+        start = timezone.now() - timedelta(days=1)
+        self.create_posts(3, self.user, start)
+        self.create_posts(3, self.other_user, start)
+        mine = list(Post.objects.filter(user=self.user).order_by('updated_datetime', 'id'))
+
+        rows = self.export({'user__username': 'exportuser'})
+        self.assertEqual([row['id'] for row in rows], [post.id for post in mine])
+
+        since = (start + timedelta(minutes=1)).isoformat()
+        until = (start + timedelta(minutes=2)).isoformat()
+        rows = self.export({'user__username': 'exportuser', 'since': since, 'until': until})
+        self.assertEqual([row['id'] for row in rows], [mine[1].id])
+
+        response = self.client.get(self.url, {'since': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+    async def test_async_streaming(self):
+        """
+        Test that under ASGI the export is streamed from the request thread.
+        """
+        await Post.objects.acreate(user=self.other_user, title='Post', content='Content')
+
+        response = await self.async_client.get(self.url, headers={'Authorization': f'Bearer {AccessToken.for_user(self.user)}'})
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(json.loads(content)['title'], 'Post')
+
+
+    def test_memory_is_constant(self):
+        """
+        Test that exporting 100k posts stays under a memory ceiling far below
+        the size of the export.
+        """
+        self.create_posts(100000, self.other_user, timezone.now() - timedelta(days=100))
+        response = self.client.get(self.url)
+
+        size = lines = 0
+        tracemalloc.start()
+        try:
+            for chunk in response.streaming_content:
+                size += len(chunk)
+                lines += chunk.count(b'\n')
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(lines, 100000)
+        self.assertGreater(size, 20 * 2 ** 20)
+        self.assertLess(peak, 8 * 2 ** 20)
@@ -1,3 +1,4 @@
+from django.db import IntegrityError, transaction
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
@@ -55,3 +56,50 @@ class PostLikeTest(APITestCase):
         # Verify persistence in database
         self.assertTrue(Like.objects.filter(user=self.user, post=other_post).exists())
         self.assertEqual(other_post.likes.count(), 1)
+
+    def test_like_updates_stored_counter(self):
+        self.client.post(self.like_url)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 1)
+
+        self.client.post(self.like_url)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 0)
+
+    def test_put_like_is_idempotent(self):
+        response = self.client.put(self.like_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'liked': True, 'likes_count': 1})
+
+        response = self.client.put(self.like_url)
+        self.assertEqual(response.data, {'liked': True, 'likes_count': 1})
+        self.assertEqual(Like.objects.filter(user=self.user, post=self.post).count(), 1)
+
+    def test_delete_like_is_idempotent(self):
+        self.client.put(self.like_url)
+
+        response = self.client.delete(self.like_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'liked': False, 'likes_count': 0})
+
+        response = self.client.delete(self.like_url)
+        self.assertEqual(response.data, {'liked': False, 'likes_count': 0})
+        self.assertFalse(Like.objects.filter(user=self.user, post=self.post).exists())
+
+    def test_like_missing_post(self):
+        url = reverse('post-like', kwargs={'pk': self.post.id + 1})
+        response = self.client.put(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_duplicate_like_rows_are_rejected(self):
+        Like.objects.create(user=self.user, post=self.post, like=True)
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Like.objects.create(user=self.user, post=self.post, like=True)
+
+    def test_concurrent_like_does_not_double_count(self):
+        # Another request liked the post between our delete and insert
+        Like.objects.like(self.user, self.post)
+        liked, likes_count = Like.objects.like(self.user, self.post)
+        self.assertTrue(liked)
+        self.assertEqual(likes_count, 1)
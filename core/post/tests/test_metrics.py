@@ -0,0 +1,125 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from core.metrics import render_latest
+from core.post.cache import feed_cache
+from core.post.models import Post
+
+User = get_user_model()
+
+
+class MetricsTest(APITestCase):
+    """
+    Tests for the request metrics and the /metrics endpoint.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='metrics@example.com', username='metricsuser', password='password123')
+        Post.objects.create(user=self.user, title='Post', content='Content')
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse('post-list')
+        self.metrics_url = reverse('metrics')
+        feed_cache.invalidate()
+
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+
+    def test_request_is_counted_by_route(self):
+        """
+        Test that a request adds to the counter, latency and query
+        histograms of its viewset route.
+        """
+        labels = {'route': 'post.list', 'method': 'GET'}
+        requests = self.sample('http_requests_total', status='200', **labels)
+        latencies = self.sample('http_request_duration_seconds_count', **labels)
+        queries = self.sample('http_request_queries_sum', **labels)
+
+        self.client.get(self.list_url)
+
+        self.assertEqual(self.sample('http_requests_total', status='200', **labels), requests + 1)
+        self.assertEqual(self.sample('http_request_duration_seconds_count', **labels), latencies + 1)
+        self.assertGreater(self.sample('http_request_queries_sum', **labels), queries)
+
+
+    def test_status_and_action_labels(self):
+        """
+        Test that custom actions and error statuses get their own series.
+        """
+        before = self.sample('http_requests_total', route='post.like', method='PUT', status='404')
+        self.client.put(reverse('post-like', kwargs={'pk': 0}))
+        self.assertEqual(self.sample('http_requests_total', route='post.like', method='PUT', status='404'), before + 1)
+
+
+    def test_feed_cache_lookups(self):
+        """
+        Test that feed cache hits and misses are exported.
+        """
+        hits = self.sample('cache_lookups_total', cache='post_feed', result='hit')
+        misses = self.sample('cache_lookups_total', cache='post_feed', result='miss')
+        self.client.get(self.list_url)
+        self.client.get(self.list_url)
+        self.assertEqual(self.sample('cache_lookups_total', cache='post_feed', result='miss'), misses + 1)
+        self.assertEqual(self.sample('cache_lookups_total', cache='post_feed', result='hit'), hits + 1)
+
+
+    @override_settings(DEBUG=True, METRICS_TOKEN='')
+    def test_metrics_endpoint(self):
+        """
+        Test that /metrics serves the Prometheus text format without
+        authentication in DEBUG when no token is set.
+        """
+        self.client.get(self.list_url)
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.metrics_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'http_requests_total{method="GET",route="post.list",status="200"}', response.content)
+
+
+    @override_settings(DEBUG=False, METRICS_TOKEN='')
+    def test_metrics_refused_without_token(self):
+        """
+        Test that metrics are not public in production when no token is set.
+        """
+        response = self.client.get(self.metrics_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+    @override_settings(METRICS_TOKEN='scrape-token')
+    def test_metrics_token(self):
+        """
+        Test that a configured token is required.
+        """
+        response = self.client.get(self.metrics_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.get(self.metrics_url, headers={'Authorization': 'Bearer scrape-token'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+    def test_metrics_are_summed_across_processes(self):
+        """
+        Test that values recorded by separate worker processes in the
+        multiprocess directory are summed.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': directory}
+            record = "from core.metrics import observe_request; observe_request('post.list', 'GET', 200, 0.02, 3, 0.004)"
+            for _ in range(2):
+                subprocess.run([sys.executable, '-c', record], env=env, cwd=settings.BASE_DIR, check=True)
+
+            with mock.patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': directory}):
+                text = render_latest().decode()
+        self.assertIn('http_requests_total{method="GET",route="post.list",status="200"} 2.0', text)
+        self.assertIn('http_request_queries_sum{method="GET",route="post.list"} 6.0', text)
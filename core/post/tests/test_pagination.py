@@ -0,0 +1,96 @@
+from base64 import b64encode
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from core.post.models import Post
+from core.post.pagination import PostCursorPagination
+
+User = get_user_model()
+
+
+class PostPaginationTest(APITestCase):
+    """
+    Test suite for the keyset cursor pagination of the post feed.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='page@example.com', username='pageuser', password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse('post-list')
+
+        for index in range(10):
+            Post.objects.create(user=self.user, title=f'Post {index}', content='Content')
+
+        # Give most posts the same timestamp, as a bulk import would
+        Post.objects.filter(title__in=[f'Post {index}' for index in range(2, 9)]).update(updated_datetime=timezone.now())
+        self.expected_ids = list(Post.objects.order_by('-updated_datetime', '-id').values_list('id', flat=True))
+
+
+    def walk(self, url, link='next'):
+        """
+        Follow the links from url and return the ids of every page.
+        """
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([post['id'] for post in response.data['results']])
+            url = response.data[link]
+        return pages
+
+
+    def test_pages_do_not_skip_or_repeat_ties(self):
+        """
+        Test that posts sharing a timestamp are returned exactly once.
+        """
+        pages = self.walk(self.list_url)
+        self.assertEqual([len(page) for page in pages], [3, 3, 3, 1])
+        self.assertEqual([post_id for page in pages for post_id in page], self.expected_ids)
+
+
+    def test_previous_links_return_the_same_pages(self):
+        """
+        Test that walking back from the last page gives the same pages.
+        """
+        forward = self.walk(self.list_url)
+        last_page = self.client.get(self.list_url, {'page_size': 9}).data['next']
+        backward = self.walk(last_page, link='previous')
+        self.assertEqual(backward[0], self.expected_ids[9:])
+
+        response = self.client.get(self.list_url, {'page_size': 3})
+        second = self.client.get(response.data['next'])
+        first = self.client.get(second.data['previous'])
+        self.assertEqual([post['id'] for post in first.data['results']], forward[0])
+
+
+    def test_client_page_size(self):
+        """
+        Test that clients can choose the page size.
+        """
+        response = self.client.get(self.list_url, {'page_size': 8})
+        self.assertEqual(len(response.data['results']), 8)
+        self.assertIn('page_size=8', response.data['next'])
+
+
+    def test_page_size_is_capped(self):
+        """
+        Test that the page size cannot exceed the server maximum.
+        """
+        Post.objects.bulk_create([
+            Post(user=self.user, title=f'Bulk {index}', content='Content')
+            for index in range(PostCursorPagination.max_page_size + 5)
+        ])
+        response = self.client.get(self.list_url, {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), PostCursorPagination.max_page_size)
+
+
+    def test_invalid_cursor(self):
+        """
+        Test that malformed positions are rejected with a 404.
+        """
+        for position in ('not-a-date|1', '2026-01-01T00:00:00+00:00', '2026-01-01T00:00:00+00:00|x'):
+            cursor = b64encode(f'p={position}'.encode()).decode()
+            response = self.client.get(self.list_url, {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,188 @@
+import asyncio
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.contrib.auth import get_user_model
+from core.post.models import Post
+from core.profiling import RequestProfile, create_profile_token
+
+User = get_user_model()
+
+
+def unprofiled_marker():
+    pass
+
+
+class ProfilingTest(APITestCase):
+    """
+    Tests for the on-demand request profiling of ProfilingMiddleware.
+    """
+
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            email='staff@example.com', username='staffuser', password='password123', is_staff=True,
+        )
+        self.user = User.objects.create_user(email='user@example.com', username='plainuser', password='password123')
+        self.post = Post.objects.create(user=self.user, title='Post', content='Content')
+        self.list_url = reverse('post-list')
+        self.like_url = reverse('post-like', kwargs={'pk': self.post.pk})
+
+
+    def authenticate(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+
+
+    def get_report(self, response):
+        report = self.client.get(
+            reverse('profile-report', kwargs={'profile_id': response['X-Profile-Id']}),
+            HTTP_X_PROFILE_TOKEN=create_profile_token(),
+        )
+        self.assertEqual(report.status_code, status.HTTP_200_OK)
+        return report.content.decode()
+
+
+    def test_not_profiled_without_header(self):
+        """
+        Test that requests without the header are not profiled.
+        """
+        self.authenticate(self.staff)
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Profile-Id', response)
+
+
+    def test_staff_request_is_profiled(self):
+        """
+        Test that a staff user gets the slowest functions in a header and
+        the full report at the profile URL.
+        """
+        self.authenticate(self.staff)
+        response = self.client.put(self.like_url, HTTP_X_PROFILE='1')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(';dur=', response['X-Profile-Top'])
+        report = self.get_report(response)
+        self.assertIn('cumulative', report)
+        self.assertNotIn('allocation sites', report)
+
+
+    def test_other_users_are_not_profiled(self):
+        """
+        Test that the header is ignored for users who are not staff.
+        """
+        self.authenticate(self.user)
+        response = self.client.get(self.list_url, HTTP_X_PROFILE='1')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Profile-Id', response)
+
+
+    def test_signed_token(self):
+        """
+        Test that a signed token enables profiling for any user,
+        including allocations when asked.
+        """
+        self.authenticate(self.user)
+        response = self.client.get(self.list_url, HTTP_X_PROFILE=create_profile_token())
+        self.assertNotIn('allocation sites', self.get_report(response))
+
+        response = self.client.get(self.list_url, HTTP_X_PROFILE=create_profile_token(memory=True))
+        self.assertIn('allocation sites', self.get_report(response))
+
+
+    def test_invalid_token_is_ignored(self):
+        """
+        Test that a tampered token does not enable profiling.
+        """
+        self.authenticate(self.user)
+        response = self.client.get(self.list_url, HTTP_X_PROFILE=create_profile_token() + 'x')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Profile-Id', response)
+
+
+    def test_unknown_report(self):
+        """
+        Test that an unknown or expired profile is a 404.
+        """
+        response = self.client.get(
+            reverse('profile-report', kwargs={'profile_id': 'missing'}), HTTP_X_PROFILE_TOKEN=create_profile_token(),
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+    def test_report_requires_token(self):
+        """
+        Test that reports are only served to clients holding a valid token.
+        """
+        self.authenticate(self.staff)
+        response = self.client.put(self.like_url, HTTP_X_PROFILE='1')
+        url = reverse('profile-report', kwargs={'profile_id': response['X-Profile-Id']})
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(
+            self.client.get(url, HTTP_X_PROFILE_TOKEN=create_profile_token() + 'x').status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+
+
+    def test_overlapping_profile_is_skipped(self):
+        """
+        Test that a request arriving while another one is profiled runs
+        unprofiled and says so, rather than failing.
+        """
+        self.authenticate(self.staff)
+        with RequestProfile() as outer:
+            response = self.client.get(self.list_url, HTTP_X_PROFILE='memory')
+        self.assertTrue(outer.active)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Profile-Skipped'], 'busy')
+        self.assertNotIn('X-Profile-Id', response)
+
+        response = self.client.get(self.list_url, HTTP_X_PROFILE='1')
+        self.assertIn('X-Profile-Id', response)
+
+
+    def test_async_profile_only_records_its_own_steps(self):
+        """
+        Test that an awaitable is profiled step by step, without the frames
+        of coroutines running on the loop while it waits.
+        """
+        async def profiled():
+            await asyncio.sleep(0.01)
+            return 'done'
+
+        async def background():
+            for _ in range(3):
+                await asyncio.sleep(0.002)
+                unprofiled_marker()
+
+        async def scenario(profile):
+            task = asyncio.ensure_future(background())
+            result = await profile.run(profiled())
+            await task
+            return result
+
+        profile = RequestProfile()
+        self.assertEqual(asyncio.run(scenario(profile)), 'done')
+        names = {function[2] for function in profile.get_stats().stats}
+        self.assertIn('profiled', names)
+        self.assertNotIn('unprofiled_marker', names)
+
+
+    def test_profile_token_command(self):
+        """
+        Test that the command prints a token the middleware accepts.
+        """
+        self.authenticate(self.user)
+        out = StringIO()
+        call_command('profile_token', '--memory', stdout=out)
+        response = self.client.get(self.list_url, HTTP_X_PROFILE=out.getvalue().strip())
+
+        self.assertIn('allocation sites', self.get_report(response))
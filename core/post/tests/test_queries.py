@@ -0,0 +1,173 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from core.post.models import Post, Like, Comment
+from core.post.serializers import PostSerializer
+
+User = get_user_model()
+
+
+class PostQueryCountTest(APITestCase):
+    """
+    Regression tests for the number of queries run by the post endpoints.
+    The cost of a request must not grow with the number of posts or likes.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='query@example.com', username='queryuser', password='password123')
+        self.other_user = User.objects.create_user(email='other@example.com', username='otheruser', password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse('post-list')
+
+
+    def create_posts(self, count):
+        """
+        Create posts from two authors, each one liked by both users.
+        """
+        posts = []
+        for index in range(count):
+            author = self.user if index % 2 else self.other_user
+            post = Post.objects.create(user=author, title=f'Post {index}', content='Content', likes_count=2)
+            Like.objects.create(user=self.user, post=post, like=True)
+            Like.objects.create(user=self.other_user, post=post, like=True)
+            posts.append(post)
+        return posts
+
+
+    def test_list_query_count_is_flat(self):
+        """
+        Test that a page costs the same number of queries with one or many posts.
+        """
+        self.create_posts(1)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url)
+        self.assertEqual(len(response.data['results']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_posts(10)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url)
+        self.assertEqual(len(response.data['results']), 3)
+
+        for post in response.data['results']:
+            self.assertEqual(post['likes_count'], 2)
+            self.assertTrue(post['is_liked'])
+
+
+    def test_filtered_list_query_count(self):
+        """
+        Test that filtering by username keeps a single query.
+        """
+        self.create_posts(6)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, {'user__username': 'otheruser'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for post in response.data['results']:
+            self.assertEqual(post['username'], 'otheruser')
+
+
+    def add_comments(self, posts, count):
+        """
+        Add comments from both users to each post.
+        """
+        Comment.objects.bulk_create([
+            Comment(user=self.user if index % 2 else self.other_user, post=post, comment=f'Comment {index}')
+            for post in posts for index in range(count)
+        ])
+
+
+    def test_list_with_comments_preview_query_count_is_flat(self):
+        """
+        Test that the latest comments of a whole page are fetched in one query.
+        """
+        self.add_comments(self.create_posts(1), 4)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.list_url, {'comments_preview': 2})
+        self.assertEqual(len(response.data['results'][0]['latest_comments']), 2)
+
+        self.add_comments(self.create_posts(20), 4)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.list_url, {'comments_preview': 2, 'page_size': 20})
+        self.assertEqual(len(response.data['results']), 20)
+
+        for post in response.data['results']:
+            self.assertEqual(post['comments_count'], 4)
+            self.assertEqual([comment['comment'] for comment in post['latest_comments']], ['Comment 3', 'Comment 2'])
+
+
+    def test_comments_query_count(self):
+        """
+        Test that a page of comments runs the post lookup and a single query.
+        """
+        post = self.create_posts(1)[0]
+        self.add_comments([post], 30)
+        comments_url = reverse('post-comments', kwargs={'pk': post.id})
+
+        with self.assertNumQueries(2):
+            response = self.client.get(comments_url)
+        self.assertEqual(len(response.data['results']), 10)
+
+        with self.assertNumQueries(2):
+            self.client.get(response.data['next'])
+
+
+    def test_retrieve_query_count(self):
+        """
+        Test that retrieving a post runs a single query.
+        """
+        post = self.create_posts(1)[0]
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('post-detail', kwargs={'pk': post.id}))
+        self.assertEqual(response.data['likes_count'], 2)
+        self.assertTrue(response.data['is_liked'])
+        self.assertEqual(response.data['username'], 'otheruser')
+
+
+    def test_like_query_count(self):
+        """
+        Test that the like toggle runs a fixed number of queries.
+        The counts include the savepoint opened around the write.
+        """
+        post = Post.objects.create(user=self.other_user, title='Liked', content='Content')
+        like_url = reverse('post-like', kwargs={'pk': post.id})
+
+        # Lookup, delete, insert and counter update
+        with self.assertNumQueries(6):
+            response = self.client.post(like_url)
+        self.assertEqual(response.data['likes_count'], 1)
+        self.assertTrue(response.data['is_liked'])
+
+        # Lookup, delete and counter update
+        with self.assertNumQueries(5):
+            response = self.client.post(like_url)
+        self.assertEqual(response.data['likes_count'], 0)
+        self.assertFalse(response.data['is_liked'])
+
+
+    def test_put_and_delete_like_query_count(self):
+        """
+        Test that PUT and DELETE run one write and one counter update.
+        """
+        post = Post.objects.create(user=self.other_user, title='Liked', content='Content')
+        like_url = reverse('post-like', kwargs={'pk': post.id})
+
+        with self.assertNumQueries(5):
+            response = self.client.put(like_url)
+        self.assertEqual(response.data, {'liked': True, 'likes_count': 1})
+
+        with self.assertNumQueries(5):
+            response = self.client.delete(like_url)
+        self.assertEqual(response.data, {'liked': False, 'likes_count': 0})
+
+
+    def test_serializer_fallback_without_annotations(self):
+        """
+        Test that the serializer still works for posts loaded without annotations.
+        """
+        post = self.create_posts(1)[0]
+        request = self.client.get(self.list_url).wsgi_request
+        request.user = self.user
+        data = PostSerializer(Post.objects.get(pk=post.id), context={'request': request}).data
+        self.assertEqual(data['likes_count'], 2)
+        self.assertTrue(data['is_liked'])
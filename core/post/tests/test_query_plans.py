@@ -0,0 +1,160 @@
+import re
+from datetime import timedelta
+from unittest import skipUnless
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from core.post.models import Post, Like, Comment
+
+User = get_user_model()
+
+# Plan nodes that mean a query is not served by an index
+POSTGRESQL_FORBIDDEN = re.compile(r'Seq Scan|(?:^|->\s+)(?:Incremental )?Sort\b', re.MULTILINE)
+
+
+@skipUnless(connection.vendor in ('postgresql', 'sqlite'), 'EXPLAIN output is only parsed for PostgreSQL and SQLite')
+class PostQueryPlanTest(APITestCase):
+    """
+    Run EXPLAIN on every query issued by the post endpoints against a seeded
+    database, and fail when a query falls back to a sequential scan or to
+    an explicit sort instead of using the feed indexes.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Seed enough rows for the planner to prefer indexes.
+        """
+        cls.users = User.objects.bulk_create([
+            User(email=f'plan{index}@example.com', username=f'plan{index}', password='!')
+            for index in range(20)
+        ])
+        cls.user = cls.users[0]
+
+        Post.objects.bulk_create([
+            Post(user=cls.users[index % 20], title=f'Post {index}', content='Content', likes_count=5 if index < 100 else 0)
+            for index in range(500)
+        ])
+        cls.post = Post.objects.order_by('id').first()
+
+        posts = list(Post.objects.order_by('id')[:100])
+        Like.objects.bulk_create([
+            Like(user=user, post=post, like=True)
+            for post in posts for user in cls.users[:5]
+        ])
+        Comment.objects.bulk_create([
+            Comment(user=user, post=post, comment='Comment')
+            for post in posts for user in cls.users[:3]
+        ])
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+        if connection.vendor == 'postgresql':
+            # Small tables are cheaper to scan, only check that an index plan exists
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+                cursor.execute('SET enable_sort = off')
+
+
+    def tearDown(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('RESET enable_seqscan')
+                cursor.execute('RESET enable_sort')
+
+
+    def explain(self, sql):
+        """
+        Return the plan of a query as text.
+        """
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('EXPLAIN ' + sql)
+                return '\n'.join(row[0] for row in cursor.fetchall())
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return '\n'.join(row[-1] for row in cursor.fetchall())
+
+
+    def assertIndexedPlan(self, sql):
+        plan = self.explain(sql)
+        if connection.vendor == 'postgresql':
+            problems = POSTGRESQL_FORBIDDEN.findall(plan)
+        else:
+            # Scanning the rows produced by a subquery is not a table scan
+            coroutines = {line.split(' ', 1)[1] for line in plan.splitlines() if line.startswith('CO-ROUTINE ')}
+            problems = [
+                line for line in plan.splitlines()
+                if 'TEMP B-TREE' in line
+                or (line.startswith('SCAN ') and ' USING ' not in line and line[5:] not in coroutines)
+            ]
+        self.assertFalse(problems, f'Query is not served by an index:\n{sql}\n\nPlan:\n{plan}')
+
+
+    def assertRequestUsesIndexes(self, method, url, data=None):
+        """
+        Run the request and check the plan of each query it issued.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, data)
+        self.assertLess(response.status_code, 400)
+
+        statements = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE'))
+        ]
+        self.assertTrue(statements)
+        for sql in statements:
+            self.assertIndexedPlan(sql)
+        return response
+
+
+    def test_list_plan(self):
+        response = self.assertRequestUsesIndexes('get', reverse('post-list'))
+        self.assertRequestUsesIndexes('get', response.data['next'])
+
+
+    def test_list_filtered_by_username_plan(self):
+        self.assertRequestUsesIndexes('get', reverse('post-list'), {'user__username': 'plan3'})
+
+
+    def test_retrieve_plan(self):
+        self.assertRequestUsesIndexes('get', reverse('post-detail', kwargs={'pk': self.post.id}))
+
+
+    def test_like_plans(self):
+        url = reverse('post-like', kwargs={'pk': self.post.id})
+        self.assertRequestUsesIndexes('post', url)
+        self.assertRequestUsesIndexes('put', url)
+        self.assertRequestUsesIndexes('delete', url)
+
+
+    def test_comments_by_post_plan(self):
+        queryset = Comment.objects.filter(post=self.post).order_by('created_datetime', 'id')
+        self.assertIndexedPlan(str(queryset.query))
+
+
+    def test_comments_plan(self):
+        url = reverse('post-comments', kwargs={'pk': self.post.id})
+        response = self.assertRequestUsesIndexes('get', url, {'page_size': 1})
+        self.assertRequestUsesIndexes('get', response.data['next'])
+
+
+    def test_list_with_comments_preview_plan(self):
+        # Bring a commented post to the first page
+        Post.objects.filter(pk=self.post.pk).update(updated_datetime=timezone.now() + timedelta(days=1))
+        response = self.assertRequestUsesIndexes('get', reverse('post-list'), {'comments_preview': 3})
+        self.assertEqual(len(response.data['results'][0]['latest_comments']), 3)
+
+
+    def test_batch_plans(self):
+        ids = ','.join(str(post_id) for post_id in Post.objects.values_list('id', flat=True)[:50])
+        self.assertRequestUsesIndexes('get', reverse('post-batch'), {'ids': ids})
+        self.assertRequestUsesIndexes('get', reverse('post-likes-state'), {'ids': ids})
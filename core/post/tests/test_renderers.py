@@ -0,0 +1,85 @@
+import datetime
+import decimal
+import io
+import uuid
+import zoneinfo
+from unittest import mock
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import renderers, status
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from core.parsers import JSONParser
+from core.renderers import JSONRenderer
+
+User = get_user_model()
+
+
+class JSONRendererTest(APITestCase):
+    """
+    Tests for the orjson backed JSON renderer and parser.
+    """
+
+    data = {
+        'utc': datetime.datetime(2026, 1, 1, 12, 30, tzinfo=datetime.timezone.utc),
+        'paris': datetime.datetime(2026, 7, 1, 12, 30, 5, 123, tzinfo=zoneinfo.ZoneInfo('Europe/Paris')),
+        'date': datetime.date(2026, 1, 1),
+        'decimal': decimal.Decimal('1.10'),
+        'uuid': uuid.UUID('95a3479f-917f-468f-a420-0c7e3f937e42'),
+        'lazy': gettext_lazy('text'),
+        'unicode': 'é \u2028\u2029',
+        'tuple': (1, 2.5, None, True),
+        1: 'integer key',
+    }
+
+
+    def test_output_matches_drf(self):
+        """
+        Test that the output is byte for byte the one of DRF's renderer.
+        """
+        self.assertEqual(JSONRenderer().render(self.data), renderers.JSONRenderer().render(self.data))
+
+
+    def test_fallbacks(self):
+        """
+        Test that indented output, integers beyond 64 bits and a disabled
+        backend go through the standard library with the same output.
+        """
+        media_type = 'application/json; indent=2'
+        self.assertEqual(
+            JSONRenderer().render(self.data, media_type),
+            renderers.JSONRenderer().render(self.data, media_type),
+        )
+        self.assertEqual(JSONRenderer().render({'big': 2 ** 70}), b'{"big":1180591620717411303424}')
+
+        with mock.patch.object(JSONRenderer, 'use_orjson', False):
+            self.assertEqual(JSONRenderer().render(self.data), renderers.JSONRenderer().render(self.data))
+
+
+    def test_parser(self):
+        """
+        Test that bodies are parsed, and that invalid JSON and NaN are
+        rejected.
+        """
+        parser = JSONParser()
+        self.assertEqual(parser.parse(io.BytesIO('{"title": "é", "ids": [1, 2]}'.encode())), {'title': 'é', 'ids': [1, 2]})
+
+        for body in (b'{"title":', b'{"value": NaN}', b'\xff'):
+            with self.assertRaises(ParseError):
+                parser.parse(io.BytesIO(body))
+
+
+    def test_api(self):
+        """
+        Test a JSON request and response through the API.
+        """
+        user = User.objects.create_user(email='json@example.com', username='jsonuser', password='password123')
+        self.client.force_authenticate(user=user)
+
+        response = self.client.post(reverse('post-list'), {'title': 'Title é', 'content': 'Content'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['title'], 'Title é')
+
+        response = self.client.post(reverse('post-list'), b'{"title":', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,114 @@
+from unittest import skipUnless
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from core.post.models import Post
+
+User = get_user_model()
+
+
+class PostSearchTest(APITestCase):
+    """
+    Test suite for the search parameter of the post feed.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='search@example.com', username='searchuser', password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse('post-list')
+
+        self.django_title = Post.objects.create(user=self.user, title='Django tips', content='Views and models')
+        self.django_content = Post.objects.create(user=self.user, title='Weekend', content='Learning django at home')
+        self.both = Post.objects.create(user=self.user, title='Django REST', content='Django serializers')
+        self.unrelated = Post.objects.create(user=self.user, title='Cooking', content='Pasta recipes')
+
+
+    def search(self, terms, **params):
+        response = self.client.get(self.list_url, {'search': terms, 'page_size': 10, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [post['id'] for post in response.data['results']]
+
+
+    def test_search_matches_title_and_content(self):
+        """
+        Test that a word is looked up in both the title and the content.
+        """
+        ids = self.search('django')
+        self.assertCountEqual(ids, [self.django_title.id, self.django_content.id, self.both.id])
+
+
+    def test_search_requires_every_word(self):
+        """
+        Test that every word of the search must match.
+        """
+        self.assertEqual(self.search('django serializers'), [self.both.id])
+        self.assertEqual(self.search('pasta'), [self.unrelated.id])
+        self.assertEqual(self.search('nothing'), [])
+
+
+    def test_search_combines_with_username_filter(self):
+        """
+        Test that search works together with the username filter.
+        """
+        other = User.objects.create_user(email='other@example.com', username='otheruser', password='password123')
+        Post.objects.create(user=other, title='Django elsewhere', content='Content')
+        ids = self.search('django', user__username='searchuser')
+        self.assertEqual(len(ids), 3)
+
+
+    def test_search_with_cursor_pagination(self):
+        """
+        Test that paging through search results returns every match once.
+        """
+        for index in range(5):
+            Post.objects.create(user=self.user, title=f'Django post {index}', content='Content')
+
+        ids = []
+        response = self.client.get(self.list_url, {'search': 'django', 'page_size': 2})
+        while True:
+            ids.extend(post['id'] for post in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(len(ids), 8)
+        self.assertEqual(len(set(ids)), 8)
+        self.assertNotIn(self.unrelated.id, ids)
+
+
+    @skipUnless(connection.vendor == 'postgresql', 'Relevance ranking requires PostgreSQL')
+    def test_ranked_pages_in_both_directions(self):
+        """
+        Test that paging through results of many different and equal ranks
+        returns every match once, forward and backward.
+        """
+        for index in range(12):
+            Post.objects.create(user=self.user, title=f'Django post {index}', content='django ' * (index % 4) + 'words')
+
+        pages = []
+        response = self.client.get(self.list_url, {'search': 'django', 'page_size': 2})
+        while True:
+            pages.append([post['id'] for post in response.data['results']])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        ids = [id for page in pages for id in page]
+        self.assertEqual(len(ids), 15)
+        self.assertEqual(len(set(ids)), 15)
+
+        backward = [[post['id'] for post in response.data['results']]]
+        while response.data['previous']:
+            response = self.client.get(response.data['previous'])
+            backward.insert(0, [post['id'] for post in response.data['results']])
+        self.assertEqual(backward, pages)
+
+
+    @skipUnless(connection.vendor == 'postgresql', 'Relevance ranking requires PostgreSQL')
+    def test_search_is_ranked_by_relevance(self):
+        """
+        Test that posts matching in the title and the content come first.
+        """
+        ids = self.search('django')
+        self.assertEqual(ids[0], self.both.id)
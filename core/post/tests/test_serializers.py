@@ -0,0 +1,84 @@
+from unittest import mock
+from django.db.models import FloatField, Value
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, APITestCase
+from django.contrib.auth import get_user_model
+from core.post.models import Post, Like, Comment
+from core.post.serializers import PostSerializer, PostValuesSerializer
+from core.post.viewsets import PostViewSet
+from core.renderers import JSONRenderer
+
+User = get_user_model()
+
+
+class PostValuesSerializerTest(APITestCase):
+    """
+    Tests for the read-only serializer of the post list pages.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='values@example.com', username='valuesuser', password='password123')
+        self.other_user = User.objects.create_user(email='other@example.com', username='otheruser', password='password123')
+        for index in range(4):
+            author = self.user if index % 2 else self.other_user
+            post = Post.objects.create(user=author, title=f'Post {index}', content=f'Content "{index}" é')
+            Comment.objects.create(user=self.user, post=post, comment='Comment')
+        Like.objects.like(self.user, post)
+        self.client.force_authenticate(user=self.user)
+
+
+    def get_viewset(self):
+        request = APIRequestFactory().get('/api/post/')
+        request.user = self.user
+        return PostViewSet(request=request, action='list', format_kwarg=None, kwargs={})
+
+
+    def test_output_is_identical(self):
+        """
+        Test that rows render to the same bytes as PostSerializer renders
+        the model instances of the same queryset.
+        """
+        viewset = self.get_viewset()
+        queryset = viewset.get_queryset()
+        expected = PostSerializer(list(queryset), many=True, context={}).data
+        data = PostValuesSerializer(list(PostValuesSerializer.get_queryset(queryset))).data
+
+        self.assertEqual(JSONRenderer().render(data), JSONRenderer().render(expected))
+        self.assertTrue(any(post['is_liked'] for post in data))
+
+        with timezone.override('Europe/Paris'):
+            expected = PostSerializer(list(queryset.all()), many=True, context={}).data
+            data = PostValuesSerializer(list(PostValuesSerializer.get_queryset(queryset))).data
+        self.assertEqual(JSONRenderer().render(data), JSONRenderer().render(expected))
+        self.assertFalse(data[0]['created_datetime'].endswith('Z'))
+
+
+    def test_extra_annotations_are_left_out(self):
+        """
+        Test that annotations the page is ordered by, like the search rank,
+        are fetched but not part of the output.
+        """
+        queryset = self.get_viewset().get_queryset().annotate(search_rank=Value(1.0, output_field=FloatField()))
+        rows = list(PostValuesSerializer.get_queryset(queryset))
+
+        self.assertEqual(rows[0].search_rank, 1.0)
+        self.assertNotIn('search_rank', PostValuesSerializer(rows).data[0])
+
+
+    def test_list_uses_rows(self):
+        """
+        Test that list pages are read as rows, and comment previews still
+        go through PostSerializer.
+        """
+        url = reverse('post-list')
+        get_queryset = mock.patch.object(PostValuesSerializer, 'get_queryset', wraps=PostValuesSerializer.get_queryset)
+        with get_queryset as rows:
+            response = self.client.get(url, {'page_size': 10})
+        rows.assert_called_once()
+        self.assertEqual(len(response.data['results']), 4)
+
+        with get_queryset as rows:
+            response = self.client.get(url, {'page_size': 10, 'comments_preview': 1})
+        rows.assert_not_called()
+        self.assertEqual(len(response.data['results'][0]['latest_comments']), 1)
@@ -0,0 +1,118 @@
+import json
+import re
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth import get_user_model
+from core.post.models import Post
+
+User = get_user_model()
+
+
+class ServerTimingTest(APITestCase):
+    """
+    Tests for the Server-Timing header and the request log of
+    ServerTimingMiddleware.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='timing@example.com', username='timinguser', password='password123')
+        self.posts = [Post.objects.create(user=self.user, title=f'Post {index}', content='Content') for index in range(3)]
+        self.token = f'Bearer {AccessToken.for_user(self.user)}'
+        self.client.credentials(HTTP_AUTHORIZATION=self.token)
+        self.list_url = reverse('post-list')
+
+
+    def get_metrics(self, response):
+        """
+        Parse the Server-Timing header into {name: (duration, description)}.
+        """
+        metrics = {}
+        for metric in response['Server-Timing'].split(', '):
+            name, *params = metric.split(';')
+            params = dict(param.split('=', 1) for param in params)
+            metrics[name] = (float(params['dur']), params.get('desc', '').strip('"'))
+        return metrics
+
+
+    def test_header_reports_queries_and_sections(self):
+        """
+        Test that the header has the query count of the request and the
+        authentication, serialization and rendering times.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        metrics = self.get_metrics(response)
+        self.assertEqual(set(metrics), {'db', 'auth', 'serialize', 'render', 'total'})
+        self.assertEqual(metrics['db'][1], f'{len(context.captured_queries)} queries')
+        self.assertGreaterEqual(metrics['total'][0], metrics['serialize'][0])
+
+
+    def test_log_line_is_keyed_by_basename_and_action(self):
+        """
+        Test that each request logs one JSON line with its view and action.
+        """
+        with self.assertLogs('core.timing', 'INFO') as logs:
+            self.client.put(reverse('post-like', kwargs={'pk': self.posts[0].pk}))
+        fields = json.loads(logs.records[0].getMessage())
+        self.assertEqual((fields['view'], fields['action'], fields['status']), ('post', 'like', 200))
+        self.assertGreater(fields['queries'], 0)
+        self.assertEqual(logs.records[0].request_timing, fields)
+
+
+    @override_settings(REQUEST_TIMING_SLOW_QUERIES=1)
+    def test_request_over_query_limit_logs_its_sql(self):
+        """
+        Test that a request running more queries than the limit is logged as
+        a warning with its statements.
+        """
+        with self.assertLogs('core.timing', 'WARNING') as logs:
+            self.client.get(self.list_url)
+        message = logs.records[0].getMessage()
+        self.assertTrue(message.startswith('Slow request GET /api/post/ (post list)'))
+        self.assertIn('FROM "post_post"', message)
+
+
+    @override_settings(REQUEST_TIMING_SLOW_QUERIES=1)
+    def test_slow_request_log_leaves_out_query_parameters(self):
+        """
+        Test that parameters, such as emails or password hashes, stay out of
+        the slow request log.
+        """
+        with self.assertLogs('core.timing', 'WARNING') as logs:
+            self.client.get(self.list_url, {'user__username': 'private-username'})
+        message = logs.records[0].getMessage()
+        self.assertIn('"username" = %s', message)
+        self.assertNotIn('private-username', message)
+
+
+    def test_fast_request_is_not_logged_as_slow(self):
+        """
+        Test that requests under both limits only log their timing line.
+        """
+        with self.assertLogs('core.timing', 'INFO') as logs:
+            self.client.get(reverse('post-detail', kwargs={'pk': self.posts[0].pk}))
+        self.assertEqual([record.levelname for record in logs.records], ['INFO'])
+
+
+    @override_settings(REQUEST_TIMING_HEADER=False)
+    def test_header_can_be_disabled(self):
+        response = self.client.get(self.list_url)
+        self.assertNotIn('Server-Timing', response)
+
+
+    async def test_async_view_queries_are_counted(self):
+        """
+        Test that queries run by the async ORM in worker threads are counted.
+        """
+        response = await self.async_client.get(reverse('async-post-list'), headers={'Authorization': self.token})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        db = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', response['Server-Timing'])
+        self.assertGreater(int(db.group(1)), 0)
+        self.assertIn('auth;dur=', response['Server-Timing'])
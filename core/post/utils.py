@@ -0,0 +1,17 @@
+from contextlib import contextmanager
+
+
+@contextmanager
+def auto_now_disabled(model, *field_names):
+    """
+    Let bulk_create() store explicit values in auto_now/auto_now_add fields.
+    """
+    fields = [model._meta.get_field(name) for name in field_names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
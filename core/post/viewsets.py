@@ -1,44 +1,377 @@
-from rest_framework import viewsets, permissions
+from collections import defaultdict
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from rest_framework import viewsets, permissions, serializers, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.pagination import CursorPagination
+from django.db.models import Count, Exists, F, OuterRef, Subquery, Value, BooleanField, Window
+from django.db.models.functions import Coalesce, RowNumber
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Post, Like
-from .serializers import PostSerializer
-from .filters import PostFilter
+from .models import Post, Like, Comment
+from .serializers import PostSerializer, PostValuesSerializer, CommentSerializer, PostBulkDeleteSerializer
+from .filters import PostFilter, PostExportFilter, PostSearchFilter
+from .pagination import PostCursorPagination, CommentCursorPagination
+from .conditional import ConditionalGetMixin, get_validators
+from .cache import feed_cache
 from core.authentication.permissions import UserPermission
+from core.renderers import JSONRenderer
 
 
-class PostCursorPagination(CursorPagination):
-    page_size = 3
-    ordering = '-updated_datetime'
-
-
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'put', 'patch', 'delete']
-    queryset = Post.objects.all().order_by('-updated_datetime')
+    queryset = Post.objects.all().order_by('-updated_datetime', '-id')
     serializer_class = PostSerializer
     permission_classes = [UserPermission]
     pagination_class = PostCursorPagination
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, PostSearchFilter]
     filterset_class = PostFilter
+    # Everything a cached list page or post depends on, see ConditionalGetMixin
+    validator_fields = ('pk', 'updated_datetime', 'likes_count', 'is_liked', 'user__username', 'comments_count')
+    # Upper bound of the latest comments shown per post with ?comments_preview=K
+    max_comments_preview = 5
+    # Upper bound of the posts fetched by one ?ids= request
+    max_batch_ids = 300
+    # Posts read from the database cursor and written at once by the export
+    export_chunk_size = 2000
+
+    def get_queryset(self):
+        """
+        Compute the author, the like state of the requesting user and the
+        comments count in the main query, so serializing a page of posts does
+        not run extra queries per post. The likes count is stored on the post
+        itself.
+        """
+        queryset = super().get_queryset()
+        if self.action in ('comments', 'export'):
+            # Only the post id is needed to list or add its comments, the
+            # export counts comments and likes per chunk of posts
+            return queryset
+
+        user = getattr(self.request, 'user', None)
+        if user and user.is_authenticated:
+            is_liked = Exists(Like.objects.filter(post=OuterRef('pk'), user=user))
+        else:
+            is_liked = Value(False, output_field=BooleanField())
+
+        # A correlated count keeps the feed ordered by its index, where a
+        # join would need a GROUP BY followed by a sort
+        comments_count = Coalesce(Subquery(
+            Comment.objects.filter(post=OuterRef('pk')).order_by()
+            .values('post').annotate(count=Count('pk')).values('count')
+        ), 0)
+
+        return queryset.select_related('user').annotate(is_liked=is_liked, comments_count=comments_count)
+
+    def get_validator_row(self, instance):
+        if isinstance(instance, tuple):
+            # A row of PostValuesSerializer
+            return (instance.id, instance.updated_datetime, instance.likes_count, instance.is_liked, instance.user__username, instance.comments_count)
+        return (instance.pk, instance.updated_datetime, instance.likes_count, instance.is_liked, instance.user.username, instance.comments_count)
+
+    def get_comments_preview(self):
+        """
+        Return the number of latest comments requested per post, 0 for none.
+        """
+        try:
+            count = int(self.request.query_params.get('comments_preview', 0))
+        except ValueError:
+            return 0
+        return max(0, min(count, self.max_comments_preview))
+
+    def get_requested_ids(self):
+        """
+        Parse the comma separated ?ids= parameter, dropping duplicates.
+        """
+        value = self.request.query_params.get('ids', '')
+        try:
+            ids = list(dict.fromkeys(int(post_id) for post_id in value.split(',') if post_id.strip()))
+        except ValueError:
+            raise serializers.ValidationError({'ids': ['Expected a comma separated list of post ids.']})
+        if not ids:
+            raise serializers.ValidationError({'ids': ['This parameter is required.']})
+        if len(ids) > self.max_batch_ids:
+            raise serializers.ValidationError({'ids': [f'Ensure this parameter has no more than {self.max_batch_ids} ids.']})
+        return ids
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['comments_preview'] = self.get_comments_preview()
+        return context
+
+    def use_values_serializer(self):
+        """
+        Whether list pages are read as rows and serialized by
+        PostValuesSerializer, which cannot show comment previews.
+        """
+        return self.action == 'list' and not self.get_comments_preview()
+
+    def paginate_queryset(self, queryset):
+        if self.use_values_serializer():
+            queryset = PostValuesSerializer.get_queryset(queryset)
+        page = super().paginate_queryset(queryset)
+        if page is not None and self.action == 'list':
+            count = self.get_comments_preview()
+            if count:
+                self.attach_comment_previews(page, count)
+        return page
+
+    def get_serializer(self, *args, **kwargs):
+        # Pages read as rows by paginate_queryset()
+        page = args[0] if args else None
+        if kwargs.get('many') and isinstance(page, list) and page and isinstance(page[0], tuple):
+            return PostValuesSerializer(*args, **kwargs)
+        return super().get_serializer(*args, **kwargs)
+
+    def attach_comment_previews(self, posts, count):
+        """
+        Fetch the latest comments of every post of a page in one query.
+        """
+        queryset = self.get_comment_previews_queryset(posts, count)
+        self.set_comment_previews(posts, queryset if queryset is not None else [])
+
+    def get_comment_previews_queryset(self, posts, count):
+        """
+        Return the count latest comments of each post, numbered per post with
+        a window function, or None when no post has comments.
+        """
+        post_ids = [post.pk for post in posts if post.comments_count]
+        if not post_ids:
+            return None
+        return (
+            Comment.objects.filter(post_id__in=post_ids)
+            .select_related('user')
+            .annotate(position=Window(
+                RowNumber(),
+                partition_by=F('post_id'),
+                order_by=(F('created_datetime').desc(), F('id').desc()),
+            ))
+            .filter(position__lte=count)
+            .order_by()
+        )
+
+    def set_comment_previews(self, posts, comments):
+        by_post = defaultdict(list)
+        # At most count comments per post, sorted here rather than by the database
+        for comment in sorted(comments, key=lambda comment: comment.position):
+            by_post[comment.post_id].append(comment)
+        for post in posts:
+            post.latest_comments = by_post[post.pk]
+
+    def list(self, request, *args, **kwargs):
+        """
+        Serve the first page of each filter combination from the feed cache.
+        The cached page is shared by all users, only their like state is
+        fetched on a hit.
+        """
+        cache_key = feed_cache.get_key(request)
+        if cache_key is None:
+            return super().list(request, *args, **kwargs)
+
+        entry = feed_cache.get(cache_key)
+        if entry is None:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code == 200:
+                feed_cache.set(cache_key, self.get_feed_cache_entry(response.data))
+            response['X-Feed-Cache'] = 'miss'
+            return response
+
+        liked_ids = set(
+            Like.objects.filter(user=request.user, post_id__in=[row[0] for row in entry['rows']])
+            .values_list('post_id', flat=True)
+        )
+        rows = [row[:3] + (row[0] in liked_ids,) + row[4:] for row in entry['rows']]
+        validators = get_validators(rows, entry['has_next'], entry['has_previous'])
+
+        if self.is_conditional_request(request):
+            not_modified = self.get_not_modified_response(request, *validators)
+            if not_modified is not None:
+                return not_modified
+
+        results = [{**post, 'is_liked': post['id'] in liked_ids} for post in entry['results']]
+        response = Response({'next': entry['next'], 'previous': entry['previous'], 'results': results})
+        self.set_validators(response, *validators)
+        response['X-Feed-Cache'] = 'hit'
+        return response
+
+    def get_feed_cache_entry(self, data):
+        """
+        Keep the user independent part of a freshly served first page.
+        """
+        return {
+            'next': data['next'],
+            'previous': data['previous'],
+            'results': [{**post, 'is_liked': False} for post in data['results']],
+            # Validator rows, the like state at index 3 is overlaid on a hit
+            'rows': [row[:3] + (False,) + row[4:] for row in map(self.get_validator_row, self.paginator.page)],
+            'has_next': self.paginator.has_next,
+            'has_previous': self.paginator.has_previous,
+        }
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        post = serializer.save(user=self.request.user)
+        # A new post has no likes or comments, skip querying them
+        post.is_liked = False
+        post.comments_count = 0
+
+    def get_bulk_max_items(self):
+        return getattr(settings, 'POST_BULK_MAX_ITEMS', 1000)
+
+    @action(detail=False, methods=['post', 'delete'])
+    def bulk(self, request):
+        """
+        POST creates a list of posts in one transaction, or none of them when
+        any item is invalid, with the errors listed in the order of the items.
+        DELETE removes the posts of the requesting user among the given ids.
+        """
+        max_items = self.get_bulk_max_items()
+
+        if request.method == 'DELETE':
+            serializer = PostBulkDeleteSerializer(data=request.data, max_items=max_items)
+            serializer.is_valid(raise_exception=True)
+
+            # Same ownership rule as UserPermission.has_object_permission(),
+            # applied by the filter instead of per loaded post
+            posts = Post.objects.filter(user=request.user, pk__in=serializer.validated_data['ids'])
+            # Likes go through a fast delete, posts and comments are loaded to
+            # send post_delete, which invalidates the feed cache
+            _, deleted = posts.delete()
+            return Response({'deleted': deleted.get(Post._meta.label, 0)})
+
+        serializer = self.get_serializer(data=request.data, many=True, allow_empty=False, max_length=max_items)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save(user=request.user)
+            # bulk_create() does not send post_save
+            transaction.on_commit(feed_cache.invalidate)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], pagination_class=None, filter_backends=[])
+    def batch(self, request):
+        """
+        Return the posts with the given ?ids= in one query, in the requested
+        order. Unknown ids are left out.
+        """
+        ids = self.get_requested_ids()
+        posts = {post.pk: post for post in self.get_queryset().filter(pk__in=ids).order_by()}
+        posts = [posts[post_id] for post_id in ids if post_id in posts]
+
+        count = self.get_comments_preview()
+        if count:
+            self.attach_comment_previews(posts, count)
+
+        serializer = self.get_serializer(posts, many=True)
+        return Response({'results': serializer.data})
+
+    @action(detail=False, methods=['get'], url_path='likes/state', url_name='likes-state',
+            pagination_class=None, filter_backends=[])
+    def likes_state(self, request):
+        """
+        Return the like state of the requesting user and the likes count of
+        each post with the given ?ids=, keyed by post id.
+        """
+        ids = self.get_requested_ids()
+        rows = self.get_queryset().filter(pk__in=ids).order_by().values_list('pk', 'is_liked', 'likes_count')
+        return Response({
+            post_id: {'liked': is_liked, 'likes_count': likes_count}
+            for post_id, is_liked, likes_count in rows
+        })
+
+    @action(detail=False, methods=['get'], pagination_class=None, filter_backends=[DjangoFilterBackend],
+            filterset_class=PostExportFilter)
+    def export(self, request):
+        """
+        Stream every post matching the filters as NDJSON, one post per line
+        in the PostSerializer format, oldest update first.
 
-    @action(detail=True, methods=['post'])
+        Posts are read through a server-side cursor export_chunk_size at a
+        time. For each chunk, the like state of the requesting user and the
+        comments count are fetched with one query each, so memory does not
+        grow with the number of posts exported.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).order_by('updated_datetime', 'id')
+        content = self.stream_export(queryset)
+        if isinstance(request._request, ASGIRequest):
+            # Django would read a sync iterator to the end before sending it
+            content = iterate_in_thread(content)
+        response = StreamingHttpResponse(content, content_type='application/x-ndjson')
+        response['Content-Disposition'] = 'attachment; filename="posts.ndjson"'
+        return response
+
+    def stream_export(self, queryset):
+        # is_liked and comments_count, the last columns, are fetched per chunk
+        columns = [column for _, column in PostValuesSerializer.columns[:-2]]
+        rows = queryset.values_list(*columns).iterator(chunk_size=self.export_chunk_size)
+        user = self.request.user
+        renderer = JSONRenderer()
+
+        while chunk := list(islice(rows, self.export_chunk_size)):
+            ids = [row[0] for row in chunk]
+            liked_ids = set(Like.objects.filter(user=user, post_id__in=ids).values_list('post_id', flat=True))
+            comments_counts = dict(
+                Comment.objects.filter(post_id__in=ids).order_by()
+                .values('post').annotate(count=Count('pk')).values_list('post', 'count')
+            )
+            posts = PostValuesSerializer([
+                row + (row[0] in liked_ids, comments_counts.get(row[0], 0)) for row in chunk
+            ]).data
+            yield renderer.render_lines(posts)
+
+    @action(detail=True, methods=['get', 'post'], serializer_class=CommentSerializer,
+            pagination_class=CommentCursorPagination, filter_backends=[])
+    def comments(self, request, pk=None):
+        """
+        GET lists the comments of the post oldest first, POST adds a comment
+        of the requesting user.
+        """
+        post = self.get_object()
+
+        if request.method == 'POST':
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            serializer.save(user=request.user, post=post)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+        queryset = Comment.objects.filter(post=post).select_related('user')
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['post', 'put', 'delete'])
     def like(self, request, pk=None):
+        """
+        POST toggles the like of the requesting user and returns the post.
+        PUT likes and DELETE unlikes the post; both are idempotent and
+        return only the resulting like state.
+        """
         post = self.get_object()
         user = request.user
 
-        like_obj = Like.objects.filter(user=user, post=post).first()
-
-        if like_obj:
-            like_obj.delete()
+        if request.method == 'PUT':
+            liked, likes_count = Like.objects.like(user, post)
+        elif request.method == 'DELETE':
+            liked, likes_count = Like.objects.unlike(user, post)
         else:
-            Like.objects.create(user=user, post=post, like=True)
+            liked, likes_count = Like.objects.toggle(user, post)
+
+            # The like does not touch any other column, update the loaded post
+            post.likes_count = likes_count
+            post.is_liked = liked
+            serializer = self.get_serializer(post)
+            return Response(serializer.data)
+
+        return Response({'liked': liked, 'likes_count': likes_count})
 
-        post.refresh_from_db()
-        serializer = self.get_serializer(post)
-        return Response(serializer.data)
 
+async def iterate_in_thread(iterator):
+    """
+    Iterate a sync iterator running database queries from async code, each
+    step in the thread of the request, which holds its database connection.
+    """
+    next_item = sync_to_async(next)
+    sentinel = object()
+    while (item := await next_item(iterator, sentinel)) is not sentinel:
+        yield item
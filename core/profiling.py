@@ -0,0 +1,163 @@
+import cProfile
+import io
+import pstats
+import threading
+import tracemalloc
+import uuid
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+# Signed tokens, see create_profile_token()
+TOKEN_SALT = 'core.profiling'
+
+# cProfile and tracemalloc are process-wide, one request is profiled at a time
+_lock = threading.Lock()
+
+
+def create_profile_token(memory=False):
+    """
+    Return a value for the X-Profile header enabling profiling for anyone
+    holding it, until PROFILING_TOKEN_MAX_AGE seconds have passed.
+    """
+    return signing.dumps({'memory': memory}, salt=TOKEN_SALT, compress=True)
+
+
+def read_profile_token(value):
+    """
+    Return the options of a signed token, or None if it is invalid or expired.
+    """
+    try:
+        options = signing.loads(value, salt=TOKEN_SALT, max_age=getattr(settings, 'PROFILING_TOKEN_MAX_AGE', 3600))
+    except signing.BadSignature:
+        return None
+    return options if isinstance(options, dict) else None
+
+
+def get_report_cache_key(profile_id):
+    return f'profile:{profile_id}'
+
+
+class RequestProfile:
+    """
+    Run a block under cProfile, and tracemalloc when memory is set, then
+    build a text report of the functions with the highest cumulative time
+    and of the lines that allocated the most memory.
+
+    Only one profile runs at a time in the process: when another request is
+    being profiled, or another profiler is active, the block runs without
+    profiling and active is False.
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.profiler = cProfile.Profile()
+        self.snapshot = None
+        self.active = False
+        self._started_tracing = False
+
+    def __enter__(self):
+        if not _lock.acquire(blocking=False):
+            return self
+        try:
+            # Raises ValueError from Python 3.12 when another profiler is active
+            self.profiler.enable()
+        except ValueError:
+            _lock.release()
+            return self
+        self.active = True
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def __exit__(self, *exc_info):
+        if not self.active:
+            return
+        try:
+            self.profiler.disable()
+            if self.memory:
+                self.snapshot = tracemalloc.take_snapshot().filter_traces((
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                ))
+                if self._started_tracing:
+                    tracemalloc.stop()
+        finally:
+            _lock.release()
+
+    async def run(self, awaitable):
+        """
+        Await awaitable profiling only its own steps, cProfile is disabled
+        whenever it yields to the event loop so the frames of other requests
+        are not recorded. Allocations of other requests are still traced.
+        """
+        with self:
+            if not self.active:
+                return await awaitable
+            self.profiler.disable()
+            try:
+                return await _ProfiledAwaitable(awaitable, self.profiler)
+            finally:
+                self.profiler.enable()
+
+    def get_stats(self):
+        return pstats.Stats(self.profiler).sort_stats(pstats.SortKey.CUMULATIVE)
+
+    def top_functions(self, count):
+        """
+        Return (label, cumulative seconds) of the count slowest functions.
+        """
+        stats = self.get_stats()
+        rows = []
+        for function in stats.fcn_list[:count]:
+            filename, line, name = function
+            _, _, _, cumulative, _ = stats.stats[function]
+            label = f'{filename.rsplit("/", 1)[-1]}:{line}({name})' if line else name
+            rows.append((label, cumulative))
+        return rows
+
+    def report(self, count):
+        output = io.StringIO()
+        stats = self.get_stats()
+        stats.stream = output
+        stats.print_stats(count)
+
+        if self.snapshot is not None:
+            output.write(f'Top {count} allocation sites\n\n')
+            for statistic in self.snapshot.statistics('lineno')[:count]:
+                output.write(f'{statistic}\n')
+        return output.getvalue()
+
+    def save(self, count, timeout):
+        """
+        Store the report in the cache and return its id.
+        """
+        profile_id = uuid.uuid4().hex
+        cache.set(get_report_cache_key(profile_id), self.report(count), timeout)
+        return profile_id
+
+
+class _ProfiledAwaitable:
+    """
+    Drive a coroutine step by step, enabling profiler around each step.
+    """
+
+    def __init__(self, awaitable, profiler):
+        self.awaitable = awaitable
+        self.profiler = profiler
+
+    def __await__(self):
+        iterator = self.awaitable.__await__()
+        send, value = iterator.send, None
+        while True:
+            self.profiler.enable()
+            try:
+                yielded = send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.profiler.disable()
+            try:
+                send, value = iterator.send, (yield yielded)
+            except BaseException as error:
+                send, value = iterator.throw, error
@@ -0,0 +1,76 @@
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+from core.timing import timed
+
+try:
+    import orjson
+except ImportError:
+    # Optional, responses are encoded by the standard library without it
+    orjson = None
+
+# Escaped by DRF so the output is valid JavaScript
+LINE_SEPARATORS = (('\u2028'.encode(), b'\\u2028'), ('\u2029'.encode(), b'\\u2029'))
+# Encodes the types orjson does not support, such as decimals
+encode_default = JSONEncoder().default
+
+
+def use_orjson():
+    """
+    Whether orjson is installed and not disabled by the JSON_ORJSON setting.
+    """
+    return orjson is not None and getattr(settings, 'JSON_ORJSON', True)
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when it is installed, straight to
+    bytes, and reporting its time as the render section of the request.
+
+    The output is the one of DRF's renderer: datetimes in ISO 8601 with Z
+    for UTC, decimals as floats and other types through DRF's JSONEncoder.
+    Indented, ASCII only or non compact output, and values orjson cannot
+    encode, such as integers beyond 64 bits, go through the standard
+    library. Unlike DRF's, NaN and infinite floats are rendered as null.
+    """
+
+    use_orjson = use_orjson()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed('render'):
+            if data is not None and self.can_use_orjson(self.get_indent(accepted_media_type, renderer_context or {})):
+                try:
+                    return self.render_orjson(data)
+                except orjson.JSONEncodeError:
+                    pass
+            return super().render(data, accepted_media_type, renderer_context)
+
+    def render_lines(self, items):
+        """
+        Render items as NDJSON, one compact JSON document per line. Each
+        document is appended to the output as soon as it is encoded, as
+        orjson returns them with a few KiB of spare capacity.
+        """
+        with timed('render'):
+            fast = self.can_use_orjson(None)
+            output = bytearray()
+            for item in items:
+                line = None
+                if fast:
+                    try:
+                        line = self.render_orjson(item)
+                    except orjson.JSONEncodeError:
+                        pass
+                output += super().render(item) if line is None else line
+                output += b'\n'
+            return bytes(output)
+
+    def can_use_orjson(self, indent):
+        return self.use_orjson and self.compact and not self.ensure_ascii and indent is None
+
+    def render_orjson(self, data):
+        ret = orjson.dumps(data, default=encode_default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+        for character, escaped in LINE_SEPARATORS:
+            if character in ret:
+                ret = ret.replace(character, escaped)
+        return ret
@@ -1,11 +1,15 @@
 from rest_framework import routers
 from core.post.viewsets import PostViewSet
+from core.user.viewsets import UserViewSet
 from core.authentication.viewsets.register import RegisterViewSet
 from core.authentication.viewsets.login import LoginViewSet
 from core.authentication.viewsets.refresh import RefreshViewSet
+from core.authentication.viewsets.logout import LogoutViewSet
 
 router = routers.DefaultRouter()
 router.register(r'post', PostViewSet, basename='post')
+router.register(r'user', UserViewSet, basename='user')
 router.register(r'auth/register', RegisterViewSet, basename='auth-register')
 router.register(r'auth/login', LoginViewSet, basename='auth-login')
 router.register(r'auth/refresh', RefreshViewSet, basename='auth-refresh')
+router.register(r'auth/logout', LogoutViewSet, basename='auth-logout')
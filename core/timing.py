@@ -0,0 +1,102 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    """
+    Queries run by one request and time spent in the sections reported with
+    timed(). The current timing is held in a context variable, so it follows
+    the request into sync_to_async() threads.
+
+    The SQL of the first max_statements queries is kept for the slow request
+    log, without its parameters, which hold emails and password hashes of
+    the authentication queries among others.
+    """
+
+    def __init__(self, max_statements=1000):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.sections = {}
+        self.statements = []
+        self.max_statements = max_statements
+        self._active = set()
+
+    def activate(self):
+        return _current.set(self)
+
+    @staticmethod
+    def deactivate(token):
+        _current.reset(token)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def add(self, name, seconds):
+        self.sections[name] = self.sections.get(name, 0.0) + seconds
+
+    def add_query(self, sql, seconds):
+        self.queries += 1
+        self.sql_seconds += seconds
+        if len(self.statements) < self.max_statements:
+            self.statements.append((sql, seconds))
+
+
+def get_current_timing():
+    return _current.get()
+
+
+@contextmanager
+def timed(name):
+    """
+    Add the time spent in the block to the name section of the current
+    request. Nested blocks of the same section are counted once.
+    """
+    timing = _current.get()
+    if timing is None or name in timing._active:
+        yield
+        return
+
+    timing._active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing._active.discard(name)
+        timing.add(name, time.perf_counter() - started)
+
+
+def record_query(execute, sql, params, many, context):
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.add_query(sql, time.perf_counter() - started)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """
+    connection_created receiver adding record_query() to the execute
+    wrappers of every database connection, including the ones opened by
+    the async ORM threads.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedRepresentationMixin:
+    """
+    Serializer mixin reporting to_representation() as the serialize section.
+    """
+
+    def to_representation(self, instance):
+        with timed('serialize'):
+            return super().to_representation(instance)
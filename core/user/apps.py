@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class UserConfig(AppConfig):
     name = 'core.user'
+
+    def ready(self):
+        from core.user import signals  # noqa: F401
@@ -0,0 +1,94 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+
+
+class UsernameIndex:
+    """
+    In-process sorted index of usernames for prefix lookups.
+
+    Entries are (casefolded username, username) tuples kept in a sorted list,
+    so a lookup is a binary search followed by a short scan and never touches
+    the database. The index is built on first use in each worker, updated
+    incrementally by the User signals of the worker that saved the user, and
+    rebuilt after max_age seconds so changes made by other workers show up.
+    """
+
+    def __init__(self, max_age=None):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = []
+        self._usernames = {}
+        self._built_at = None
+
+    def search(self, prefix, limit=10):
+        """
+        Return up to limit usernames starting with prefix, case-insensitively.
+        """
+        self._ensure_built()
+        key = prefix.casefold()
+        results = []
+        with self._lock:
+            index = bisect_left(self._entries, (key,))
+            while index < len(self._entries) and len(results) < limit:
+                folded, username = self._entries[index]
+                if not folded.startswith(key):
+                    break
+                results.append(username)
+                index += 1
+        return results
+
+    def update(self, user_id, username, is_active=True):
+        """
+        Add, rename or remove a user after it was saved.
+        """
+        with self._lock:
+            if self._built_at is None:
+                # The next lookup builds the index from the database
+                return
+            self._discard(user_id)
+            if is_active:
+                self._usernames[user_id] = username
+                insort(self._entries, (username.casefold(), username))
+
+    def remove(self, user_id):
+        with self._lock:
+            self._discard(user_id)
+
+    def reset(self):
+        """
+        Drop the index, it is built again on the next lookup.
+        """
+        with self._lock:
+            self._entries = []
+            self._usernames = {}
+            self._built_at = None
+
+    def _discard(self, user_id):
+        username = self._usernames.pop(user_id, None)
+        if username is not None:
+            entry = (username.casefold(), username)
+            index = bisect_left(self._entries, entry)
+            if index < len(self._entries) and self._entries[index] == entry:
+                del self._entries[index]
+
+    def _ensure_built(self):
+        built_at = self._built_at
+        if built_at is not None and (self.max_age is None or time.monotonic() - built_at < self.max_age):
+            return
+        self.build()
+
+    def build(self):
+        from core.user.models import User
+
+        usernames = dict(User.objects.filter(is_active=True).values_list('id', 'username'))
+        entries = sorted((username.casefold(), username) for username in usernames.values())
+        with self._lock:
+            self._usernames = usernames
+            self._entries = entries
+            self._built_at = time.monotonic()
+
+
+username_index = UsernameIndex(max_age=getattr(settings, 'USERNAME_AUTOCOMPLETE_MAX_AGE', 300))
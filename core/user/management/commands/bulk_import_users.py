@@ -0,0 +1,193 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db.models import Q
+from core.user.models import User
+
+
+class Command(BaseCommand):
+    """
+    Import users from a CSV or JSON Lines export of another system.
+
+    Each row has an email, a username and a raw password, and optionally a
+    first_name and a last_name. The file is read as a stream and inserted
+    in batches with bulk_create(). Passwords are hashed across a pool of
+    processes, since hashing dominates the import time.
+
+    Rows whose email or username already exists, in the database or
+    earlier in the file, are skipped, as are incomplete rows.
+
+    bulk_create() does not send post_save, web workers pick the imported
+    users up in their username autocomplete index after
+    USERNAME_AUTOCOMPLETE_MAX_AGE.
+
+    Usage:
+    - python manage.py bulk_import_users users.csv
+    - python manage.py bulk_import_users users.jsonl --workers 8 --batch-size 2000
+    """
+
+    help = 'Import users from a CSV or JSON Lines file, hashing passwords in parallel.'
+
+    formats = ('csv', 'jsonl')
+    optional_fields = ('first_name', 'last_name')
+
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file with a header row, or JSON Lines file.')
+        parser.add_argument('--format', choices=self.formats, help='File format, guessed from the extension by default.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of users inserted per query.')
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Processes hashing passwords, 0 hashes in the command process.',
+        )
+
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or self.guess_format(path)
+        batch_size = options['batch_size']
+        workers = options['workers']
+        self.verbosity = options['verbosity']
+
+        started = time.perf_counter()
+        self.imported = self.skipped = self.invalid = 0
+        self.seen_emails, self.seen_usernames = set(), set()
+
+        # Worker processes need the password hashers from the settings
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=django.setup) if workers else None
+        try:
+            with open(path, newline='', encoding='utf-8') as file:
+                rows = self.read_rows(file, file_format)
+                while batch := list(islice(rows, batch_size)):
+                    self.import_batch(batch, pool, workers)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {self.imported} users, skipped {self.skipped} existing and {self.invalid} invalid rows '
+            f'in {elapsed:.1f}s ({self.imported / elapsed if elapsed else 0:.0f} users/s).'
+        ))
+
+
+    def guess_format(self, path):
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.csv':
+            return 'csv'
+        if extension in ('.jsonl', '.ndjson'):
+            return 'jsonl'
+        raise CommandError(f'Cannot guess the format of {path}, use --format.')
+
+
+    def read_rows(self, file, file_format):
+        """
+        Yield (line number, row dict) pairs, with None for unreadable rows.
+        """
+        if file_format == 'csv':
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+            return
+
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+
+
+    def clean_row(self, row):
+        """
+        Return the user fields of a row, or None if the row is incomplete.
+        """
+        if row is None:
+            return None
+
+        values = {}
+        for field in ('email', 'username', 'password', *self.optional_fields):
+            value = row.get(field)
+            if value is None:
+                value = ''
+            if not isinstance(value, str):
+                return None
+            value = value if field == 'password' else value.strip()
+            if len(value) > User._meta.get_field(field).max_length:
+                return None
+            values[field] = value
+
+        if not (values['email'] and values['username'] and values['password']):
+            return None
+        values['email'] = User.objects.normalize_email(values['email'])
+        try:
+            validate_email(values['email'])
+        except ValidationError:
+            return None
+        return values
+
+
+    def import_batch(self, batch, pool, workers):
+        rows = []
+        for line_number, row in batch:
+            values = self.clean_row(row)
+            if values is None:
+                self.invalid += 1
+                if self.verbosity > 1:
+                    self.stderr.write(f'Line {line_number}: invalid row.')
+            elif values['email'] in self.seen_emails or values['username'] in self.seen_usernames:
+                self.skipped += 1
+            else:
+                self.seen_emails.add(values['email'])
+                self.seen_usernames.add(values['username'])
+                rows.append(values)
+        if not rows:
+            return
+
+        # One query for the conflicts of the whole batch
+        existing = User.objects.filter(
+            Q(email__in=[values['email'] for values in rows])
+            | Q(username__in=[values['username'] for values in rows])
+        ).values_list('email', 'username')
+        existing_emails, existing_usernames = set(), set()
+        for email, username in existing:
+            existing_emails.add(email)
+            existing_usernames.add(username)
+        new_rows = [
+            values for values in rows
+            if values['email'] not in existing_emails and values['username'] not in existing_usernames
+        ]
+        self.skipped += len(rows) - len(new_rows)
+        if not new_rows:
+            return
+
+        passwords = [values.pop('password') for values in new_rows]
+        if pool is None:
+            hashes = map(make_password, passwords)
+        else:
+            hashes = pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4)))
+
+        users = [User(password=password, **values) for password, values in zip(hashes, new_rows)]
+        # Users signing up meanwhile are left as they are
+        User.objects.bulk_create(users, ignore_conflicts=True)
+
+        # bulk_create() does not tell which rows it skipped. Salted hashes are
+        # unique, so the users stored with our hash are the imported ones
+        hashes = {user.email: user.password for user in users}
+        imported = sum(
+            hashes[email] == password
+            for email, password in User.objects.filter(email__in=hashes).values_list('email', 'password')
+        )
+        self.imported += imported
+        self.skipped += len(users) - imported
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
+from core.authentication.hashing import password_hashing
 
 def user_directory_path(instance, filename):
     # file will be uploaded to MEDIA_ROOT/user_<id>/<filename>
@@ -44,6 +45,14 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return f"Username: {self.username}"
 
+    # Hashing goes through the concurrency gate of the worker, which covers
+    # registration, sign-in and the dummy hash run for unknown emails
+    def set_password(self, raw_password):
+        password_hashing.run(super().set_password, raw_password)
+
+    def check_password(self, raw_password):
+        return password_hashing.run(super().check_password, raw_password)
+
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
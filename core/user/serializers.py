@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from core.timing import TimedRepresentationMixin
 from core.user.models import User
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'first_name', 'last_name']
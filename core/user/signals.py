@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.user.models import User
+from core.user.autocomplete import username_index
+
+
+@receiver(post_save, sender=User)
+def index_username(sender, instance, **kwargs):
+    username_index.update(instance.pk, instance.username, instance.is_active)
+
+
+@receiver(post_delete, sender=User)
+def unindex_username(sender, instance, **kwargs):
+    username_index.remove(instance.pk)
@@ -1,5 +1,17 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
 from django.test import TestCase
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from core.user.autocomplete import username_index
 
 class UserModelTest(TestCase):
     def setUp(self):
@@ -55,3 +67,134 @@ class UserModelTest(TestCase):
             last_name='Doe'
         )
         self.assertEqual(user.full_name, "John Doe")
+
+
+class UsernameAutocompleteTest(APITestCase):
+    def setUp(self):
+        username_index.reset()
+        self.User = get_user_model()
+        self.user = self.User.objects.create_user(email='alice@example.com', username='Alice', password='password123')
+        for username in ('alfred', 'albert', 'bob', 'alina'):
+            self.User.objects.create_user(email=f'{username}@example.com', username=username, password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('user-autocomplete')
+
+    def test_prefix_lookup(self):
+        response = self.client.get(self.url, {'q': 'al'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], ['albert', 'alfred', 'Alice', 'alina'])
+
+    def test_prefix_lookup_is_case_insensitive(self):
+        response = self.client.get(self.url, {'q': 'ALI'})
+        self.assertEqual(response.data['results'], ['Alice', 'alina'])
+
+    def test_limit(self):
+        response = self.client.get(self.url, {'q': 'a', 'limit': 2})
+        self.assertEqual(response.data['results'], ['albert', 'alfred'])
+
+    def test_empty_query(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['results'], [])
+
+    def test_lookup_does_not_query_the_database(self):
+        self.client.get(self.url, {'q': 'al'})
+        with self.assertNumQueries(0):
+            self.client.get(self.url, {'q': 'bo'})
+
+    def test_index_follows_user_changes(self):
+        self.client.get(self.url, {'q': 'a'})
+
+        new_user = self.User.objects.create_user(email='alan@example.com', username='alan', password='password123')
+        self.assertEqual(username_index.search('ala'), ['alan'])
+
+        new_user.username = 'zed'
+        new_user.save()
+        self.assertEqual(username_index.search('ala'), [])
+        self.assertEqual(username_index.search('z'), ['zed'])
+
+        new_user.delete()
+        self.assertEqual(username_index.search('z'), [])
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(username_index.search('alic'), [])
+
+    def test_unauthenticated_user_cannot_autocomplete(self):
+        self.client.logout()
+        response = self.client.get(self.url, {'q': 'al'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+class BulkImportUsersTest(TestCase):
+    def setUp(self):
+        self.User = get_user_model()
+        self.User.objects.create_user(email='taken@example.com', username='taken', password='password123')
+
+    def write_file(self, suffix, content):
+        file = tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False, encoding='utf-8')
+        with file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        return file.name
+
+    def import_users(self, path, **options):
+        out = StringIO()
+        call_command('bulk_import_users', path, stdout=out, stderr=StringIO(), **options)
+        return out.getvalue()
+
+    def test_import_csv(self):
+        path = self.write_file('.csv', (
+            'email,username,password,first_name,last_name\n'
+            'Ann@EXAMPLE.com,ann,secret123,Ann,Lee\n'
+            'bob@example.com,bob,secret456,,\n'
+            'taken@example.com,other,secret789,,\n'
+            'carl@example.com,taken,secret789,,\n'
+            'bob@example.com,bobby,secret789,,\n'
+            'not-an-email,dan,secret789,,\n'
+            'eve@example.com,,secret789,,\n'
+        ))
+        output = self.import_users(path, workers=0, batch_size=2)
+
+        self.assertIn('Imported 2 users, skipped 3 existing and 2 invalid rows', output)
+        ann = self.User.objects.get(username='ann')
+        self.assertEqual(ann.email, 'Ann@example.com')
+        self.assertEqual(ann.full_name, 'Ann Lee')
+        self.assertTrue(ann.check_password('secret123'))
+        self.assertTrue(self.User.objects.get(username='bob').check_password('secret456'))
+        self.assertEqual(self.User.objects.count(), 3)
+
+    def test_import_jsonl_with_worker_processes(self):
+        rows = [{'email': f'user{index}@example.com', 'username': f'user{index}', 'password': f'secret{index}'} for index in range(6)]
+        lines = [json.dumps(row) for row in rows] + ['', '{not json', '[1, 2]', json.dumps({'email': 'x@example.com', 'username': 'x', 'password': 1})]
+        path = self.write_file('.jsonl', '\n'.join(lines) + '\n')
+        output = self.import_users(path, workers=2)
+
+        self.assertIn('Imported 6 users, skipped 0 existing and 3 invalid rows', output)
+        for index in range(6):
+            self.assertTrue(self.User.objects.get(username=f'user{index}').check_password(f'secret{index}'))
+
+    def test_import_runs_one_insert_per_batch(self):
+        rows = [f'user{index}@example.com,user{index},secret{index}' for index in range(4)]
+        path = self.write_file('.csv', 'email,username,password\n' + '\n'.join(rows) + '\n')
+        # A conflict lookup, an insert and a count of the inserted rows for each batch
+        with self.assertNumQueries(6):
+            self.import_users(path, workers=0, batch_size=2)
+
+    def test_users_created_during_the_import_are_not_counted(self):
+        path = self.write_file('.csv', 'email,username,password\nann@example.com,ann,secret123\nbob@example.com,bob,secret456\n')
+
+        def sign_up_then_hash(password):
+            # Someone signs up as bob between the conflict lookup and the insert
+            if not self.User.objects.filter(username='bob').exists():
+                self.User.objects.create_user(email='bob@example.com', username='bob', password='mine')
+            return make_password(password)
+
+        with mock.patch('core.user.management.commands.bulk_import_users.make_password', sign_up_then_hash):
+            output = self.import_users(path, workers=0)
+
+        self.assertIn('Imported 1 users, skipped 1 existing and 0 invalid rows', output)
+        self.assertTrue(self.User.objects.get(username='bob').check_password('mine'))
+
+    def test_unknown_format(self):
+        path = self.write_file('.txt', '')
+        with self.assertRaises(CommandError):
+            self.import_users(path)
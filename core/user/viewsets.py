@@ -0,0 +1,30 @@
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from core.authentication.permissions import UserPermission
+from core.user.autocomplete import username_index
+
+
+class UserViewSet(viewsets.ViewSet):
+    permission_classes = [UserPermission]
+    http_method_names = ['get']
+
+    # Default and maximum number of suggestions
+    autocomplete_limit = 10
+    autocomplete_max_limit = 50
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """
+        Suggest usernames starting with ?q=, answered from the in-process
+        username index without querying the database.
+        """
+        prefix = request.query_params.get('q', '').strip()
+        try:
+            limit = min(int(request.query_params.get('limit', self.autocomplete_limit)), self.autocomplete_max_limit)
+        except ValueError:
+            limit = self.autocomplete_limit
+
+        if not prefix or limit < 1:
+            return Response({'results': []})
+        return Response({'results': username_index.search(prefix, limit)})
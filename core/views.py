@@ -0,0 +1,42 @@
+import hmac
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseForbidden, Http404
+from django.views.decorators.http import require_GET
+from prometheus_client import CONTENT_TYPE_LATEST
+from core.metrics import render_latest
+from core.profiling import get_report_cache_key, read_profile_token
+
+
+@require_GET
+def metrics(request):
+    """
+    Prometheus scrape endpoint, summing the metrics of all workers. When
+    METRICS_TOKEN is set, scrapers must send it as a bearer token. Without
+    one, metrics are only served when DEBUG is on.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token and not settings.DEBUG:
+        return HttpResponseForbidden('Set METRICS_TOKEN to serve metrics.')
+    if token:
+        authorization = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode()):
+            response = HttpResponse(status=401)
+            response['WWW-Authenticate'] = 'Bearer'
+            return response
+    return HttpResponse(render_latest(), content_type=CONTENT_TYPE_LATEST)
+
+
+@require_GET
+def profile_report(request, profile_id):
+    """
+    Report of a request profiled by ProfilingMiddleware. Clients must send
+    a token from the profile_token command in an X-Profile-Token header,
+    not X-Profile, which would have this request profiled too.
+    """
+    if read_profile_token(request.headers.get('X-Profile-Token', '')) is None:
+        return HttpResponseForbidden('A valid X-Profile-Token header is required.')
+    report = cache.get(get_report_cache_key(profile_id))
+    if report is None:
+        raise Http404('No such profile, it may have expired.')
+    return HttpResponse(report, content_type='text/plain; charset=utf-8')
@@ -59,6 +59,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ServerTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Add whitenoise for static files
@@ -68,6 +69,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'drf_project.urls'
@@ -97,7 +99,7 @@ if env('DATABASE_URL', default=None):
     DATABASES = {
         'default': dj_database_url.config(
             default=env('DATABASE_URL'),
-            conn_max_age=600,
+            conn_max_age=env.int('DATABASE_CONN_MAX_AGE', default=600),
             ssl_require=True
         )
     }
@@ -115,6 +117,17 @@ else:
     }
 
 
+# Cache
+# Local memory by default, which is per worker. Set CACHE_URL (e.g. redis://...)
+# to share cached feed pages and their invalidation between workers.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Seconds a cached first page of the post feed is served, 0 disables the cache
+POST_FEED_CACHE_TIMEOUT = env.int('POST_FEED_CACHE_TIMEOUT', default=60)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -166,11 +179,23 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.backends.CachedJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# Encode and decode JSON with orjson when it is installed, see core.renderers
+JSON_ORJSON = env.bool('JSON_ORJSON', default=True)
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'DRF Project API',
     'DESCRIPTION': 'API documentation for DRF Project',
@@ -197,3 +222,69 @@ SIMPLE_JWT = {
     'AUDIENCE': None,
     'ISSUER': None,
 }
+
+# Verified access tokens remembered by each worker until they expire, and
+# seconds the user of a token is cached, see CachedJWTAuthentication
+JWT_TOKEN_CACHE_SIZE = env.int('JWT_TOKEN_CACHE_SIZE', default=10000)
+JWT_USER_CACHE_TIMEOUT = env.int('JWT_USER_CACHE_TIMEOUT', default=30)
+
+# Passwords hashed at the same time by a worker, and seconds a sign-in waits
+# for a free slot before getting a 503
+PASSWORD_HASHING_CONCURRENCY = env.int('PASSWORD_HASHING_CONCURRENCY', default=2)
+PASSWORD_HASHING_QUEUE_TIMEOUT = env.float('PASSWORD_HASHING_QUEUE_TIMEOUT', default=2.0)
+
+# Failed sign-ins allowed per client address and per email within the window
+# in seconds, further attempts get a 429 without hashing the password
+LOGIN_FAILURE_LIMIT = env.int('LOGIN_FAILURE_LIMIT', default=5)
+LOGIN_FAILURE_WINDOW = env.int('LOGIN_FAILURE_WINDOW', default=900)
+# Proxies appending to X-Forwarded-For in front of the application, 0 counts
+# failures per REMOTE_ADDR
+LOGIN_TRUSTED_PROXIES = env.int('LOGIN_TRUSTED_PROXIES', default=0)
+
+# Revoked refresh tokens each worker's Bloom filter is sized for, its false
+# positive rate, and seconds between syncs with the RevokedToken table
+REVOKED_TOKEN_FILTER_CAPACITY = env.int('REVOKED_TOKEN_FILTER_CAPACITY', default=100000)
+REVOKED_TOKEN_FILTER_ERROR_RATE = env.float('REVOKED_TOKEN_FILTER_ERROR_RATE', default=0.001)
+REVOKED_TOKEN_SYNC_INTERVAL = env.float('REVOKED_TOKEN_SYNC_INTERVAL', default=1.0)
+
+# Server-Timing header of each response, and requests logged with their SQL
+# when they run more queries or take more milliseconds, 0 disables a limit
+REQUEST_TIMING_HEADER = env.bool('REQUEST_TIMING_HEADER', default=True)
+REQUEST_TIMING_SLOW_QUERIES = env.int('REQUEST_TIMING_SLOW_QUERIES', default=50)
+REQUEST_TIMING_SLOW_MS = env.int('REQUEST_TIMING_SLOW_MS', default=1000)
+
+# Prometheus metrics of each request at /metrics, which requires this bearer
+# token, or DEBUG when it is not set, see core.metrics
+METRICS_ENABLED = env.bool('METRICS_ENABLED', default=True)
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+
+# Requests profiled on demand with the X-Profile header: seconds a token of
+# the profile_token command is valid, functions and allocation sites in the
+# report, and seconds the report is kept in the cache
+PROFILING_TOKEN_MAX_AGE = env.int('PROFILING_TOKEN_MAX_AGE', default=3600)
+PROFILING_REPORT_FUNCTIONS = env.int('PROFILING_REPORT_FUNCTIONS', default=40)
+PROFILING_HEADER_FUNCTIONS = env.int('PROFILING_HEADER_FUNCTIONS', default=5)
+PROFILING_RESULT_TIMEOUT = env.int('PROFILING_RESULT_TIMEOUT', default=600)
+
+# One structured line per request on the core.timing logger
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.timing': {
+            'handlers': ['console'],
+            'level': env('REQUEST_TIMING_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Seconds after which each worker rebuilds its username autocomplete index,
+# so users created or renamed through other workers show up
+USERNAME_AUTOCOMPLETE_MAX_AGE = env.int('USERNAME_AUTOCOMPLETE_MAX_AGE', default=300)
+
+# Maximum number of posts created or deleted by one request to /api/post/bulk/
+POST_BULK_MAX_ITEMS = env.int('POST_BULK_MAX_ITEMS', default=1000)
@@ -0,0 +1,39 @@
+"""
+gunicorn settings, loaded from the working directory by default.
+
+Workers write their Prometheus metrics to files of PROMETHEUS_MULTIPROC_DIR,
+which /metrics sums, see core.metrics. The directory is set here, before the
+workers start and import prometheus_client. Without one in the environment a
+fresh temporary directory is created, and removed when the server exits. A
+directory given by the operator is kept, only its metric files are deleted
+when the server starts so counters of a previous run are not added to the
+new ones.
+"""
+import glob
+import os
+import shutil
+import tempfile
+
+created_metrics_dir = 'PROMETHEUS_MULTIPROC_DIR' not in os.environ
+if created_metrics_dir:
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='drf-project-metrics-')
+metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+
+
+def on_starting(server):
+    if created_metrics_dir:
+        return
+    os.makedirs(metrics_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(metrics_dir, '*.db')):
+        os.remove(path)
+
+
+def on_exit(server):
+    if created_metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)